@@ -0,0 +1 @@
+"""Puts the repository root on sys.path, so that tests import the app as 'src.' (run pytest from the root)."""
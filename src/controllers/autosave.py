@@ -0,0 +1,134 @@
+import logging
+import os
+import time
+
+from PyQt6.QtCore import QObject, QTimer
+
+AUTOSAVE_ENV_KEY = 'APP_AUTOSAVE'  # '0' turns autosave off
+IDLE_ENV_KEY = 'APP_AUTOSAVE_IDLE_MS'
+MAX_LATENCY_ENV_KEY = 'APP_AUTOSAVE_MAX_LATENCY_MS'
+DEFAULT_IDLE_MS = 1500  # Written once edits pause this long...
+DEFAULT_MAX_LATENCY_MS = 10000  # ...or at the latest this long after the first unsaved edit
+
+
+def _ms_from_environment(key, default):
+    try:
+        return int(os.getenv(key, default))
+    except ValueError:
+        logging.warning(f"Invalid '{key}' value '{os.getenv(key)}'. Using {default} ms.")
+        return default
+
+
+class Autosave(QObject):
+    """
+    Writes edited rows to the database without the user pressing Save.
+
+    Subscribes to the model's change-feed and keeps the edited rows by id. Bursts of edits are coalesced: the rows
+    are written when edits pause for 'idle_ms', or 'max_latency_ms' after the first unsaved edit if they never pause.
+    Only the edited rows are written, in one transaction. flush() is also called on app_about_to_quit.
+    """
+
+    def __init__(self, model, idle_ms=None, max_latency_ms=None):
+        super().__init__()
+        self.model = model
+        self.enabled = os.getenv(AUTOSAVE_ENV_KEY, '1') != '0'
+
+        self.dirty_rows = {}  # Row id: row data (the model's own dictionaries, so they're always current)
+
+        # Metrics
+        self.edits_received = 0  # Change sets from the feed
+        self.field_changes_received = 0
+        self.transactions = 0
+        self.rows_written = 0
+        self.last_flush_ms = 0.0
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(idle_ms or _ms_from_environment(IDLE_ENV_KEY, DEFAULT_IDLE_MS))
+        self.idle_timer.timeout.connect(self.flush)
+
+        self.max_latency_timer = QTimer(self)
+        self.max_latency_timer.setSingleShot(True)
+        self.max_latency_timer.setInterval(
+            max_latency_ms or _ms_from_environment(MAX_LATENCY_ENV_KEY, DEFAULT_MAX_LATENCY_MS)
+            )
+        self.max_latency_timer.timeout.connect(self.flush)
+
+        if self.enabled:
+            self.subscription = model.change_feed.subscribe(self.on_changes, kinds={'update', 'insert', 'remove'})
+        else:
+            self.subscription = None
+            logging.info(f"Autosave is off ('{AUTOSAVE_ENV_KEY}' is '0').")
+
+    def on_changes(self, change_set):
+        self.edits_received += 1
+
+        for insert in change_set.inserts:  # insert_new_row doesn't commit
+            self._mark_dirty(insert.row_id, insert.row)
+
+        for update in change_set.updates:
+            self.field_changes_received += len(update.fields)
+            self._mark_dirty(update.row_id, update.row)
+
+        for removal in change_set.removals:  # delete_task commits the delete itself
+            self.dirty_rows.pop(removal.row_id, None)
+
+        if not self.dirty_rows:
+            return
+
+        self.idle_timer.start()  # Restarted by every edit
+        if not self.max_latency_timer.isActive():
+            self.max_latency_timer.start()  # Not restarted, so a long burst is still written in time
+
+    def _mark_dirty(self, row_id, row):
+        if row_id is None or row_id in self.dirty_rows:
+            return
+
+        # 'row' is the index when the change was made. It's still right unless later changes in the same operation
+        # moved rows, so check the id and fall back to a scan.
+        row_data = self.model.get_row_data(row) if 0 <= row < self.model.rowCount() else None
+        if row_data is None or row_data.get('id') != row_id:
+            row_data = next((each_row for each_row in self.model._data if each_row.get('id') == row_id), None)
+            if row_data is None:
+                return
+
+        self.dirty_rows[row_id] = row_data
+
+    def flush(self):
+        self.idle_timer.stop()
+        self.max_latency_timer.stop()
+
+        if not self.dirty_rows:
+            return
+
+        rows_data = list(self.dirty_rows.values())
+        started = time.perf_counter()
+        try:
+            self.model.app_data.update_rows(rows_data)
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when autosaving {len(rows_data)} row/s (Error Description:{e}")
+            return  # Rows stay dirty and are retried with the next edit or flush
+
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.dirty_rows.clear()
+        self.transactions += 1
+        self.rows_written += len(rows_data)
+        logging.debug(f"Autosaved {len(rows_data)} row/s in {self.last_flush_ms:.1f} ms.")
+
+    def metrics(self):
+        return {
+            'edits_received': self.edits_received,
+            'field_changes_received': self.field_changes_received,
+            'transactions': self.transactions,
+            'rows_written': self.rows_written,
+            'pending_rows': len(self.dirty_rows),
+            'last_flush_ms': self.last_flush_ms,
+            }
+
+    def close(self):
+        """Final flush. Called on app_about_to_quit, before the database is closed."""
+        self.flush()
+        if self.subscription is not None:
+            self.model.change_feed.unsubscribe(self.subscription)
+            self.subscription = None
+        logging.info(f"Autosave metrics: {self.metrics()}")
@@ -1,6 +1,18 @@
 import logging
+import time
 
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QAction, QKeySequence
+
+from src.controllers.autosave import Autosave
 from src.controllers.task_services import TaskService
+from src.controllers.undo_manager import UndoManager
+from src.dev import sql_profiler
+from src.dev.action_latency import action_latency
+from src.dev.action_profiler import action_profiler
+from src.dev.stall_detector import stall_detector
+from src.models.task_tree import SUBTASK_TYPE
+from src.utils.service_registry import services
 
 
 class Controller:
@@ -8,33 +20,98 @@ class Controller:
         self.model = model
         self.table_view = table_view
 
+        self.task_service = TaskService(model, table_view)
+        self.autosave = Autosave(model)
+        self.undo_manager = UndoManager(model)
+        self.add_shortcuts()
+
         self.action_map = self.mapping()
+        self.table_view.rows_dropped_signal.connect(self.process_rows_dropped)
 
-        self.task_service = TaskService(model, table_view)
+        self.sql_profile_window = None  # Dev windows are created on first use
+        self.stalls_window = None
+        self.latency_window = None
+        self.profile_report_window = None
+        self.outline_window = None  # Created on first use
+
+        action_profiler.capture_finished.connect(self.show_profile_report)
 
     def mapping(self):
         map = {
             'Save': self.process_saving_all,
             'Save As': self.save_as,
             'New Task': self.process_new_task,
+            'New Subtask': self.process_new_subtask,
             'Delete': self.process_delete_task,
+            'Copy': self.task_service.copy_selected_rows,
+            'Paste': self.task_service.paste_rows,
+            'Fit Durations': self.task_service.fit_selected_rows,
+            'Limits': self.task_service.edit_constraints,
+            'Outline': self.show_outline,
+            'Undo': self.undo_manager.undo_stack.undo,
+            'Redo': self.undo_manager.undo_stack.redo,
             'Testing': self.testing,
+            'SQL Profile': self.show_sql_profile,
+            'Stalls': self.show_stalls,
+            'Logs': self.show_logs,
+            'Latency': self.show_latency,
+            'Profile Next': action_profiler.arm_next_action,
+            'Profile Timed': action_profiler.capture_for_seconds,
+            'Profile Report': self.show_profile_report,
             }  # Action:Method
         return map
 
     def signal_from_left_bar(self, action):
         logging.debug(f"Catching Signal '{action}' emitted from MainWindow (originated:LeftBar).")
         method_to_call = self._return_method_for_action(action)
-        method_to_call()
+
+        stall_detector.current_action = action  # Stalls while it runs are attributed to it
+        action_profiler.action_started(action)
+        started = time.perf_counter()
+        try:
+            method_to_call()
+        finally:
+            action_latency.record(action, time.perf_counter() - started)
+            action_profiler.action_finished(action)
+            stall_detector.current_action = None
+
+    def add_shortcuts(self):
+        """
+        Undo/Redo and Copy/Paste with the platform keys while the table has focus. Open editors keep their own.
+        Copy and Paste go through signal_from_left_bar like the buttons, so they're timed and profiled the same way.
+        """
+        undo_stack = self.undo_manager.undo_stack
+        shortcuts = [
+            (undo_stack.createUndoAction(self.table_view), QKeySequence.StandardKey.Undo),
+            (undo_stack.createRedoAction(self.table_view), QKeySequence.StandardKey.Redo),
+            ]
+        for action_name, key_sequence in (('Copy', QKeySequence.StandardKey.Copy),
+                                          ('Paste', QKeySequence.StandardKey.Paste)):
+            action = QAction(action_name, self.table_view)
+            action.triggered.connect(lambda _, name=action_name: self.signal_from_left_bar(name))
+            shortcuts.append((action, key_sequence))
+
+        for action, key_sequence in shortcuts:
+            action.setShortcut(key_sequence)
+            action.setShortcutContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            self.table_view.addAction(action)
 
     def process_new_task(self):
         logging.debug("New Task requested in controller.")
         self.task_service.create_new_task()
 
+    def process_new_subtask(self):
+        logging.debug("New Subtask requested in controller.")
+        self.task_service.create_new_task(task_type=SUBTASK_TYPE)
+
     def process_delete_task(self):
         logging.debug(f"'Delete Task' requested in controller.")
         self.task_service.remove_row_and_delete_data()
 
+    def process_rows_dropped(self, first_row, count, destination_row):
+        logging.debug(f"Move of {count} row/s dropped before row {destination_row} in controller.")
+        self.task_service.move_rows(first_row, count, destination_row)
+
     def process_saving_all(self):
         logging.debug(f"Save data requested in controller.")
         self.model.save_to_database_file()
@@ -42,6 +119,130 @@ class Controller:
     def save_as(self):
         logging.debug(f"'Save As' requested in controller. Not implemented yet")
 
+    def show_sql_profile(self):
+        profiler = self.model.app_data.sql_profiler
+        if profiler is None:
+            logging.warning(f"SQL profiling is off. Set the '{sql_profiler.PROFILE_ENV_KEY}' environment variable "
+                            f"and restart to record statements.")
+            return
+
+        if self.sql_profile_window is None:
+            from src.views.dev_stats_window import StatsTableWindow  # Dev only, imported on first use
+
+            columns = [
+                ("Statement", 'statement', None),
+                ("Executions", 'executions', 'd'),
+                ("Calls", 'calls', 'd'),
+                ("Total ms", 'total_ms', '.2f'),
+                ("Mean ms", 'mean_ms', '.3f'),
+                ("p95 ms", 'p95_ms', '.3f'),
+                ("Rows affected", 'rows_affected', 'd'),
+                ]
+            self.sql_profile_window = StatsTableWindow(
+                "SQL Profile", columns, profiler.rows,
+                buttons=[("Reset", profiler.reset), ("Dump JSON", profiler.dump_to_log_folder)]
+                )
+
+        self.sql_profile_window.set_summary(f"Recording since {profiler.started:%H:%M:%S}. "
+                                            f"Executions are counted by SQLite, calls are timed by the app.")
+        self.sql_profile_window.show()
+        self.sql_profile_window.refresh()
+
+    def show_stalls(self):
+        if not stall_detector.running:
+            logging.warning("The stall detector isn't running. Set the 'APP_STALL_DETECTOR' environment variable "
+                            "(1, or a threshold in ms) and restart.")
+            return
+
+        if self.stalls_window is None:
+            from src.views.dev_stats_window import StatsTableWindow  # Dev only, imported on first use
+
+            columns = [
+                ("Action", 'action', None),
+                ("Stalls", 'stalls', 'd'),
+                ("Total ms", 'total_ms', '.0f'),
+                ("Max ms", 'max_ms', '.0f'),
+                ("p95 ms", 'p95_ms', '.0f'),
+                ("Last seen in", 'where', None),
+                ]
+            self.stalls_window = StatsTableWindow(
+                "Event Loop Stalls", columns, stall_detector.rows, buttons=[("Reset", stall_detector.reset)]
+                )
+            self.stalls_window.set_summary(f"Stalls longer than {stall_detector.threshold_s * 1000:.0f} ms. "
+                                           f"Full GUI thread stacks are in the log.")
+
+        self.stalls_window.show()
+        self.stalls_window.refresh()
+
+    def show_logs(self):
+        services.get('log_window').show()
+
+    def show_latency(self):
+        if self.latency_window is None:
+            from src.views.dev_stats_window import StatsTableWindow  # Dev only, imported on first use
+
+            columns = [
+                ("Action", 'action', None),
+                ("Count", 'count', 'd'),
+                ("Mean ms", 'mean_ms', '.1f'),
+                ("p50 ms", 'p50_ms', '.1f'),
+                ("p95 ms", 'p95_ms', '.1f'),
+                ("p99 ms", 'p99_ms', '.1f'),
+                ("Max ms", 'max_ms', '.1f'),
+                ("Budget ms", 'budget_ms', 'd'),
+                ("Over budget", 'over_budget', 'd'),
+                ]
+            self.latency_window = StatsTableWindow(
+                "Action Latency", columns, action_latency.rows,
+                buttons=[("Reset", action_latency.reset), ("Export JSON", action_latency.export_to_log_folder)]
+                )
+            self.latency_window.set_summary("Time spent in each left bar action, from dispatch to return.")
+
+        # Placed to the right of the log window, so both can be watched while using the app
+        log_window = services.get('log_window')
+        log_geometry = log_window.frameGeometry()
+        self.latency_window.move(log_geometry.right() + 1, log_geometry.top())
+
+        self.latency_window.show()
+        self.latency_window.refresh()
+
+    def show_outline(self):
+        if self.outline_window is None:
+            from src.views.outline_window import OutlineWindow
+
+            self.outline_window = OutlineWindow(self.model)
+            self.outline_window.row_activated_signal.connect(self.select_row)
+
+        self.outline_window.show()
+        self.outline_window.raise_()
+
+    def select_row(self, row):
+        self.table_view.selectRow(row)
+        self.table_view.scrollTo(self.model.index(row, 0))
+
+    def show_profile_report(self, *_):
+        if not action_profiler.last_report:
+            logging.warning("No profile captured yet. Use 'Profile Next' or 'Profile Timed' first.")
+            return
+
+        if self.profile_report_window is None:
+            from src.views.dev_stats_window import StatsTableWindow  # Dev only, imported on first use
+
+            columns = [
+                ("Kind", 'kind', None),
+                ("Location", 'location', None),
+                ("Calls / Blocks", 'count', 'd'),
+                ("Own ms", 'own_ms', '.2f'),
+                ("Cumulative ms", 'cumulative_ms', '.2f'),
+                ("Size KiB", 'size_kib', '.1f'),
+                ]
+            self.profile_report_window = StatsTableWindow("Profile Report", columns, lambda: action_profiler.last_report)
+
+        self.profile_report_window.set_summary(f"Last capture: '{action_profiler.last_label}'. "
+                                               f"Full .pstats and allocation reports are in the log folder.")
+        self.profile_report_window.show()
+        self.profile_report_window.refresh()
+
     def data_changed(self, value):
         logging.debug(f"data_changed. Value:'{value}'")
         self.table_view.update()
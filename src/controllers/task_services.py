@@ -1,36 +1,44 @@
 import logging
 from datetime import timedelta
 
-from src.controllers.time_calculator import TimeCalculator
+from PyQt6.QtCore import QModelIndex
+from PyQt6.QtWidgets import QApplication, QInputDialog
+
+from src.models import task_clipboard
+from src.resources.default import CONSTRAINT_DEFAULTS
+from src.utils import tracing
+from src.utils.service_registry import services
+
+MAX_FIT_MINUTES = 7 * 24 * 60  # Upper bound offered by 'Fit Durations'
+PASTE_OVER_COLUMNS = ('duration', 'task_name')  # Columns where pasted lines overwrite a selection of cells
 
 
 class TaskService:
     def __init__(self, model, table_view):
         self.model = model
         self.table_view = table_view
-        self.time_calculator = TimeCalculator()
+        self.time_calculator = services.get('time_calculator')
 
-    def create_new_task(self):
+    def create_new_task(self, task_type='main'):
         """
         'replace_index' keyword is used to refer to the index where new row will be inserted.
-        It's always the last row's index.
+        It's always the last row's index. A 'subtask' belongs to the nearest main task above it (see task_tree.py).
 
         'after_this' refers to the row above the 'replace_index' row and is used to get data for new row.
         """
-        logging.debug("Executing New Task Request in TaskService.")
+        tracing.controller.debug("Executing New Task Request in TaskService.")
 
         # Get indices
         replace_index = self.model.rowCount() - 1
         second_last_index = replace_index - 1
 
-        logging.debug(f"Last row index and index to insert at:{replace_index}. ")
+        tracing.controller.debug(lambda: f"Last row index and index to insert at:{replace_index}. ")
 
         # Crucial to get this before inserting new row (For updating)
         last_duration_original = self.model.get_row_data(replace_index, 'duration')
 
         # Get data of row above
         to_time_row_above = self.model.get_row_data(second_last_index, 'to_time')
-        task_sequence_row_above = self.model.get_row_data(second_last_index, 'task_sequence')
 
         to_time = to_time_row_above + timedelta(minutes=10)
         reminder = to_time_row_above - timedelta(minutes=5)
@@ -40,46 +48,44 @@ class TaskService:
             'from_time': to_time_row_above,
             'to_time': to_time,
             'duration': 10,
-            'task_name': 'New Task',
+            'task_name': 'New Task' if task_type == 'main' else 'New Subtask',
             'reminders': reminder,
-            'type': 'main',
-            'task_sequence': task_sequence_row_above + 1,
+            'type': task_type,
+            'task_sequence': None,  # Assigned by insert_new_row, between the last two rows' keys
+            **CONSTRAINT_DEFAULTS,
             }
 
-        self.model.insert_new_row(replace_index, data_to_insert)  # Insert new row
+        with self.model.change_feed.operation('New Task'):  # Published as one change
+            self.model.insert_new_row(replace_index, data_to_insert)  # Insert new row
 
-        logging.debug(f"New Task inserted. Updating last task from and duration.")
+            tracing.controller.debug("New Task inserted. Updating last task from and duration.")
 
-        self.update_last_task(data_to_insert, last_duration_original)
+            self.update_last_task(data_to_insert, last_duration_original)
 
     def update_last_task(self, new_row_data, last_task_duration_original):
         """This is to update the very last row in the table. And this is after a row has been inserted above the last one."""
 
-        logging.debug(f"Updating last task in TaskServices.")
+        tracing.controller.debug("Updating last task in TaskServices.")
 
         from_time = to_time_new_row = new_row_data.get('to_time')  # New from_time of last task
         new_duration = last_task_duration_original - 10
-        task_sequence = self.model.rowCount()
         row = self.model.rowCount() - 1  # Last row
 
         try:
-            self.model.set_row_data(
-                row, new_from=from_time, new_duration=new_duration, new_type='main',
-                new_task_sequence=task_sequence
-                )
+            self.model.set_row_data(row, new_from=from_time, new_duration=new_duration, new_type='main')
         except Exception as e:
             logging.error(f"Exception type:{type(e)}  (Error Description:{e}")
 
-        logging.debug(f"Last task updated.")
+        tracing.controller.debug("Last task updated.")
 
     def remove_row_and_delete_data(self):
-        logging.debug(f"Remove and Delete executing in TaskServices.")
+        tracing.controller.debug("Remove and Delete executing in TaskServices.")
 
         selection_model = self.table_view.selectionModel()
         selected_indexes = selection_model.selectedIndexes()
 
         if not selected_indexes:
-            logging.debug(f"No row selected. Nothing to delete.")
+            tracing.controller.debug("No row selected. Nothing to delete.")
             return
         row_to_delete = selected_indexes[0].row()
 
@@ -92,29 +98,135 @@ class TaskService:
             logging.error(f"Exception type:{type(e)}  (Error Description:{e}")
             return
 
-        logging.debug(f"Row to delete index:{row_to_delete}, Sequence:{sequence}, "
-                      f"Task Name:{task_name}, Row ID:{row_id}")
+        tracing.controller.debug(lambda: f"Row to delete index:{row_to_delete}, Sequence:{sequence}, "
+                                         f"Task Name:{task_name}, Row ID:{row_id}")
 
-        if sequence == self.model.rowCount():
-            logging.debug(f"Last row cannot be deleted.")
+        if row_to_delete == self.model.rowCount() - 1:
+            tracing.controller.debug("Last row cannot be deleted.")
             return
 
-        if sequence == 1:
-            logging.debug(f"First row cannot be deleted.")
+        if row_to_delete == 0:
+            tracing.controller.debug("First row cannot be deleted.")
             return
 
         else:
-            delete_success = self.model.delete_row_and_data(row_to_delete)
+            # Sequence keys have gaps (see sequence_keys.py), so the rows below keep theirs
+            with self.model.change_feed.operation('Delete'):
+                if self.model.delete_row_and_data(row_to_delete):
+                    tracing.controller.debug("Row deleted successfully.")
+
+    def move_rows(self, first_row, count, destination_row):
+        """Drag and drop: move the rows to before 'destination_row' (see TableModel.moveRows)."""
+        with self.model.change_feed.operation('Move'):  # One undo step
+            moved = self.model.moveRows(QModelIndex(), first_row, count, QModelIndex(), destination_row)
+        tracing.controller.debug(lambda: f"Move of {count} row/s from {first_row} to {destination_row}: {moved}.")
+        return moved
+
+    def fit_selected_rows(self):
+        """Ask for a new total and scale the selected tasks' durations to it, proportionally."""
+        rows = self.selected_rows()
+        if not rows or rows != list(range(rows[0], rows[-1] + 1)):
+            tracing.controller.debug("Select one block of consecutive rows to fit.")
+            return
+
+        current_total = sum(self.model.get_row_data(row, 'duration') for row in rows)
+        target_total, accepted = QInputDialog.getInt(
+            self.table_view, "Fit Durations", f"Total minutes for the {len(rows)} selected task/s:",
+            current_total, len(rows), MAX_FIT_MINUTES
+            )
+        if not accepted or target_total == current_total:
+            return
+
+        self.model.resize_rows(rows[0], rows[-1], target_total)  # One undo step
+
+    def edit_constraints(self):
+        """Ask for the selected tasks' limits (min/max duration, fixed start), prefilled with the first one's."""
+        from src.views.constraints_dialog import ConstraintsDialog  # Imported on first use
+
+        rows = self.selected_rows()
+        if not rows:
+            tracing.controller.debug("No row selected. No limits to set.")
+            return
+
+        current = self.time_calculator.constraints_for(self.model.get_row_data(rows[0]))
+        dialog = ConstraintsDialog(current, len(rows), self.table_view)
+        if dialog.exec() != ConstraintsDialog.DialogCode.Accepted:
+            return
+        self.model.set_constraints(rows, dialog.constraints())  # One undo step
+
+    def selected_rows(self):
+        """From the selection's ranges, not selectedIndexes(), which makes an index per cell (slow for big blocks)."""
+        rows = set()
+        for selection_range in self.table_view.selectionModel().selection():
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        return sorted(rows)
+
+    def copy_selected_rows(self):
+        """Copy the selected rows to the clipboard as tab-separated text (see task_clipboard.py)."""
+        rows = self.selected_rows()
+        if not rows:
+            tracing.controller.debug("No row selected. Nothing to copy.")
+            return
+
+        QApplication.clipboard().setText(task_clipboard.rows_to_tsv(self.model.get_row_data(row) for row in rows))
+        tracing.controller.debug(lambda: f"Copied {len(rows)} row/s to the clipboard.")
 
-            if delete_success:  # update task sequences
-                logging.debug(f"Row deleted successfully. Updating task sequences")
+    def paste_rows(self):
+        """
+        Insert the clipboard's tasks as one block after the selected rows (before the last row if nothing, or the
+        last row, is selected). The rows below start later and the last task gives up the time.
 
-                # update task sequences of all rows below the deleted row
-                for row in range(row_to_delete, self.model.rowCount()):
-                    logging.debug(f"Updating sequence for row:{row}. Sequence:{row + 1}")
-                    self.model.set_row_data(row, new_task_sequence=row + 1)
+        With several cells of the Duration or Task column selected, and one value per line on the clipboard, the
+        values overwrite those cells instead (see paste_into_column).
+        """
+        text = QApplication.clipboard().text()
+        column, cell_rows = self.selected_column_cells()
+        if len(cell_rows) > 1 and self.model.column_keys[column] in PASTE_OVER_COLUMNS and '\t' not in text:
+            self.paste_into_column(text.splitlines(), column, cell_rows)
+            return
 
+        tasks = task_clipboard.parse_tsv(text)
+        if not tasks:
+            tracing.controller.debug("Nothing to paste.")
+            return
 
+        last_row = self.model.rowCount() - 1
+        rows = self.selected_rows()
+        position = min(rows[-1] + 1, last_row) if rows else last_row
+
+        with self.model.change_feed.operation('Paste'):  # One undo step, one journal record
+            if self.model.insert_task_block(position, tasks):
+                self.table_view.scrollTo(self.model.index(position, 0))
+                tracing.controller.debug(lambda: f"Pasted {len(tasks)} task/s at row {position}.")
+
+    def paste_into_column(self, lines, column, rows):
+        """
+        Write one line per selected cell, top to bottom (a single line fills every cell). The edits are one edit
+        batch: the schedule is solved once for all the durations, and it's one undo step.
+        """
+        values = [line.strip() for line in lines if line.strip()]
+        if not values:
+            tracing.controller.debug("Nothing to paste.")
+            return
+        if len(values) == 1:
+            values = values * len(rows)
+
+        if self.model.column_keys[column] == 'duration':
+            rows = [row for row in rows if row != self.model.rowCount() - 1]  # The last task's duration is derived
+
+        with self.model.edit_batch('Paste'):
+            for row, value in zip(rows, values):
+                self.model.setData(self.model.index(row, column), value)
+        tracing.controller.debug(lambda: f"Pasted {min(len(rows), len(values))} value/s into column {column}.")
+
+    def selected_column_cells(self):
+        """(column, rows) if the selected cells are all in one column, else (None, [])."""
+        selection_ranges = list(self.table_view.selectionModel().selection())
+        columns = {column for selection_range in selection_ranges
+                   for column in range(selection_range.left(), selection_range.right() + 1)}
+        if len(columns) != 1:
+            return None, []
+        return columns.pop(), self.selected_rows()
 
     def save_task(self, task_data):
         pass
\ No newline at end of file
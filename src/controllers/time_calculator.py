@@ -1,9 +1,56 @@
+"""
+Schedule engine. Keeps the day one unbroken chain when a task's duration or one of its boundaries changes.
+
+Each task starts when the one above ends. Anchors are times that never move: the start of the first task and the end
+of the last one (midnight to midnight), and the start of any task whose TaskConstraints are 'anchored'. Between two
+anchors the durations always add up to the same span, so the day still sums to 24 hours. A task's constraints are
+columns of its row ('min_duration', 'max_duration', 'anchored'), set with 'Limits' and saved with the task.
+
+A change of 'delta' minutes in one task is absorbed by one other task, which has to have the slack for all of it.
+Slack is how far a task can shrink (down to its min_duration) or grow (up to its max_duration). The tasks are tried in
+this order, and the first with enough slack takes the change:
+- the next task (as the day has always been edited: the task below gives or takes the time)
+- the last task before the next anchor (usually 'Sleep'), then the tasks above it, up to the next task
+- the task above, then the first task after the previous anchor and the tasks below it
+So an edit never quietly shrinks several tasks down to their minimum. An edit batch (several durations at once) is
+solved in one pass: its net change between two anchors is absorbed the same way (see solve_durations).
+
+Only the tasks from the topmost to the bottommost one that changed get new times: a change the next task absorbs
+costs O(1), one the last task absorbs costs O(tasks in between), whose times all move. When no task has enough slack,
+ScheduleError is raised and nothing is changed.
+"""
 import logging
 from datetime import timedelta
+from itertools import chain
+from typing import List, NamedTuple, Optional, Tuple
 
+MIN_DURATION = 1  # Minutes
 
-class TimeCalculator:
 
+class ScheduleError(ValueError):
+    """The change can't be made without breaking a constraint. The message is meant for the user."""
+
+
+class TaskConstraints(NamedTuple):
+    min_duration: int = MIN_DURATION
+    max_duration: Optional[int] = None  # None: no limit
+    anchored: bool = False  # The task's start time can't move
+
+
+DEFAULT_CONSTRAINTS = TaskConstraints()
+
+
+class ScheduleChange(NamedTuple):
+    """New (from_time, to_time, duration) of rows first_row, first_row + 1, ... Rows outside keep their times."""
+    first_row: int
+    times: List[Tuple]
+
+    @property
+    def last_row(self):
+        return self.first_row + len(self.times) - 1
+
+
+class TimeCalculator:
     def calculate_data(self, to_time_row_above, task_sequence_row_above):
         logging.debug(f"Calculating data to insert in new row.")
 
@@ -23,267 +70,214 @@ class TimeCalculator:
 
         return data_to_insert
 
-
-
-    def handle_task_name_input(self, index, row, value, role):
-        task_col_key = 'task_name'
-        original_task_name = self._data[row][task_col_key]
-
-        if original_task_name == value:
-            logging.debug(f"Same value in 'Task' column. Returning without any changes.")
-            return False
-
-        else:
-            return self.set_task_name_and_notify(index, row, value, role)
-
-    def handle_duration_input(self, index, row, value, role):
-        logging.debug(f"Change in duration")
-        focus_widget = QApplication.focusWidget()
-
-        original_duration = self._data[row]['duration']
-
-        if value == "":
-            logging.debug(f"Input value is empty:'{value}'")
-            return False
-
-        try:
-            input_duration_int = helper_fn.strip_text(value)
-
-        except Exception as e:
-            logging.error(f"Exception type:{type(e)} when striping input duration string (Error Description:{e}")
-            return False
-
-        if input_duration_int == 0 or input_duration_int < 0:
-            QMessageBox.warning(focus_widget, "Can't be zero.", "The task has to be at least of one minute duration.")
-            return False
-
-        if original_duration != input_duration_int:  # If the input value is not equal to original
-            if row == (len(self._data) - 1):
-                logging.debug(f"Row edited is the last row. Index:'{row}'. Setting 'Duration' and updating 'to_time'.")
-                return self.on_duration_input_same_row(index, row, input_duration_int, role)
-
-            else:
-                logging.debug(f"Next row exists. Calling methods to update its values.")
-                return self.on_duration_input_next_row(index, row, input_duration_int, role)
-
-        else:
-            logging.debug(f"Same value in 'Duration'. Returning without any changes.")
-            return False
-
-    def on_duration_input_same_row(self, index, row, input_duration_int, role):
-
-        try:
-            original_from = self._data[row]['from_time']
-            new_to = original_from + timedelta(minutes=input_duration_int)
-
-        except Exception as e:
-            logging.error(f"Exception type:{type(e)} when updating 'from' after setting new duration (Error Description:{e}")
-            return False
-
-        try:
-            self._data[row]['duration'] = input_duration_int  # Set the value to new_duration integer
-            self._data[row]['to_time'] = new_to  # Set the 'To' value to new calculated one
-
-        except Exception as e:
-            logging.error(f"Exception type:{type(e)} when setting input duration and calculated new 'to_time.' (Error Description:{e}")
-            return False
-
-        logging.debug(f"setData in 'duration'({input_duration_int} and 'to_time' {new_to}. Emitting dataChanged signals now.")
-        self.dataChanged.emit(index, index, [role])  # Emit for 'From_time'
-
-        to_time_index = self.createIndex(row, 1)  # to_time column index = 1
-        self.dataChanged.emit(to_time_index, to_time_index, [role])  # Emit for 'to_time'
-
-        return True
-
-    def on_duration_input_next_row(self, index, row, input_duration_int, role):
-
-        focus_widget = QApplication.focusWidget()
-
-        next_row = row + 1
-        original_from_next_row = self._data[next_row]['from_time']
-        original_to_next_row = self._data[next_row]['to_time']
-        original_duration_next_row = self._data[next_row]['duration']
-
-        logging.debug(
-            f"Next row values."
-            f"start:'{original_from_next_row}'. To:{original_to_next_row}. Duration:{original_duration_next_row}"
-            )
-
-        try:
-            original_duration = self._data[row]['duration']
-            max_possible_duration = original_duration + original_duration_next_row
-
-            if input_duration_int < max_possible_duration:
-                # Duration same row
-
-                # set
-                logging.debug(f"Setting input duration ({input_duration_int}) in the same row.")
-                self._data[row]['duration'] = input_duration_int  # Set the value to new_duration integer
-
-                # Emit
-                logging.debug(f"Emitting dataChanged for Duration in the same row.")
-                self.dataChanged.emit(index, index, [role])
-
-                # "To Time" same row
-
-                # set
-                logging.debug(f"Setting new 'to_time' in the same row.")
-                original_from_same_row = self._data[row]['from_time']
-                new_to_same_row = original_from_same_row + timedelta(minutes=input_duration_int)
-                self._data[row]['to_time'] = new_to_same_row
-                logging.debug(f"new 'to_time' same row:{new_to_same_row} set.")
-
-                # Emit
-                to_time_same_row_index = self.createIndex(row, 1)
-                self.dataChanged.emit(to_time_same_row_index, to_time_same_row_index, [role])
-
-                # "From Time" next row
-
-                # set
-                logging.debug(f"Setting new 'from_time' in the next row.")
-                self._data[next_row]['from_time'] = new_to_same_row  # set same as 'to_time' of row above
-
-                # Emit
-                logging.debug(f"Emitting dataChanged for 'from_time' in the next row.")
-                new_from_next_row_index = self.createIndex(row, 0)
-                self.dataChanged.emit(new_from_next_row_index, new_from_next_row_index, [role])
-
-                # 'Duration' next row
-
-                # set
-                logging.debug(f"Setting new 'duration' in the next row.")
-                original_to_next_row = self._data[next_row]['to_time']
-                new_time_diff_next_row = (original_to_next_row - new_to_same_row)  # This is in timedelta
-                self._data[next_row]['duration'] = int(new_time_diff_next_row.total_seconds() / 60)
-
-                # Emit
-                logging.debug(f"Emitting dataChanged for 'duration' in the next row.")
-                duration_next_row_index = self.createIndex(next_row, 2)  # duration column index = 2
-                self.dataChanged.emit(duration_next_row_index, duration_next_row_index, [role])  # Emit for 'duration'
-
-                return True
-
-            else:
-                logging.warning(f"Duration cannot be more than {max_possible_duration}")
-                QMessageBox.warning(
-                    focus_widget, f"Invalid. Input less than {max_possible_duration}",
-                    "The task below has to be at least of one minute duration."
-                    f"Therefore the duration for this task cannot be more than {max_possible_duration}."
-                    )
-                return False
-
-        # Value isn't an integer
-        except ValueError:
-            QMessageBox.warning(focus_widget, "Invalid Duration", "Please input a valid number for duration.")
-            logging.error(f"Input duration value isn't a valid integer. Input: {input_duration_int}")
-            return False
-
-        except Exception as e:
-            QMessageBox.warning(focus_widget, "Unknown Exception", "Please restart.")
-            logging.error(f"Exception type:{type(e)} after input in duration. Input value: {input_duration_int}. Error:{e}")
-            return False
-
-    def set_and_update_fields_and_notify(self, value, row, column_key):
-
-        if column_key == 'duration':  # String input to Integer
-            logging.debug(f"Change in duration")
-            original_duration = self._data[row]['duration']
-
+    @staticmethod
+    def constraints_for(row_data):
+        min_duration = row_data.get('min_duration') or MIN_DURATION
+        max_duration = row_data.get('max_duration')
+        anchored = bool(row_data.get('anchored'))
+        if min_duration == MIN_DURATION and max_duration is None and not anchored:
+            return DEFAULT_CONSTRAINTS  # Most tasks
+        return TaskConstraints(max(min_duration, MIN_DURATION), max_duration, anchored)
+
+    @staticmethod
+    def check_constraints(row_data, constraints):
+        """Raise ScheduleError if the task's current duration doesn't meet 'constraints'."""
+        if constraints.max_duration is not None and constraints.max_duration < constraints.min_duration:
+            raise ScheduleError("The maximum duration can't be shorter than the minimum.")
+        if row_data['duration'] < constraints.min_duration:
+            raise ScheduleError(f"The task is {row_data['duration']} minutes long, less than the minimum.")
+        if constraints.max_duration is not None and row_data['duration'] > constraints.max_duration:
+            raise ScheduleError(f"The task is {row_data['duration']} minutes long, more than the maximum.")
+
+    def solve_duration(self, rows_data, row, new_duration):
+        """Give 'row' a new duration. Returns a ScheduleChange, or None if the duration is the same."""
+        return self.solve_durations(rows_data, {row: new_duration})
+
+    def solve_durations(self, rows_data, durations):
+        """
+        Give several rows new durations at once ({row: new duration}, an edit batch). The edited rows keep them. The
+        net change of the edited rows between two anchors is absorbed in one pass, by one of the other rows between
+        them (first the ones between the edited rows, then as for an edit of the whole span), so the result doesn't
+        depend on the order of the edits. Returns a ScheduleChange, or None if no duration changes.
+        """
+        for row, new_duration in durations.items():
             try:
-                input_duration_int = helper_fn.strip_text(value)
-
-            except Exception as e:
-                logging.error(f"Exception type:{type(e)} when striping input duration string (Error Description:{e}")
-                return False
-
-            if original_duration != input_duration_int:  # If the input value is not equal to original
-                duration_input_handled = self.handle_duration_input(row, input_duration_int)
-                return duration_input_handled
+                self._check_duration(rows_data[row], new_duration)
+            except ScheduleError as e:
+                if len(durations) == 1:
+                    raise
+                raise ScheduleError(f"Row {row + 1}: {e}") from None
+        if all(new_duration == rows_data[row]['duration'] for row, new_duration in durations.items()):
+            return None
 
+        new_durations = dict(durations)  # Rows edited to the same duration keep it too
+
+        for edited_rows in self._rows_between_anchors(rows_data, sorted(new_durations)):
+            delta = sum(new_durations[row] - rows_data[row]['duration'] for row in edited_rows)
+            if delta:
+                first_edited, last_edited = edited_rows[0], edited_rows[-1]
+                rows_in_between = (row for row in range(first_edited + 1, last_edited) if row not in new_durations)
+                absorbing_rows = chain(rows_in_between, self._absorbing_rows(rows_data, first_edited, last_edited))
+                self._absorb(rows_data, delta, absorbing_rows, new_durations)
+        return self._chain(rows_data, new_durations)
+
+    def _check_duration(self, row_data, new_duration):
+        constraints = self.constraints_for(row_data)
+        if new_duration < constraints.min_duration:
+            raise ScheduleError(f"The task has to be at least of {constraints.min_duration} minute/s duration.")
+        if constraints.max_duration is not None and new_duration > constraints.max_duration:
+            raise ScheduleError(f"The task can't be longer than {constraints.max_duration} minutes.")
+
+    def _rows_between_anchors(self, rows_data, sorted_rows):
+        """Split sorted rows into groups with no anchored start from the first of a group to the next group."""
+        groups = []
+        for row in sorted_rows:
+            if groups and not any(self._anchored(rows_data, between) for between in range(groups[-1][-1] + 1, row + 1)):
+                groups[-1].append(row)
             else:
-                logging.debug(f"Same value in 'Duration'. Returning without any changes.")
-                return False
-
-        if column_key == 'from_time':
-            logging.debug(f"Change detected in 'from_time'. Input value:'{value}'")
-            return self.handle_from_input(row, value)
-
-        if column_key == 'to_time':
-            logging.debug(f"Change detected in 'to_time'. Input value:'{value}'")
-            return self.handle_to_input(row, value)
-
-    def handle_from_input(self, row, user_input_value):
-        focus_widget = QApplication.focusWidget()
-
-        if row == 0:
-            logging.debug(f"Cannot change the starting time of the day.")
-            QMessageBox.warning(
-                focus_widget, "START time of the first task cannot be changed.",
-                "Cannot change the START time of the first task."
-                "First task always begins from midnight. "
-                )
-            return False
-
-        try:
-            input_from_dt = self.parse_datetime(user_input_value)
-            self._data[row]['from_time'] = input_from_dt
-
-            return True
-
-        # Value isn't an integer
-        except ValueError:
-            QMessageBox.warning(focus_widget, "Invalid 'START' time.", "Please input a valid START time for the task.")
-            logging.error(f"Input value isn't a valid time in format: 09:00 am/pm. Input: {user_input_value}")
-            return False
-
-        except Exception as e:
-            QMessageBox.warning(focus_widget, "Invalid Input", "Please input a valid START time for the task.")
-            logging.error(f"Exception type:{type(e)} after input in duration. Input value: {user_input_value}. Error:{e}")
-            return False
-
-    def handle_to_input(self, row, user_input_value):
-        focus_widget = QApplication.focusWidget()
-
-        try:
-            input_to_time = self.parse_datetime(user_input_value)
-            self._data[row]['to_time'] = input_to_time
-            return True
-
-        # Value isn't an integer
-        except ValueError:
-            QMessageBox.warning(focus_widget, "Invalid 'END' time.", "Please input a valid END time for the task.")
-            logging.error(f"Input value isn't a valid time in format: 09:00 am/pm. Input: {user_input_value}")
-            return False
-
-        except Exception as e:
-            QMessageBox.warning(focus_widget, "Invalid Input", "Please input a valid END time for the task.")
-            logging.error(f"Exception type:{type(e)} after input in duration. Input value: {user_input_value}. Error:{e}")
-            return False
-
-    def set_task_name_and_notify(self, index, row, value, role):
-        column_key = 'task_name'
-
-        try:
-            self._data[row][column_key] = value  # Task Name Set
-            self.dataChanged.emit(index, index, [role])
-            logging.debug(f"Emitting dataChanged signal after updating task_name at row:{row}.")
-            return True
-
-        except Exception as e:
-            logging.error(f"Exception type:{type(e)} when setting task name. Error: {e}")
-            return False
-
-    def parse_datetime(self, value):
-        """Parse datetime fields from string."""
-        try:
-            format_str = "%I:%M %p, %Y-%m-%d"
-            return datetime.strptime(f'{value}, 2023-01-01', format_str)
-
-        except ValueError:
-            QMessageBox.warning(self.parent_widget, "Invalid", "Please input a valid time in the format: 'HH:MM am/pm'.")
-            logging.error(f"Input value isn't a valid integer. Input: {value}")
+                groups.append([row])
+        return groups
+
+    def _absorb(self, rows_data, delta, rows, new_durations):
+        """Take 'delta' minutes from (or give -delta to) the first of 'rows' with the slack for all of it."""
+        for other_row in rows:
+            if other_row in new_durations:
+                continue
+            other_data = rows_data[other_row]
+            other_constraints = self.constraints_for(other_data)
+
+            if delta > 0:  # The other task gives time
+                slack = other_data['duration'] - other_constraints.min_duration
+            elif other_constraints.max_duration is None:
+                slack = -delta
+            else:
+                slack = other_constraints.max_duration - other_data['duration']
+
+            if slack >= abs(delta):
+                new_durations[other_row] = other_data['duration'] - delta
+                return
+
+        if delta > 0:
+            raise ScheduleError(f"No other task can give {delta} minutes and keep its minimum duration. "
+                                f"Shorten another task first.")
+        raise ScheduleError(f"No other task can take {-delta} more minutes without going over its maximum. "
+                            f"Lengthen another task first.")
+
+    def solve_range_total(self, rows_data, first_row, last_row, target_total):
+        """
+        Scale the durations of first_row..last_row proportionally so that they add up to 'target_total' minutes
+        (see proportional_durations). The difference from their current total is absorbed by one task outside the
+        range, chosen like for a duration edit. Returns a ScheduleChange, or None if nothing changes.
+        """
+        if any(self.constraints_for(rows_data[row]).anchored for row in range(first_row + 1, last_row + 1)):
+            raise ScheduleError("A task in the selection has a fixed START time, so the selection can't be resized.")
+
+        rows_in_range = range(first_row, last_row + 1)
+        durations = [rows_data[row]['duration'] for row in rows_in_range]
+        min_durations = [self.constraints_for(rows_data[row]).min_duration for row in rows_in_range]
+        scaled = self.proportional_durations(durations, target_total, min_durations)
+
+        new_durations = {row: duration for row, duration in zip(rows_in_range, scaled)
+                         if duration != rows_data[row]['duration']}
+        if not new_durations:
             return None
-        except Exception as e:
-            logging.error(f"Exception when parsing datetime in setData: {type(e)} - {e}")
-            return None
\ No newline at end of file
+
+        delta = target_total - sum(durations)
+        if delta:
+            self._absorb(rows_data, delta, self._absorbing_rows(rows_data, first_row, last_row), new_durations)
+        return self._chain(rows_data, new_durations)
+
+    @staticmethod
+    def proportional_durations(durations, target_total, min_durations=None):
+        """
+        Integer durations proportional to 'durations' that add up to exactly 'target_total'.
+
+        Growing, every task gets its share of the target. Shrinking, only the time above each task's minimum is
+        scaled, so none goes below it. Shares are computed in integers (no float error) and the minutes left over by
+        rounding down go to the largest remainders, ties to the earlier task (largest-remainder method).
+        """
+        if min_durations is None:
+            min_durations = [MIN_DURATION] * len(durations)
+
+        minimum_total = sum(min_durations)
+        if target_total < minimum_total:
+            raise ScheduleError(f"The selected tasks need at least {minimum_total} minutes. Got {target_total}.")
+
+        if target_total >= sum(durations):
+            bases, weights = [0] * len(durations), durations
+        else:
+            bases = min_durations
+            weights = [duration - min_duration for duration, min_duration in zip(durations, min_durations)]
+
+        total_weight = sum(weights)
+        to_share = target_total - sum(bases)
+        if total_weight == 0:  # All at their minimum (or all zero): share equally
+            weights, total_weight = [1] * len(durations), len(durations)
+
+        quotients_and_remainders = [divmod(weight * to_share, total_weight) for weight in weights]
+        scaled = [base + quotient for base, (quotient, _) in zip(bases, quotients_and_remainders)]
+
+        left_over = target_total - sum(scaled)
+        by_remainder = sorted(range(len(scaled)), key=lambda index: -quotients_and_remainders[index][1])
+        for index in by_remainder[:left_over]:
+            scaled[index] += 1
+        return scaled
+
+    def solve_boundary(self, rows_data, row, new_start):
+        """Move the start of 'row' (and so the end of the row above) to 'new_start'."""
+        if row == 0 or self.constraints_for(rows_data[row]).anchored:
+            raise ScheduleError("The START time of this task is fixed.")
+
+        row_above = rows_data[row - 1]
+        new_duration_above = int((new_start - row_above['from_time']).total_seconds() // 60)
+        if new_duration_above < MIN_DURATION:
+            raise ScheduleError("The START time has to be after the START time of the task above.")
+        return self.solve_duration(rows_data, row - 1, new_duration_above)
+
+    def solve_end(self, rows_data, row, new_end):
+        """Move the end of 'row' to 'new_end'."""
+        new_duration = int((new_end - rows_data[row]['from_time']).total_seconds() // 60)
+        if new_duration < MIN_DURATION:
+            raise ScheduleError("The END time has to be after the START time.")
+        return self.solve_duration(rows_data, row, new_duration)
+
+    def _absorbing_rows(self, rows_data, first_row, last_row):
+        """
+        Rows that can absorb a change of first_row..last_row, in the order they're tried (see the module docstring).
+        The rows past the next one are only walked if the next one can't take the change.
+        """
+        next_row = last_row + 1
+        if next_row < len(rows_data) and not self._anchored(rows_data, next_row):
+            yield next_row
+            next_anchor = next_row + 1
+            while next_anchor < len(rows_data) and not self._anchored(rows_data, next_anchor):
+                next_anchor += 1
+            yield from range(next_anchor - 1, next_row, -1)  # The last task before the anchor, then up
+
+        if first_row > 0 and not self._anchored(rows_data, first_row):  # The start of first_row can move
+            yield first_row - 1
+            previous_anchor = first_row - 1
+            while previous_anchor > 0 and not self._anchored(rows_data, previous_anchor):
+                previous_anchor -= 1
+            yield from range(previous_anchor, first_row - 1)  # The first task after the anchor, then down
+
+    def _anchored(self, rows_data, row):
+        return self.constraints_for(rows_data[row]).anchored
+
+    @staticmethod
+    def _chain(rows_data, new_durations):
+        """Chain the times of the rows between the first and last changed ones. Their span doesn't change."""
+        first_row, last_row = min(new_durations), max(new_durations)
+
+        times = []
+        start = rows_data[first_row]['from_time']
+        for row in range(first_row, last_row + 1):
+            duration = new_durations.get(row, rows_data[row]['duration'])
+            end = start + timedelta(minutes=duration)
+            times.append((start, end, duration))
+            start = end
+
+        if start != rows_data[last_row]['to_time']:
+            logging.error(f"Schedule solve moved the end of row {last_row} from {rows_data[last_row]['to_time']} "
+                          f"to {start}. The durations in rows {first_row}-{last_row} don't match their times.")
+        return ScheduleChange(first_row, times)
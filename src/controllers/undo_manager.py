@@ -0,0 +1,273 @@
+"""
+Undo/redo for model edits, built on QUndoStack.
+
+Every ChangeSet from the model's change-feed becomes one DeltaCommand, so a setData edit, 'New Task' or 'Delete' is
+undone as a whole. A command only keeps the field-level delta of the rows it touched (old and new values), plus
+the full values of inserted and removed rows. Consecutive duration edits of the same cell are merged into one command,
+even when they took their time from different neighbours.
+
+Sequence keys belong to the model (see sequence_keys.py): deltas don't keep 'task_sequence', rows are put back in
+order by their moves and indexes, and a change set that only rebalanced keys isn't an undo step.
+
+History is capped by bytes, not by count: when the deltas held in memory exceed MAX_MEMORY_BYTES, the oldest are
+pickled to a spill file and read back only if they're undone again. UNDO_LIMIT caps the (small) commands themselves.
+"""
+import logging
+import pickle
+import tempfile
+from collections import deque
+
+from PyQt6 import sip
+from PyQt6.QtGui import QUndoCommand, QUndoStack
+
+MAX_MEMORY_BYTES = 2 * 1024 * 1024
+UNDO_LIMIT = 10_000
+DURATION_EDIT_COMMAND_ID = 1  # QUndoCommand.id() of mergeable duration edits
+
+
+class Delta:
+    """Field-level changes of one operation. Plain tuples and dicts, so it pickles compactly."""
+    __slots__ = ('inserts', 'updates', 'removals', 'moves')
+
+    def __init__(self, inserts, updates, removals, moves=()):
+        self.inserts = inserts  # [(row id, row, values)]
+        self.updates = updates  # {row id: {column key: (old, new)}}
+        self.removals = removals  # [(row id, row, values)]
+        self.moves = moves  # [(row id, from row, to row)]
+
+    @classmethod
+    def from_change_set(cls, change_set):
+        updates = {}
+        for update in change_set.updates:
+            fields = {field: (change.old, change.new) for field, change in update.fields.items()
+                      if field != 'task_sequence'}
+            if fields:
+                updates[update.row_id] = fields
+
+        return cls(
+            [(insert.row_id, insert.row, insert.values) for insert in change_set.inserts],
+            updates,
+            [(removal.row_id, removal.row, removal.values) for removal in change_set.removals],
+            [(move.row_id, move.from_row, move.to_row) for move in change_set.moves],
+            )
+
+    def is_empty(self):
+        return not (self.inserts or self.updates or self.removals or self.moves)
+
+    def __getstate__(self):
+        return self.inserts, self.updates, self.removals, self.moves
+
+    def __setstate__(self, state):
+        self.inserts, self.updates, self.removals, self.moves = state
+
+
+class SpillFile:
+    """Append-only temporary file of pickled deltas. Deleted when closed."""
+
+    def __init__(self):
+        self._file = None
+
+    def write(self, delta):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix='routine_undo_')
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        self._file.write(pickle.dumps(delta, protocol=pickle.HIGHEST_PROTOCOL))
+        return offset, self._file.tell() - offset
+
+    def read(self, location):
+        offset, length = location
+        self._file.seek(offset)
+        return pickle.loads(self._file.read(length))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DeltaCommand(QUndoCommand):
+    def __init__(self, manager, operation, delta, cell=None):
+        super().__init__(operation)
+        self.manager = manager
+        self.operation = operation
+        self.delta = delta  # None while spilled
+        self.spill_location = None
+        self.size_bytes = len(pickle.dumps(delta, protocol=pickle.HIGHEST_PROTOCOL))
+        self.already_applied = True  # QUndoStack.push() calls redo(), but the edit has already been made
+        self.merged = False  # Set when merged into the previous command (Qt then deletes this one)
+
+        self.edited_cell = None  # For merging: (row id, 'duration') of a duration edit
+        if cell is not None and cell[1] == 'duration' and not delta.inserts and not delta.removals:
+            self.edited_cell = cell
+
+    def id(self):
+        return DURATION_EDIT_COMMAND_ID if self.edited_cell else -1
+
+    def mergeWith(self, other):
+        """
+        Merge a following duration edit of the same cell: keep this command's old values, take the new ones. Fields
+        only the other edit wrote take its old values, which are still the ones from before this command.
+        """
+        if self.delta is None or other.edited_cell != self.edited_cell:
+            return False
+
+        for row_id, fields in other.delta.updates.items():
+            own_fields = self.delta.updates.setdefault(row_id, {})
+            for field, (old, new) in fields.items():
+                own_old = own_fields[field][0] if field in own_fields else old
+                own_fields[field] = (own_old, new)
+
+        other.merged = True
+        self.manager.memory_bytes -= self.size_bytes + other.size_bytes
+        self.size_bytes = len(pickle.dumps(self.delta, protocol=pickle.HIGHEST_PROTOCOL))
+        self.manager.memory_bytes += self.size_bytes
+        return True
+
+    def load_delta(self):
+        if self.delta is None:
+            self.delta = self.manager.spill_file.read(self.spill_location)
+            self.manager.memory_bytes += self.size_bytes
+            self.manager.track(self)
+        return self.delta
+
+    def undo(self):
+        self.manager.apply(self.load_delta(), undo=True, operation=f'Undo {self.operation}')
+
+    def redo(self):
+        if self.already_applied:
+            self.already_applied = False
+            return
+        self.manager.apply(self.load_delta(), undo=False, operation=f'Redo {self.operation}')
+
+
+class UndoManager:
+    def __init__(self, model):
+        self.model = model
+        self.undo_stack = QUndoStack()
+        self.undo_stack.setUndoLimit(UNDO_LIMIT)
+
+        self.spill_file = SpillFile()
+        self.memory_bytes = 0  # Deltas held in memory
+        self.commands_in_memory = deque()  # Least recently used first. Candidates for spilling.
+        self._applying = False
+
+        self.subscription = model.change_feed.subscribe(self.on_changes, kinds={'update', 'insert', 'remove', 'move'})
+
+    def on_changes(self, change_set):
+        if self._applying:  # Our own undo/redo
+            return
+
+        delta = Delta.from_change_set(change_set)
+        if delta.is_empty():  # Only sequence keys changed (a rebalance)
+            return
+
+        self.forget_redo_history()  # push() deletes the commands that could have been redone
+
+        command = DeltaCommand(self, change_set.operation, delta, change_set.cell)
+        self.memory_bytes += command.size_bytes
+        self.undo_stack.push(command)  # May merge it into the previous command instead
+
+        if not command.merged:
+            self.track(command)
+        self.spill_old_history()
+
+    def forget_redo_history(self):
+        for index in range(self.undo_stack.index(), self.undo_stack.count()):
+            command = self.undo_stack.command(index)
+            if command.delta is not None:
+                self.memory_bytes -= command.size_bytes
+                command.delta = None
+
+    def track(self, command):
+        self.commands_in_memory.append(command)
+
+    def spill_old_history(self):
+        while self.memory_bytes > MAX_MEMORY_BYTES and len(self.commands_in_memory) > 1:
+            command = self.commands_in_memory.popleft()
+            if command.delta is None:
+                continue
+            if sip.isdeleted(command):  # Dropped by the undo limit
+                self.memory_bytes -= command.size_bytes
+                command.delta = None
+                continue
+            try:
+                command.spill_location = self.spill_file.write(command.delta)
+            except OSError as e:
+                logging.error(f"Exception type:{type(e)} when spilling undo history (Error Description:{e}")
+                return
+            command.delta = None
+            self.memory_bytes -= command.size_bytes
+
+    def apply(self, delta, undo, operation):
+        """Apply a delta forwards (redo) or backwards (undo) as one change-feed operation."""
+        self._applying = True
+        try:
+            with self.model.change_feed.operation(operation):
+                if undo:  # The reverse of the change-feed's order: moves, removals, updates, inserts
+                    self._move_rows(delta.moves, undo=True)
+                    self._restore_rows(delta.removals)
+                    self.model.set_fields_by_id({row_id: {field: old for field, (old, _) in fields.items()}
+                                                 for row_id, fields in delta.updates.items()})
+                    self._remove_rows(delta.inserts)
+                else:
+                    self._restore_rows(delta.inserts)
+                    self.model.set_fields_by_id({row_id: {field: new for field, (_, new) in fields.items()}
+                                                 for row_id, fields in delta.updates.items()})
+                    self._remove_rows(delta.removals)
+                    self._move_rows(delta.moves, undo=False)
+        finally:
+            self._applying = False
+
+    def _restore_rows(self, rows):
+        """Restore rows at their original indexes. Consecutive rows (a pasted block) are restored in one go."""
+        for first_row, run in self._runs(sorted(rows, key=lambda entry: entry[1])):
+            self.model.restore_rows(min(first_row, self.model.rowCount()),
+                                    [dict(values, id=row_id) for row_id, _, values in run])
+
+    def _remove_rows(self, rows):
+        row_ids = {row_id for row_id, _, _ in rows}
+        if not row_ids:
+            return
+        row_index_by_id = self.model.row_index_by_id()
+        current_rows = sorted(row_index_by_id[row_id] for row_id in row_ids if row_id in row_index_by_id)
+        for first_row, run in reversed(self._runs([(None, row, None) for row in current_rows])):
+            if len(run) == 1:
+                self.model.delete_row_and_data(first_row)
+            else:
+                self.model.delete_rows(first_row, len(run))
+
+    def _move_rows(self, moves, undo):
+        """Put moved rows back at their 'from' indexes (undo) or at their 'to' indexes (redo), a block at a time."""
+        if not moves:
+            return
+        targets = sorted((from_row if undo else to_row, row_id) for row_id, from_row, to_row in moves)
+
+        for first_target, run in self._runs([(row_id, target, None) for target, row_id in targets]):
+            row_index_by_id = self.model.row_index_by_id()
+            current_rows = [row_index_by_id.get(row_id) for row_id, _, _ in run]
+            if None in current_rows:
+                logging.warning(f"Moved row/s not found. {len(run)} row/s weren't moved back.")
+                continue
+
+            # Blocks that moved together are still together. Anything else is moved one row at a time.
+            if current_rows == list(range(current_rows[0], current_rows[0] + len(run))):
+                self.model.move_block(current_rows[0], len(run), first_target)
+            else:
+                for offset, (row_id, _, _) in enumerate(run):
+                    self.model.move_block(self.model.row_index_by_id()[row_id], 1, first_target + offset)
+
+    @staticmethod
+    def _runs(rows):
+        """Split (row id, row, values) entries sorted by row into runs of consecutive rows: [(first row, run)]."""
+        runs = []
+        for entry in rows:
+            if runs and entry[1] == runs[-1][0] + len(runs[-1][1]):
+                runs[-1][1].append(entry)
+            else:
+                runs.append((entry[1], [entry]))
+        return runs
+
+    def close(self):
+        self.model.change_feed.unsubscribe(self.subscription)
+        self.spill_file.close()
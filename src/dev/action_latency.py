@@ -0,0 +1,160 @@
+"""
+Latency of every action dispatched by Controller.signal_from_left_bar, kept as in-memory histograms.
+
+Histograms have log-spaced buckets (BUCKET_GROWTH apart, so percentiles are within ~5%), which keeps memory constant
+however many actions are recorded. Each action has a latency budget (ACTION_BUDGETS_MS, else DEFAULT_BUDGET_MS);
+actions over budget are counted and logged.
+
+The 'Latency' dev window shows p50/p95/p99 per action. With 'APP_LATENCY_EXPORT_S' set to a number of seconds, the
+histograms are also written to action_latency.json in the log folder at that interval and on exit.
+"""
+import json
+import logging
+import math
+import os
+from datetime import datetime
+
+from PyQt6.QtCore import QTimer
+
+EXPORT_ENV_KEY = 'APP_LATENCY_EXPORT_S'
+EXPORT_FILE_NAME = 'action_latency.json'
+
+DEFAULT_BUDGET_MS = 100  # Feels instant
+ACTION_BUDGETS_MS = {
+    'Save': 200,
+    }
+
+SMALLEST_BUCKET_MS = 0.01
+BUCKET_GROWTH = 1.1
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+
+class LatencyHistogram:
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = {}  # Bucket index: count
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @staticmethod
+    def bucket_index(milliseconds):
+        if milliseconds <= SMALLEST_BUCKET_MS:
+            return 0
+        return int(math.log(milliseconds / SMALLEST_BUCKET_MS) / _LOG_GROWTH) + 1
+
+    @staticmethod
+    def bucket_upper_ms(index):
+        return SMALLEST_BUCKET_MS * BUCKET_GROWTH ** index
+
+    def add(self, milliseconds):
+        index = self.bucket_index(milliseconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def percentile_ms(self, percent):
+        """Upper bound of the bucket holding the percentile (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.bucket_upper_ms(index), self.max_ms)
+        return self.max_ms
+
+
+class ActionLatencyRecorder:
+    def __init__(self):
+        self.histograms = {}  # Action name: LatencyHistogram
+        self.over_budget = {}  # Action name: count
+        self.started = datetime.now()
+        self._export_timer = None
+
+    @staticmethod
+    def budget_ms(action):
+        return ACTION_BUDGETS_MS.get(action, DEFAULT_BUDGET_MS)
+
+    def record(self, action, seconds):
+        milliseconds = seconds * 1000
+        histogram = self.histograms.get(action)
+        if histogram is None:
+            histogram = self.histograms[action] = LatencyHistogram()
+        histogram.add(milliseconds)
+
+        budget_ms = self.budget_ms(action)
+        if milliseconds > budget_ms:
+            self.over_budget[action] = self.over_budget.get(action, 0) + 1
+            logging.warning(f"Action '{action}' took {milliseconds:.1f} ms (budget {budget_ms} ms).")
+
+    def reset(self):
+        self.histograms.clear()
+        self.over_budget.clear()
+        self.started = datetime.now()
+
+    def rows(self):
+        """Per-action statistics as dictionaries, slowest p95 first."""
+        rows = []
+        for action, histogram in self.histograms.items():
+            rows.append({
+                'action': action,
+                'count': histogram.count,
+                'mean_ms': histogram.total_ms / histogram.count,
+                'p50_ms': histogram.percentile_ms(50),
+                'p95_ms': histogram.percentile_ms(95),
+                'p99_ms': histogram.percentile_ms(99),
+                'max_ms': histogram.max_ms,
+                'budget_ms': self.budget_ms(action),
+                'over_budget': self.over_budget.get(action, 0),
+                })
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def export(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as json_file:
+            json.dump({
+                'started': self.started.isoformat(timespec='seconds'),
+                'exported': datetime.now().isoformat(timespec='seconds'),
+                'bucket_growth': BUCKET_GROWTH,
+                'actions': self.rows(),
+                'buckets': {action: {f'{histogram.bucket_upper_ms(index):.3f}': count
+                                     for index, count in sorted(histogram.buckets.items())}
+                            for action, histogram in self.histograms.items()},
+                }, json_file, indent=2)
+
+    def export_to_log_folder(self):
+        from src.utils import helper_fn
+
+        log_folder_path = helper_fn.get_environment_cls(False, caller='ActionLatencyRecorder').LOG_FOLDER_PATH
+        try:
+            self.export(os.path.join(log_folder_path, EXPORT_FILE_NAME))
+        except OSError as e:
+            logging.error(f"Exception type:{type(e)} when exporting action latencies (Error Description:{e}")
+
+    def start_periodic_export(self):
+        """Queued by main(). Does nothing unless 'APP_LATENCY_EXPORT_S' is set."""
+        value = os.getenv(EXPORT_ENV_KEY)
+        if not value:
+            return
+        try:
+            interval_s = float(value)
+        except ValueError:
+            logging.warning(f"Invalid '{EXPORT_ENV_KEY}' value '{value}'. Periodic export is off.")
+            return
+
+        self._export_timer = QTimer()
+        self._export_timer.setInterval(max(1000, int(interval_s * 1000)))
+        self._export_timer.timeout.connect(self.export_to_log_folder)
+        self._export_timer.start()
+
+    def stop_periodic_export(self):
+        if self._export_timer is not None:
+            self._export_timer.stop()
+            self._export_timer = None
+            self.export_to_log_folder()  # Final state
+
+
+action_latency = ActionLatencyRecorder()
@@ -0,0 +1,188 @@
+"""
+On-demand cProfile and/or tracemalloc capture of one controller action or the next few seconds.
+
+Armed from the dev buttons: 'Profile Next' profiles the next action dispatched by Controller.signal_from_left_bar,
+'Profile Timed' profiles everything for 'APP_PROFILE_SECONDS' seconds (DEFAULT_CAPTURE_SECONDS if unset).
+'APP_PROFILE_MODE' chooses what is captured: 'cpu' (cProfile), 'memory' (tracemalloc) or 'both' (default).
+
+Each capture writes to the log folder:
+- profile_<label>_<time>.pstats (open with pstats or snakeviz)
+- allocations_<label>_<time>.txt (top allocation sites of memory allocated during the capture and still alive)
+and emits 'capture_finished' with the top functions and allocation sites for the in-app report.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import tracemalloc
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+MODE_ENV_KEY = 'APP_PROFILE_MODE'
+SECONDS_ENV_KEY = 'APP_PROFILE_SECONDS'
+DEFAULT_CAPTURE_SECONDS = 10
+TOP_ENTRIES = 25
+TRACEMALLOC_FRAMES = 10
+
+_IGNORED_ALLOCATION_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<unknown>')
+
+
+def capture_modes():
+    """Return (cpu, memory) from 'APP_PROFILE_MODE'."""
+    mode = os.getenv(MODE_ENV_KEY, 'both').lower()
+    if mode not in ('cpu', 'memory', 'both'):
+        logging.warning(f"Unknown '{MODE_ENV_KEY}' value '{mode}'. Capturing both.")
+        mode = 'both'
+    return mode in ('cpu', 'both'), mode in ('memory', 'both')
+
+
+def capture_seconds():
+    try:
+        return float(os.getenv(SECONDS_ENV_KEY, DEFAULT_CAPTURE_SECONDS))
+    except ValueError:
+        return DEFAULT_CAPTURE_SECONDS
+
+
+class ActionProfiler(QObject):
+    capture_finished = pyqtSignal(str, list)  # Label, report rows
+
+    def __init__(self):
+        super().__init__()
+        self.armed_for_next_action = False
+        self.last_report = []  # Rows of the last capture, for the report window
+        self.last_label = None
+
+        self._profile = None
+        self._tracing_memory = False
+        self._label = None
+        self._timer = None
+
+    @property
+    def capturing(self):
+        return self._label is not None
+
+    def arm_next_action(self):
+        if self.capturing:
+            logging.warning("A profile is already being captured.")
+            return
+        self.armed_for_next_action = True
+        logging.info("Profiler armed for the next action.")
+
+    def capture_for_seconds(self, seconds=None):
+        if self.capturing:
+            logging.warning("A profile is already being captured.")
+            return
+        seconds = seconds or capture_seconds()
+        self._start(f'{seconds:g}s')
+
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._stop)
+        self._timer.start(int(seconds * 1000))
+        logging.info(f"Profiling everything for {seconds:g} s.")
+
+    def action_started(self, action):
+        """Called by the controller before dispatching an action."""
+        if self.armed_for_next_action and not self.capturing:
+            self.armed_for_next_action = False
+            self._start(action)
+
+    def action_finished(self, action):
+        """Called by the controller after the action returned (or raised)."""
+        if self.capturing and self._timer is None and self._label == action:
+            self._stop()
+
+    def _start(self, label):
+        profile_cpu, profile_memory = capture_modes()
+        self._label = label
+
+        if profile_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._tracing_memory = True
+
+        if profile_cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+
+        snapshot = tracemalloc.take_snapshot() if self._tracing_memory else None
+        if self._tracing_memory:
+            tracemalloc.stop()
+
+        label, profile = self._label, self._profile
+        self._label = self._profile = self._timer = None
+        self._tracing_memory = False
+
+        file_prefix = f"{re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_')}_{datetime.now():%Y%m%d_%H%M%S}"
+        log_folder_path = self._log_folder_path()
+
+        rows = []
+        if profile is not None:
+            rows.extend(self._write_cpu_report(profile, os.path.join(log_folder_path, f'profile_{file_prefix}.pstats')))
+        if snapshot is not None:
+            rows.extend(self._write_memory_report(
+                snapshot, os.path.join(log_folder_path, f'allocations_{file_prefix}.txt')
+                ))
+
+        self.last_label, self.last_report = label, rows
+        self.capture_finished.emit(label, rows)
+
+    @staticmethod
+    def _log_folder_path():
+        from src.utils import helper_fn
+
+        return helper_fn.get_environment_cls(False, caller='ActionProfiler').LOG_FOLDER_PATH
+
+    @staticmethod
+    def _write_cpu_report(profile, file_path):
+        profile.dump_stats(file_path)
+        logging.info(f"CPU profile written to '{file_path}'.")
+
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = []
+        for (file_name, line, function_name), (_, calls, own_s, cumulative_s, _) in stats.stats.items():
+            rows.append({
+                'kind': 'function',
+                'location': f"{os.path.basename(file_name)}:{line} {function_name}",
+                'count': calls,
+                'own_ms': own_s * 1000,
+                'cumulative_ms': cumulative_s * 1000,
+                'size_kib': '',
+                })
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return rows[:TOP_ENTRIES]
+
+    @staticmethod
+    def _write_memory_report(snapshot, file_path):
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, pattern) for pattern in _IGNORED_ALLOCATION_FILES])
+        top_stats = snapshot.statistics('lineno')[:TOP_ENTRIES]
+
+        with open(file_path, 'w', encoding='utf-8') as report_file:
+            report_file.write(f"Top {TOP_ENTRIES} allocation sites (memory allocated during capture, still alive)\n\n")
+            for stat in top_stats:
+                report_file.write(f"{stat}\n")
+                for line in stat.traceback.format()[:6]:
+                    report_file.write(f"    {line}\n")
+        logging.info(f"Allocation report written to '{file_path}'.")
+
+        rows = []
+        for stat in top_stats:
+            frame = stat.traceback[0]
+            rows.append({
+                'kind': 'allocation',
+                'location': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                'count': stat.count,
+                'own_ms': '',
+                'cumulative_ms': '',
+                'size_kib': stat.size / 1024,
+                })
+        return rows
+
+
+action_profiler = ActionProfiler()
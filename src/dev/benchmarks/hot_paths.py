@@ -0,0 +1,516 @@
+"""
+Benchmarks for the model, persistence, painting and time-calculation hot paths.
+
+Each benchmark runs against a fresh copy of a fixture database with the requested number of rows and is repeated
+'--repeats' times. Results (every sample, plus median and min) are printed and written as JSON.
+
+Run from the repository root. Headless runs need the offscreen Qt platform:
+
+    QT_QPA_PLATFORM=offscreen python -m src.dev.benchmarks.hot_paths --sizes 100,10000,1000000 --json results.json
+    QT_QPA_PLATFORM=offscreen python -m src.dev.benchmarks.hot_paths --only table_model.data --sizes 10000
+    QT_QPA_PLATFORM=offscreen python -m src.dev.benchmarks.hot_paths --sizes 100,10000 --save  # Then result_store compare
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from PyQt6.QtCore import QRect, QT_VERSION_STR, Qt
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QApplication, QStyleOptionViewItem
+
+from src.dev.routine_generator import generate_routine_database
+from src.models.app_data import AppData
+from src.utils.service_registry import services
+
+DEFAULT_SIZES = (100, 10_000, 1_000_000)
+DEFAULT_REPEATS = 5
+FIXTURE_SEED = 1
+PAINT_PAGE_ROWS = 50  # Rows painted per sample (about two screens of the table)
+TASK_SERVICE_OPS = 10  # Inserts, deletes or moves per sample
+DURATION_EDITS = 200  # setData calls per sample
+PASTE_BLOCK_ROWS = 10_000  # Most rows pasted per sample
+
+BENCHMARKS = {}  # name: function(context) -> (list of sample seconds, operations per sample)
+
+
+def benchmark(name):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+class BenchmarkContext:
+    def __init__(self, rows, repeats, fixture_path, work_dir):
+        self.rows = rows
+        self.repeats = repeats
+        self.fixture_path = fixture_path
+        self.work_dir = work_dir
+
+    def fresh_database(self):
+        """Copy of the fixture, so that benchmarks that write don't affect each other."""
+        file_path = os.path.join(self.work_dir, f'bench_{time.perf_counter_ns()}.db')
+        shutil.copyfile(self.fixture_path, file_path)
+        return file_path
+
+    def open_model(self):
+        from src.models.table_model import TableModel
+
+        data_file_path = self.fresh_database()
+        services.register('app_data', lambda: AppData(data_file_path))
+        return TableModel()
+
+
+def time_call(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+@benchmark('app_data.get_all_entries')
+def bench_get_all_entries(context):
+    app_data = AppData(context.fresh_database())
+    samples = [time_call(app_data.get_all_entries) for _ in range(context.repeats)]
+    app_data.close()
+    return samples, 1
+
+
+@benchmark('table_model.save_to_database_file')
+def bench_save(context):
+    model = context.open_model()
+    samples = [time_call(model.save_to_database_file) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, 1
+
+
+@benchmark('table_model.data')
+def bench_data_full_scroll(context):
+    """Every cell of every row, display role, as a view would request them while scrolling top to bottom."""
+    model = context.open_model()
+    row_count, column_count = model.rowCount(), model.columnCount()
+    display_role = Qt.ItemDataRole.DisplayRole
+
+    def full_scroll():
+        for row in range(row_count):
+            for column in range(column_count):
+                model.data(model.index(row, column), display_role)
+
+    samples = [time_call(full_scroll) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, row_count * column_count
+
+
+@benchmark('table_delegate.paint')
+def bench_delegate_paint(context):
+    """Paint PAINT_PAGE_ROWS rows from the middle of the table into a QImage."""
+    from src.views.delegates.table_delegate import TableDelegate
+
+    model = context.open_model()
+    delegate = TableDelegate()
+    column_count = model.columnCount()
+    column_width, row_height = 160, 45
+
+    page_rows = min(PAINT_PAGE_ROWS, model.rowCount())
+    first_row = max(0, model.rowCount() // 2 - page_rows // 2)
+    image = QImage(column_width * column_count, row_height * page_rows, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def paint_page():
+        painter = QPainter(image)
+        option = QStyleOptionViewItem()
+        for page_row in range(page_rows):
+            for column in range(column_count):
+                option.rect = QRect(column * column_width, page_row * row_height, column_width, row_height)
+                delegate.paint(painter, option, model.index(first_row + page_row, column))
+        painter.end()
+
+    samples = [time_call(paint_page) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, page_rows * column_count
+
+
+@benchmark('task_service.create_new_task')
+def bench_create_new_task(context):
+    from src.controllers.task_services import TaskService
+    from src.views.table_view import TableView
+
+    model = context.open_model()
+    table_view = TableView()
+    table_view.setModel(model)
+    task_service = TaskService(model, table_view)
+
+    def create_tasks():
+        for _ in range(TASK_SERVICE_OPS):
+            task_service.create_new_task()
+
+    samples = [time_call(create_tasks) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, TASK_SERVICE_OPS
+
+
+@benchmark('task_service.remove_row_and_delete_data')
+def bench_remove_row(context):
+    """Delete from the middle of the table (every following row gets a new task_sequence)."""
+    from src.controllers.task_services import TaskService
+    from src.views.table_view import TableView
+
+    model = context.open_model()
+    table_view = TableView()
+    table_view.setModel(model)
+    task_service = TaskService(model, table_view)
+
+    def remove_rows():
+        for _ in range(TASK_SERVICE_OPS):
+            if model.rowCount() <= 2:
+                return
+            table_view.selectRow(model.rowCount() // 2)
+            task_service.remove_row_and_delete_data()
+
+    samples = [time_call(remove_rows) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, TASK_SERVICE_OPS
+
+
+@benchmark('task_service.move_rows')
+def bench_move_rows(context):
+    """Drag one row a short way down (one sequence key written, the rows in between get new times)."""
+    from src.controllers.task_services import TaskService
+    from src.views.table_view import TableView
+
+    model = context.open_model()
+    table_view = TableView()
+    table_view.setModel(model)
+    task_service = TaskService(model, table_view)
+
+    def move_rows():
+        for _ in range(TASK_SERVICE_OPS):
+            source_row = model.rowCount() // 2
+            task_service.move_rows(source_row, 1, min(source_row + 10, model.rowCount() - 1))
+
+    samples = [time_call(move_rows) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, TASK_SERVICE_OPS
+
+
+@benchmark('table_model.setData_duration')
+def bench_duration_edits(context):
+    """Duration edits spread over the table. Each one recalculates the row and the next row's times."""
+    model = context.open_model()
+    last_editable_row = model.rowCount() - 2  # The last row's duration isn't editable
+    if last_editable_row < 0:
+        model.close_database()
+        return [], 0
+
+    step = max(1, last_editable_row // DURATION_EDITS)
+    rows_to_edit = list(range(0, last_editable_row + 1, step))[:DURATION_EDITS]
+
+    def edit_durations():
+        for row in rows_to_edit:
+            duration = model.get_row_data(row, 'duration')
+            if duration > 1:
+                new_duration = duration - 1  # The next row grows by a minute
+            elif model.get_row_data(row + 1, 'duration') > 1:
+                new_duration = duration + 1  # The next row shrinks by a minute
+            else:
+                continue  # Both are one minute long. Any change would be rejected with a message box.
+            model.setData(model.index(row, 2), f"{new_duration} Minutes", Qt.ItemDataRole.EditRole)
+
+    samples = [time_call(edit_durations) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, len(rows_to_edit)
+
+
+@benchmark('table_model.setData_duration_batch')
+def bench_duration_edits_batch(context):
+    """The same spread of duration edits inside one edit batch (one schedule pass and one dataChanged at the end)."""
+    model = context.open_model()
+    last_editable_row = model.rowCount() - 2
+    if last_editable_row < 0:
+        model.close_database()
+        return [], 0
+
+    step = max(1, last_editable_row // DURATION_EDITS)
+    rows_to_edit = list(range(0, last_editable_row + 1, step))[:DURATION_EDITS]
+
+    def edit_durations():
+        with model.edit_batch('benchmark'):
+            for row in rows_to_edit:
+                duration = model.get_row_data(row, 'duration')
+                if duration > 1:  # Shrinking only, so the batch is always valid (the row below grows)
+                    model.setData(model.index(row, 2), f"{duration - 1} Minutes", Qt.ItemDataRole.EditRole)
+
+    samples = [time_call(edit_durations) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, len(rows_to_edit)
+
+
+@benchmark('task_service.paste_rows')
+def bench_paste_block(context):
+    """Copy a block of rows as TSV and paste it into the middle of the table (parse, insert, shift the rows below)."""
+    from src.controllers.task_services import TaskService
+    from src.models import task_clipboard
+    from src.views.table_view import TableView
+
+    model = context.open_model()
+    table_view = TableView()
+    table_view.setModel(model)
+    task_service = TaskService(model, table_view)
+
+    block_rows = min(PASTE_BLOCK_ROWS, model.rowCount() - 1)
+    text = task_clipboard.rows_to_tsv(model.get_row_data(row) for row in range(block_rows))
+
+    # Room in the last row for every sample's block, so no paste is rejected
+    last_row = model.rowCount() - 1
+    extra_minutes = sum(task.duration for task in task_clipboard.parse_tsv(text)) * context.repeats
+    model.set_row_data(last_row, new_to=model.get_row_data(last_row, 'to_time') + timedelta(minutes=extra_minutes),
+                       new_duration=model.get_row_data(last_row, 'duration') + extra_minutes)
+
+    def paste_block():
+        QApplication.clipboard().setText(text)
+        table_view.selectRow(model.rowCount() // 2)
+        task_service.paste_rows()
+
+    samples = [time_call(paste_block) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, block_rows
+
+
+@benchmark('time_calculator.solve_duration')
+def bench_schedule_solve(context):
+    """Solve (without applying) a spread of duration increases of up to 30 minutes, each absorbed by the next row."""
+    from src.controllers.time_calculator import MIN_DURATION, ScheduleError
+
+    model = context.open_model()
+    time_calculator = model.time_calculator
+    last_row = model.rowCount() - 1
+    step = max(1, last_row // DURATION_EDITS)
+    rows_to_solve = list(range(0, last_row, step))[:DURATION_EDITS]
+    # As much as the next row can give: a change the last row absorbs moves every row's times in between
+    new_durations = [model.get_row_data(row, 'duration')
+                     + min(30, model.get_row_data(row + 1, 'duration') - MIN_DURATION) for row in rows_to_solve]
+
+    def solve():
+        for row, new_duration in zip(rows_to_solve, new_durations):
+            try:
+                time_calculator.solve_duration(model._data, row, new_duration)
+            except ScheduleError:
+                pass
+
+    samples = [time_call(solve) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, len(rows_to_solve)
+
+
+@benchmark('table_model.resize_rows')
+def bench_resize_rows(context):
+    """Scale the durations of the middle half of the table to 90 % of their total (solve, write, one dataChanged)."""
+    model = context.open_model()
+    first_row = model.rowCount() // 4
+    last_row = first_row + model.rowCount() // 2 - 1
+
+    def resize_rows():
+        total = sum(model.get_row_data(row, 'duration') for row in range(first_row, last_row + 1))
+        model.resize_rows(first_row, last_row, max(total - total // 10, last_row - first_row + 1))
+
+    samples = [time_call(resize_rows) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, last_row - first_row + 1
+
+
+@benchmark('schedule_validator.validate')
+def bench_validate_schedule(context):
+    """Check the chain, durations and span of the whole schedule (runs on load and before save)."""
+    from src.models import schedule_validator
+
+    model = context.open_model()
+    samples = [time_call(lambda: schedule_validator.validate(model._data)) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, model.rowCount()
+
+
+@benchmark('task_tree.rebuild')
+def bench_task_tree_rebuild(context):
+    """Full rebuild of the task/subtask index (after an insert, removal, move or type change)."""
+    model = context.open_model()
+    samples = [time_call(model.task_tree.rebuild) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, model.rowCount()
+
+
+@benchmark('time_totals.rebuild')
+def bench_time_totals_rebuild(context):
+    """Minutes per type and per tag from scratch (what every edit would cost without the running totals)."""
+    model = context.open_model()
+    samples = [time_call(model.time_totals.rebuild) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, model.rowCount()
+
+
+@benchmark('time_totals.on_changes')
+def bench_time_totals_on_changes(context):
+    """Running totals following one-row duration edits, one ChangeSet each (a setData through the change-feed)."""
+    from src.models.change_feed import ChangeSet, FieldChange, RowUpdate
+
+    model = context.open_model()
+    model.time_totals.ensure_built()
+    step = max(1, model.rowCount() // DURATION_EDITS)
+    change_sets = []
+    for row in range(0, model.rowCount(), step):
+        row_data = model.get_row_data(row)
+        duration_change = FieldChange(row_data['duration'], row_data['duration'])  # Same old and new: totals unchanged
+        change_sets.append(ChangeSet('benchmark', (), (RowUpdate(row_data['id'], row, {'duration': duration_change}),),
+                                     (), ()))
+
+    def apply_changes():
+        for change_set in change_sets:
+            model.time_totals.on_changes(change_set)
+
+    samples = [time_call(apply_changes) for _ in range(context.repeats)]
+    model.close_database()
+    return samples, len(change_sets)
+
+
+def time_inputs(count):
+    """'count' 12-hour time strings like the app shows and copies ('09:05 PM'), spread over the whole day."""
+    return [f"{(minute // 60 + 11) % 12 + 1:02d}:{minute % 60:02d} {'AM' if minute < 720 else 'PM'}"
+            for minute in (index * 7 % (24 * 60) for index in range(count))]
+
+
+@benchmark('time_parser.parse_minutes')
+def bench_parse_minutes(context):
+    """Parse one time string per row with the memoised parser (cleared before each sample)."""
+    from src.utils.time_parser import parse_minutes
+
+    inputs = time_inputs(context.rows)
+
+    def parse_all():
+        parse_minutes.cache_clear()
+        for text in inputs:
+            parse_minutes(text)
+
+    return [time_call(parse_all) for _ in range(context.repeats)], len(inputs)
+
+
+@benchmark('time_parser.parse_minutes_uncached')
+def bench_parse_minutes_uncached(context):
+    """The parser's fast path alone, without the memo."""
+    from src.utils.time_parser import parse_minutes
+
+    inputs = time_inputs(context.rows)
+    parse_uncached = parse_minutes.__wrapped__
+
+    def parse_all():
+        for text in inputs:
+            parse_uncached(text)
+
+    return [time_call(parse_all) for _ in range(context.repeats)], len(inputs)
+
+
+@benchmark('time_parser.strptime')
+def bench_parse_strptime(context):
+    """Baseline: the same strings through datetime.strptime, as the app parsed them before time_parser."""
+    inputs = time_inputs(context.rows)
+
+    def parse_all():
+        for text in inputs:
+            parsed = datetime.strptime(text, "%I:%M %p")
+            parsed.hour * 60 + parsed.minute
+
+    return [time_call(parse_all) for _ in range(context.repeats)], len(inputs)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+            ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeats, only=None):
+    results = []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in sizes:
+            fixture_path = os.path.join(work_dir, f'fixture_{rows}.db')
+            fixture_seconds = time_call(lambda: generate_routine_database(fixture_path, rows, seed=FIXTURE_SEED))
+            print(f"Fixture with {rows} rows created in {fixture_seconds:.2f} s.", file=sys.stderr)
+
+            context = BenchmarkContext(rows, repeats, fixture_path, work_dir)
+
+            for name, function in BENCHMARKS.items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+
+                samples, operations = function(context)
+                if not samples:
+                    continue
+
+                median_s = statistics.median(samples)
+                results.append({
+                    'name': name,
+                    'rows': rows,
+                    'repeats': len(samples),
+                    'operations_per_sample': operations,
+                    'samples_s': samples,
+                    'median_s': median_s,
+                    'min_s': min(samples),
+                    'per_operation_median_s': median_s / operations,
+                    })
+                print(f"{name:<45} rows={rows:<8} median={median_s * 1000:10.3f} ms  "
+                      f"per op={median_s / operations * 1e6:10.3f} us", file=sys.stderr)
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'qt': QT_VERSION_STR,
+            'platform': platform.platform(),
+            'sizes': list(sizes),
+            'repeats': repeats,
+            },
+        'results': results,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated row counts (default: %(default)s).")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Samples per benchmark.")
+    parser.add_argument('--only', action='append', help="Run benchmarks whose name starts with this (repeatable).")
+    parser.add_argument('--json', dest='json_path', help="Write results to this file instead of stdout.")
+    parser.add_argument('--save', action='store_true',
+                        help="Also keep the results in the benchmark result store (see result_store.py).")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    app = QApplication.instance() or QApplication(sys.argv)  # Needed by the model and delegate
+    results = run(sizes, args.repeats, args.only)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.save:
+        from src.dev.benchmarks.result_store import save_run
+
+        print(f"Stored as '{save_run(results)}'.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
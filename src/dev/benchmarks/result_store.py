@@ -0,0 +1,238 @@
+"""
+Keeps hot-path benchmark runs keyed by git commit and machine fingerprint, and compares two commits.
+
+Runs are stored as <store>/<machine fingerprint>/<commit>_<created>.json. Runs of the same commit on the same machine
+are pooled, so repeating a run adds samples. Only runs from the same machine are compared.
+
+    python -m src.dev.benchmarks.result_store save results.json
+    python -m src.dev.benchmarks.result_store list
+    python -m src.dev.benchmarks.result_store compare                      # Previous stored commit vs. latest
+    python -m src.dev.benchmarks.result_store compare a1b2c3d e4f5a6b --threshold 5
+    python -m src.dev.benchmarks.result_store compare base.json new.json   # Result files work too
+
+'compare' exits with status 1 when a gated benchmark (AppData, TableModel and TableDelegate by default) got slower
+by more than the threshold and by more than the noise (the larger interquartile range of the two sample sets).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+DEFAULT_STORE_PATH = os.path.join(REPO_ROOT, '.benchmarks')
+STORE_ENV_KEY = 'APP_BENCHMARK_STORE'
+DEFAULT_THRESHOLD_PERCENT = 10.0
+DEFAULT_GATED_PREFIXES = ('app_data.', 'table_model.', 'table_delegate.')
+
+
+def machine_fingerprint():
+    """Short hash of what makes timings comparable: host, CPU, OS and Python build."""
+    parts = (
+        platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+        platform.system(), platform.release(), platform.python_implementation(), platform.python_version(),
+        )
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def store_path(path=None):
+    return path or os.getenv(STORE_ENV_KEY) or DEFAULT_STORE_PATH
+
+
+def save_run(results, path=None, fingerprint=None):
+    """Store a results dictionary (as written by hot_paths). Returns the file path."""
+    fingerprint = fingerprint or machine_fingerprint()
+    commit = results['meta'].get('git_commit') or 'unknown'
+    created = results['meta'].get('created', '').replace(':', '')
+
+    machine_dir = os.path.join(store_path(path), fingerprint)
+    os.makedirs(machine_dir, exist_ok=True)
+
+    file_path = os.path.join(machine_dir, f'{commit}_{created}.json')
+    results = dict(results, meta=dict(results['meta'], machine=fingerprint))
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json.dump(results, json_file, indent=2)
+    return file_path
+
+
+def stored_runs(path=None, fingerprint=None):
+    """Return [(commit, created, file path)] for this machine, oldest first."""
+    machine_dir = os.path.join(store_path(path), fingerprint or machine_fingerprint())
+    runs = []
+    for file_path in glob.glob(os.path.join(machine_dir, '*.json')):
+        commit, _, created = os.path.splitext(os.path.basename(file_path))[0].partition('_')
+        runs.append((commit, created, file_path))
+    return sorted(runs, key=lambda run: run[1])
+
+
+def stored_commits(path=None, fingerprint=None):
+    """Commits with stored runs, in the order they were first run."""
+    commits = []
+    for commit, _, _ in stored_runs(path, fingerprint):
+        if commit not in commits:
+            commits.append(commit)
+    return commits
+
+
+def load_samples(reference, path=None, fingerprint=None):
+    """
+    Return {(benchmark name, rows): [samples]} for a results file path or a (prefix of a) stored commit.
+    All stored runs of the commit are pooled.
+    """
+    if os.path.isfile(reference):
+        file_paths = [reference]
+    else:
+        matching_runs = [(commit, file_path) for commit, _, file_path in stored_runs(path, fingerprint)
+                         if commit.startswith(reference)]
+        file_paths = [file_path for _, file_path in matching_runs]
+        matching_commits = {commit for commit, _ in matching_runs}
+        if not file_paths:
+            raise LookupError(f"No stored runs for '{reference}' on machine {fingerprint or machine_fingerprint()}.")
+        if len(matching_commits) > 1:
+            raise LookupError(f"'{reference}' matches several commits: {sorted(matching_commits)}.")
+
+    samples = {}
+    for file_path in file_paths:
+        with open(file_path, encoding='utf-8') as json_file:
+            for result in json.load(json_file)['results']:
+                samples.setdefault((result['name'], result['rows']), []).extend(result['samples_s'])
+    return samples
+
+
+def median_and_iqr(samples):
+    median = statistics.median(samples)
+    if len(samples) < 2:
+        return median, 0.0
+    first_quartile, _, third_quartile = statistics.quantiles(samples, n=4)
+    return median, third_quartile - first_quartile
+
+
+def compare(baseline_samples, candidate_samples, threshold_percent=DEFAULT_THRESHOLD_PERCENT,
+            gated_prefixes=DEFAULT_GATED_PREFIXES):
+    """
+    Return a list of rows (dicts) with the per-benchmark delta and a status:
+    'regressed', 'improved', 'ok' (within threshold or noise), 'new' or 'missing'.
+    Only benchmarks whose name starts with one of 'gated_prefixes' can be 'regressed'; others are reported as 'slower'.
+    """
+    rows = []
+    for key in sorted(set(baseline_samples) | set(candidate_samples)):
+        name, row_count = key
+        row = {'name': name, 'rows': row_count}
+
+        if key not in candidate_samples:
+            rows.append(dict(row, status='missing'))
+            continue
+        if key not in baseline_samples:
+            rows.append(dict(row, status='new'))
+            continue
+
+        base_median, base_iqr = median_and_iqr(baseline_samples[key])
+        new_median, new_iqr = median_and_iqr(candidate_samples[key])
+        delta = new_median - base_median
+        noise = max(base_iqr, new_iqr)
+        delta_percent = delta / base_median * 100 if base_median else 0.0
+
+        beyond_noise = abs(delta) > noise
+        if delta_percent > threshold_percent and beyond_noise:
+            gated = name.startswith(tuple(gated_prefixes))
+            status = 'regressed' if gated else 'slower'
+        elif delta_percent < -threshold_percent and beyond_noise:
+            status = 'improved'
+        else:
+            status = 'ok'
+
+        rows.append(dict(
+            row, status=status, baseline_median_s=base_median, candidate_median_s=new_median,
+            delta_percent=delta_percent, noise_percent=noise / base_median * 100 if base_median else 0.0
+            ))
+    return rows
+
+
+def print_comparison(rows, baseline, candidate, threshold_percent):
+    print(f"Baseline: {baseline}   Candidate: {candidate}   Threshold: {threshold_percent}%")
+    print(f"{'benchmark':<45} {'rows':>8} {'baseline':>12} {'candidate':>12} {'delta':>9} {'noise':>8}  status")
+    for row in rows:
+        if 'delta_percent' not in row:
+            print(f"{row['name']:<45} {row['rows']:>8} {'':>12} {'':>12} {'':>9} {'':>8}  {row['status']}")
+            continue
+        print(f"{row['name']:<45} {row['rows']:>8} "
+              f"{row['baseline_median_s'] * 1000:>10.3f}ms {row['candidate_median_s'] * 1000:>10.3f}ms "
+              f"{row['delta_percent']:>+8.1f}% {row['noise_percent']:>7.1f}%  {row['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store benchmark runs and compare them for regressions.")
+    parser.add_argument('--store', help=f"Store directory (default: ${STORE_ENV_KEY} or {DEFAULT_STORE_PATH}).")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    save_parser = subparsers.add_parser('save', help="Store a results JSON file written by hot_paths.")
+    save_parser.add_argument('results_path')
+
+    subparsers.add_parser('list', help="List stored runs for this machine.")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two commits (or result files).")
+    compare_parser.add_argument('baseline', nargs='?', help="Commit (prefix) or results file. Default: previous commit.")
+    compare_parser.add_argument('candidate', nargs='?', help="Commit (prefix) or results file. Default: latest commit.")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                                help="Allowed slowdown in percent (default: %(default)s).")
+    compare_parser.add_argument('--gate', action='append',
+                                help=f"Benchmark name prefix that fails the comparison when it regresses "
+                                     f"(repeatable, default: {', '.join(DEFAULT_GATED_PREFIXES)}).")
+    compare_parser.add_argument('--json', dest='json_path', help="Also write the comparison to this file.")
+
+    args = parser.parse_args()
+
+    if args.command == 'save':
+        with open(args.results_path, encoding='utf-8') as json_file:
+            file_path = save_run(json.load(json_file), args.store)
+        print(f"Stored as '{file_path}'.")
+        return 0
+
+    if args.command == 'list':
+        print(f"Machine fingerprint: {machine_fingerprint()}")
+        for commit, created, file_path in stored_runs(args.store):
+            print(f"{created}  {commit}  {file_path}")
+        return 0
+
+    baseline, candidate = args.baseline, args.candidate
+    commits = stored_commits(args.store)
+
+    if candidate is None:
+        if not commits:
+            print("No stored runs on this machine.", file=sys.stderr)
+            return 2
+        candidate = commits[-1]
+
+    if baseline is None:
+        other_commits = [commit for commit in commits if not commit.startswith(candidate)]
+        if not other_commits:
+            print("Need runs of at least two commits on this machine to compare.", file=sys.stderr)
+            return 2
+        baseline = other_commits[-1]
+
+    try:
+        baseline_samples = load_samples(baseline, args.store)
+        candidate_samples = load_samples(candidate, args.store)
+    except LookupError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    rows = compare(baseline_samples, candidate_samples, args.threshold, args.gate or DEFAULT_GATED_PREFIXES)
+    print_comparison(rows, baseline, candidate, args.threshold)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as json_file:
+            json.dump({'baseline': baseline, 'candidate': candidate, 'rows': rows}, json_file, indent=2)
+
+    regressions = [row for row in rows if row['status'] == 'regressed']
+    if regressions:
+        print(f"{len(regressions)} regression/s beyond {args.threshold}%.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
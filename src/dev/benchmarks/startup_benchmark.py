@@ -0,0 +1,111 @@
+"""
+Time-to-first-paint benchmark. Launches the app repeatedly in fresh processes, in eager and in deferred startup
+mode, and reports the median time from the first import to the first paint of the main window.
+
+Run from the repository root (headless works with QT_QPA_PLATFORM=offscreen):
+
+    python -m src.dev.benchmarks.startup_benchmark --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+
+# Runs inside each launched process. The timeline is imported first (like main.py does), and the app quits as
+# soon as the timeline is finished, which is after the first paint and the post-show queue.
+LAUNCHER = """
+from src.utils import startup_timeline
+
+_finish = startup_timeline.finish
+
+def _finish_and_quit():
+    _finish()
+    from PyQt6.QtWidgets import QApplication
+    QApplication.instance().quit()
+
+startup_timeline.finish = _finish_and_quit
+
+from src import main
+main.main()
+"""
+
+MODES = {
+    'eager': {'APP_EAGER_STARTUP': '1'},
+    'deferred': {},
+    }
+
+
+def launch_once(mode):
+    """Launch the app once and return (first paint ms, timeline total ms, process wall time ms)."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_path = os.path.join(temp_dir, 'startup_trace.json')
+
+        env = dict(os.environ)
+        env.pop('APP_EAGER_STARTUP', None)
+        env.update(MODES[mode])
+        env['APP_STARTUP_TRACE'] = trace_path
+        env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', LAUNCHER], cwd=SRC_DIR, env=env, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        with open(trace_path, encoding='utf-8') as trace_file:
+            events = json.load(trace_file)['traceEvents']
+
+    first_paint = next(event for event in events if event['name'] == 'first paint')
+    first_paint_ms = (first_paint['ts'] + first_paint['dur']) / 1000
+    total_ms = max(event['ts'] + event.get('dur', 0) for event in events) / 1000
+    return first_paint_ms, total_ms, wall_ms
+
+
+def run(runs):
+    results = {}
+    for mode in MODES:
+        launch_once(mode)  # Warm-up (file system cache, .pyc files)
+        samples = [launch_once(mode) for _ in range(runs)]
+        results[mode] = {
+            'runs': runs,
+            'first_paint_ms': statistics.median(sample[0] for sample in samples),
+            'timeline_total_ms': statistics.median(sample[1] for sample in samples),
+            'process_wall_ms': statistics.median(sample[2] for sample in samples),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time-to-first-paint of eager and deferred startup.")
+    parser.add_argument('--runs', type=int, default=5, help="Launches per mode (median is reported).")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+
+    for mode, result in results.items():
+        print(f"{mode:<9} first paint: {result['first_paint_ms']:8.2f} ms   "
+              f"timeline total: {result['timeline_total_ms']:8.2f} ms   "
+              f"process wall: {result['process_wall_ms']:8.2f} ms")
+
+    eager_ms = results['eager']['first_paint_ms']
+    deferred_ms = results['deferred']['first_paint_ms']
+    print(f"Deferred startup reaches first paint {eager_ms - deferred_ms:.2f} ms "
+          f"({(eager_ms - deferred_ms) / eager_ms * 100:.1f}%) earlier.")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
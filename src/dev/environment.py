@@ -4,6 +4,27 @@ from pathlib import Path
 
 from PyQt6.QtCore import QSettings
 
+from src.utils import startup_timeline
+
+startup_timeline.begin('env setup')  # Folders are made while this module is imported
+
+
+class LazySettings:
+    """
+    Class attribute that creates its QSettings on first access instead of at class definition.
+    Only the selected environment's settings are ever created, and not before they're needed.
+    """
+
+    def __init__(self, organization, application):
+        self.organization = organization
+        self.application = application
+        self._settings = None
+
+    def __get__(self, instance, owner):
+        if self._settings is None:
+            self._settings = QSettings(self.organization, self.application)
+        return self._settings
+
 
 class DefaultEnvironment:
     APP_NAME = "Routine Plus Turbo"
@@ -19,7 +40,9 @@ class DefaultEnvironment:
     ICON_NAME = 'icon.png'
     WIN_TITLE = f"{APP_NAME}.{VERSION}"
     LOCAL_SERVER = f'Local Sever for {APP_NAME}.{VERSION}'
-    SETTINGS_VALUES = QSettings(f'{APP_NAME}', 'Settings')
+    SETTINGS_VALUES = LazySettings(f'{APP_NAME}', 'Settings')
+    DEV_TOOLS = False  # Dev buttons (profilers, statistics windows) in the left bar
+    TRACE = ''  # Trace categories when 'APP_TRACE' isn't set (see tracing.py)
 
 
 class DevelopmentEnvironment(DefaultEnvironment):
@@ -37,7 +60,9 @@ class DevelopmentEnvironment(DefaultEnvironment):
     ICON_NAME = 'dev_icon.png'
     WIN_TITLE = f"DEV {APP_NAME}.{VERSION}"
     LOCAL_SERVER = f'Local DEV Sever for {APP_NAME}.{VERSION}'
-    SETTINGS_VALUES = QSettings(f'DEV {APP_NAME}', 'DEV_Settings')
+    SETTINGS_VALUES = LazySettings(f'DEV {APP_NAME}', 'DEV_Settings')
+    DEV_TOOLS = True
+    TRACE = 'all'
 
 
 class ProductionEnvironment(DefaultEnvironment):
@@ -45,33 +70,35 @@ class ProductionEnvironment(DefaultEnvironment):
     pass
 
 
+def make_required_folders(env_cls):
+    """Data and log folders are needed before the first paint (database, log file). The app folder is their parent."""
+    os.makedirs(env_cls.DATA_FOLDER_PATH, exist_ok=True)
+    os.makedirs(env_cls.LOG_FOLDER_PATH, exist_ok=True)
+
+
+def make_backup_folder():
+    """Not needed until the first backup, so main() queues this to run after the main window is shown."""
+    os.makedirs(environment_cls.BACKUP_FOLDER_PATH, exist_ok=True)
+
+
 environment = os.getenv('APP_ENV')  # Get the environment using the key 'APP_ENV'
 
 # Set the appropriate environment_cls class based on the environment variable
 if environment == 'development':
     environment_cls = DevelopmentEnvironment
     print(f"\nEnvironment: Development. Creating necessary folders in {environment_cls.APP_FOLDER_PATH}.")
-    os.makedirs(environment_cls.APP_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.DATA_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.LOG_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.BACKUP_FOLDER_PATH, exist_ok=True)
+    make_required_folders(environment_cls)
     print(f"\nAPPLICATION STARTED IN '{environment}' environment.")
 
 elif environment is None:
     environment_cls = DevelopmentEnvironment
     print(f"\nEnvironment was None. Manually set to Development evn. Creating necessary folders in {environment_cls.APP_FOLDER_PATH}.")
-    os.makedirs(environment_cls.APP_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.DATA_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.LOG_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.BACKUP_FOLDER_PATH, exist_ok=True)
+    make_required_folders(environment_cls)
     print(f"\nAPPLICATION STARTED IN '{environment}' environment.")
 
 else:
     environment_cls = ProductionEnvironment
-    os.makedirs(environment_cls.APP_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.DATA_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.LOG_FOLDER_PATH, exist_ok=True)
-    os.makedirs(environment_cls.BACKUP_FOLDER_PATH, exist_ok=True)
+    make_required_folders(environment_cls)
 
     logging.warning(
         f"READ: Currently in {environment} environment. "
@@ -85,6 +112,8 @@ else:
         f"If in production/use, then ignore.\n"
         )
 
+startup_timeline.end('env setup')
+
 # This page basically contains global defaults that switch depending on environment.
 # As opposed to default.py file, where the default remain constant no matter what.
 
@@ -0,0 +1,146 @@
+"""
+Generates valid daily_routine databases of any size for benchmarks and stress tests.
+
+Every generated day runs from midnight to midnight without gaps: each row's to_time is the next row's from_time and
+each duration equals to_time - from_time. Rows are written with one executemany in one transaction, so a
+1M-row file takes a few seconds. The same arguments and seed always produce the same file. Sequence keys are spaced
+SEQUENCE_GAP apart, as the app leaves them after a rebalance.
+
+    python -m src.dev.routine_generator routine.db --rows 1000000 --tasks-per-day 96 --seed 7
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from src.models.app_data import AppData
+from src.models.sequence_keys import SEQUENCE_GAP
+
+MINUTES_PER_DAY = 24 * 60
+FIRST_DAY = date(2023, 1, 1)  # Same fixed date the app uses for its times (default.FIXED_DATE)
+TASK_TYPES = ('main', 'subtask')
+REMINDER_LEAD_MINUTES = 5  # Same as default.NumericEn.REMINDER_LEAD_TIME
+
+TASK_NAMES = (
+    'Sleep', 'Wake up', 'Breakfast', 'Exercise', 'Commute', 'Email', 'Meeting', 'Deep work', 'Lunch', 'Review',
+    'Reading', 'Call', 'Walk', 'Errands', 'Cooking', 'Dinner', 'Family time', 'Planning', 'Study', 'Break',
+    )
+
+INSERT_QUERY = """
+INSERT INTO daily_routine (from_time, to_time, duration, task_name, reminders, type, task_sequence)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 'HH:MM:SS' for every minute of the day, so rows are built by string concatenation instead of datetime arithmetic
+_TIME_OF_DAY = [f"{minute // 60:02d}:{minute % 60:02d}:00" for minute in range(MINUTES_PER_DAY)]
+
+
+def day_durations(rng, tasks_in_day):
+    """Split the 1440 minutes of a day into 'tasks_in_day' random durations of at least one minute each."""
+    cut_points = sorted(rng.sample(range(1, MINUTES_PER_DAY), tasks_in_day - 1))
+    boundaries = [0, *cut_points, MINUTES_PER_DAY]
+    return [boundaries[i + 1] - boundaries[i] for i in range(tasks_in_day)]
+
+
+def generate_rows(rows, seed=0, tasks_per_day=48, subtask_ratio=0.2, reminder_ratio=0.7):
+    """
+    Yield parameter tuples for INSERT_QUERY. The routine spans as many days as needed for 'rows' tasks.
+
+    - subtask_ratio: share of rows typed 'subtask' (never the first task of a day).
+    - reminder_ratio: share of rows reminded REMINDER_LEAD_MINUTES before they start. The rest are reminded at the
+      start time (the reminders column can't be empty; AppData parses it as a datetime).
+    """
+    if not 1 <= tasks_per_day <= MINUTES_PER_DAY:
+        raise ValueError(f"tasks_per_day has to be between 1 and {MINUTES_PER_DAY}. Got {tasks_per_day}.")
+
+    rng = random.Random(seed)
+    days = math.ceil(rows / tasks_per_day)
+    sequence = 0
+
+    for day_index in range(days):
+        tasks_in_day = min(tasks_per_day, rows - sequence)
+        durations = day_durations(rng, tasks_in_day)
+
+        day = FIRST_DAY + timedelta(days=day_index)
+        day_prefix = f"{day.isoformat()} "
+        next_day_prefix = f"{(day + timedelta(days=1)).isoformat()} "
+        previous_day_prefix = f"{(day - timedelta(days=1)).isoformat()} "
+
+        start_minute = 0
+        for task_index, duration in enumerate(durations):
+            sequence += 1
+            end_minute = start_minute + duration
+
+            from_time = day_prefix + _TIME_OF_DAY[start_minute]
+            if end_minute == MINUTES_PER_DAY:
+                to_time = next_day_prefix + _TIME_OF_DAY[0]
+            else:
+                to_time = day_prefix + _TIME_OF_DAY[end_minute]
+
+            if rng.random() < reminder_ratio:
+                reminder_minute = start_minute - REMINDER_LEAD_MINUTES
+                if reminder_minute < 0:
+                    reminder = previous_day_prefix + _TIME_OF_DAY[reminder_minute + MINUTES_PER_DAY]
+                else:
+                    reminder = day_prefix + _TIME_OF_DAY[reminder_minute]
+            else:
+                reminder = from_time
+
+            if task_index > 0 and rng.random() < subtask_ratio:
+                task_type = TASK_TYPES[1]
+            else:
+                task_type = TASK_TYPES[0]
+
+            task_name = f"{TASK_NAMES[rng.randrange(len(TASK_NAMES))]} {sequence}"
+
+            yield from_time, to_time, duration, task_name, reminder, task_type, sequence * SEQUENCE_GAP
+            start_minute = end_minute
+
+
+def generate_routine_database(file_path, rows, seed=0, tasks_per_day=48, subtask_ratio=0.2,
+                              reminder_ratio=0.7, overwrite=False):
+    """Create 'file_path' with the app's schema and 'rows' generated tasks. Returns the number of rows written."""
+    if os.path.exists(file_path):
+        if not overwrite:
+            raise FileExistsError(f"'{file_path}' already exists. Pass overwrite=True to replace it.")
+        os.remove(file_path)
+
+    app_data = AppData(file_path)  # Creates the table exactly as the app does
+    conn = app_data.conn
+
+    # Nothing to protect while the file is being created, so skip the journal and fsyncs
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    with conn:
+        conn.executemany(INSERT_QUERY, generate_rows(rows, seed, tasks_per_day, subtask_ratio, reminder_ratio))
+
+    app_data.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic daily_routine database.")
+    parser.add_argument('file_path', help="Database file to create.")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of tasks (default: %(default)s).")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: %(default)s).")
+    parser.add_argument('--tasks-per-day', type=int, default=48, help="Tasks per day (default: %(default)s).")
+    parser.add_argument('--subtask-ratio', type=float, default=0.2, help="Share of subtasks (default: %(default)s).")
+    parser.add_argument('--reminder-ratio', type=float, default=0.7,
+                        help="Share of tasks reminded before they start (default: %(default)s).")
+    parser.add_argument('--overwrite', action='store_true', help="Replace the file if it exists.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generate_routine_database(
+        args.file_path, args.rows, args.seed, args.tasks_per_day, args.subtask_ratio, args.reminder_ratio,
+        args.overwrite
+        )
+    print(f"{args.rows} rows written to '{args.file_path}' in {time.perf_counter() - started:.2f} s.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
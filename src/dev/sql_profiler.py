@@ -0,0 +1,174 @@
+"""
+Opt-in profiler for the statements AppData runs on its SQLite connection.
+
+Set 'APP_SQL_PROFILE' to any non-empty value and AppData connects through ProfilingConnection:
+- sqlite's trace callback counts every statement the engine runs, including the implicit BEGIN/COMMIT and each row
+  of an executemany.
+- execute/executemany/executescript/commit are wrapped to time each call and record the rows it affected.
+
+Statements are normalised (literals, NULL included, replaced with '?', whitespace collapsed), so values never reach the profile.
+The profile can be viewed in the 'SQL Profile' dev window and is written to the log folder when the database closes.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+PROFILE_ENV_KEY = 'APP_SQL_PROFILE'
+PROFILING_ENABLED = bool(os.getenv(PROFILE_ENV_KEY))
+LATENCY_RESERVOIR_SIZE = 4096  # Latency samples kept per statement for the percentiles
+
+# The trace callback gets the SQL with the bound values filled in ('-5', 'NULL', x'0a'), the wrappers get the SQL with
+# '?'. Both must normalise to the same statement, so they're counted in one row of the profile.
+_STRING_LITERAL = re.compile(r"(?:\b[xX])?'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_NULL_LITERAL = re.compile(r"\bNULL\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_statement(sql):
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _NULL_LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class StatementStats:
+    __slots__ = ('statement', 'executions', 'calls', 'total_s', 'rows_affected', 'latencies_s')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.executions = 0  # Seen by the trace callback
+        self.calls = 0  # Timed calls through the connection wrappers
+        self.total_s = 0.0
+        self.rows_affected = 0
+        self.latencies_s = []  # Reservoir sample of call latencies
+
+    def percentile_s(self, percent):
+        if not self.latencies_s:
+            return 0.0
+        ordered = sorted(self.latencies_s)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def as_dict(self):
+        return {
+            'statement': self.statement,
+            'executions': self.executions,
+            'calls': self.calls,
+            'total_ms': self.total_s * 1000,
+            'mean_ms': self.total_s / self.calls * 1000 if self.calls else 0.0,
+            'p95_ms': self.percentile_s(95) * 1000,
+            'rows_affected': self.rows_affected,
+            }
+
+
+class SqlProfiler:
+    def __init__(self, reservoir_size=LATENCY_RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.stats = {}  # Normalised statement: StatementStats
+        self.started = datetime.now()
+        self._normalised = {}  # Raw SQL from the wrappers: normalised (the same few queries repeat)
+        self._random = random.Random(0)
+
+    def _stats_for(self, statement):
+        try:
+            return self.stats[statement]
+        except KeyError:
+            stats = self.stats[statement] = StatementStats(statement)
+            return stats
+
+    def _normalise_cached(self, sql):
+        try:
+            return self._normalised[sql]
+        except KeyError:
+            if len(self._normalised) > 10000:
+                self._normalised.clear()
+            normalised = self._normalised[sql] = normalise_statement(sql)
+            return normalised
+
+    def trace_callback(self, expanded_sql):
+        """Passed to set_trace_callback. Gets the SQL with values filled in, so it isn't cached."""
+        self._stats_for(normalise_statement(expanded_sql)).executions += 1
+
+    def record_call(self, sql, elapsed_s, rows_affected):
+        stats = self._stats_for(self._normalise_cached(sql))
+        stats.calls += 1
+        stats.total_s += elapsed_s
+        if rows_affected > 0:
+            stats.rows_affected += rows_affected
+
+        if len(stats.latencies_s) < self.reservoir_size:
+            stats.latencies_s.append(elapsed_s)
+        else:
+            slot = self._random.randrange(stats.calls)
+            if slot < self.reservoir_size:
+                stats.latencies_s[slot] = elapsed_s
+
+    def reset(self):
+        self.stats.clear()
+        self.started = datetime.now()
+
+    def rows(self):
+        """Statement stats as dictionaries, slowest total first."""
+        return sorted((stats.as_dict() for stats in self.stats.values()),
+                      key=lambda row: (row['total_ms'], row['executions']), reverse=True)
+
+    def dump(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as json_file:
+            json.dump({
+                'started': self.started.isoformat(timespec='seconds'),
+                'dumped': datetime.now().isoformat(timespec='seconds'),
+                'statements': self.rows(),
+                }, json_file, indent=2)
+        logging.info(f"SQL profile written to '{file_path}'.")
+
+    def dump_to_log_folder(self):
+        from src.utils import helper_fn
+
+        log_folder_path = helper_fn.get_environment_cls(False, caller='SqlProfiler').LOG_FOLDER_PATH
+        file_name = f"sql_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            self.dump(os.path.join(log_folder_path, file_name))
+        except OSError as e:
+            logging.error(f"Exception type:{type(e)} when writing the SQL profile (Error Description:{e}")
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3 connection whose execute, executemany, executescript and commit report to 'self.profiler'."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = SqlProfiler()
+        self.set_trace_callback(self.profiler.trace_callback)
+
+    def execute(self, sql, parameters=(), /):
+        started = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        self.profiler.record_call(sql, time.perf_counter() - started, cursor.rowcount)
+        return cursor
+
+    def executemany(self, sql, parameters, /):
+        started = time.perf_counter()
+        cursor = super().executemany(sql, parameters)
+        self.profiler.record_call(sql, time.perf_counter() - started, cursor.rowcount)
+        return cursor
+
+    def executescript(self, sql_script, /):
+        started = time.perf_counter()
+        cursor = super().executescript(sql_script)
+        self.profiler.record_call(sql_script, time.perf_counter() - started, -1)
+        return cursor
+
+    def commit(self):
+        started = time.perf_counter()
+        super().commit()
+        self.profiler.record_call('COMMIT', time.perf_counter() - started, -1)
+
+
+def connect(data_file_path):
+    """Open a profiled connection. The profiler is 'connection.profiler'."""
+    return sqlite3.connect(data_file_path, factory=ProfilingConnection)
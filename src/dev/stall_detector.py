@@ -0,0 +1,183 @@
+"""
+Watchdog for event-loop stalls (the GUI thread not getting back to the Qt event loop).
+
+A QTimer on the GUI thread records a heartbeat every HEARTBEAT_MS. A watchdog thread checks the heartbeat; once it is
+older than the threshold, the GUI thread is still busy, so the watchdog captures its Python stack with
+sys._current_frames(). When the heartbeat resumes, the stall is recorded with its full duration, the stack and the
+controller action that was running (Controller.signal_from_left_bar sets 'current_action').
+
+Runs in the dev environment (DEV_TOOLS), or anywhere with 'APP_STALL_DETECTOR' set to 1 or a threshold in ms.
+Stalls are logged as warnings with the stack, and aggregated per action for the 'Stalls' dev window.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from PyQt6.QtCore import QTimer
+
+DETECTOR_ENV_KEY = 'APP_STALL_DETECTOR'
+DEFAULT_THRESHOLD_MS = 100
+HEARTBEAT_MS = 20
+RECENT_STALLS_KEPT = 200
+NO_ACTION = '(no action)'
+
+
+class ActionStallStats:
+    __slots__ = ('action', 'stalls', 'total_s', 'max_s', 'durations_s', 'last_where')
+
+    def __init__(self, action):
+        self.action = action
+        self.stalls = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.durations_s = deque(maxlen=1000)  # Recent durations for the percentile
+        self.last_where = ''  # Innermost frame of the last captured stack
+
+    def as_dict(self):
+        ordered = sorted(self.durations_s)
+        p95_s = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            'action': self.action,
+            'stalls': self.stalls,
+            'total_ms': self.total_s * 1000,
+            'max_ms': self.max_s * 1000,
+            'p95_ms': p95_s * 1000,
+            'where': self.last_where,
+            }
+
+
+class StallDetector:
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS):
+        self.threshold_s = threshold_ms / 1000
+        self.current_action = None  # Set by Controller.signal_from_left_bar while an action runs
+
+        self.stats = {}  # Action name: ActionStallStats
+        self.recent_stalls = deque(maxlen=RECENT_STALLS_KEPT)  # (duration s, action, stack)
+
+        self._last_beat = time.perf_counter()
+        self._pending_capture = None  # (action, stack) captured by the watchdog for the current stall
+        self._main_thread_id = threading.main_thread().ident
+        self._heartbeat_timer = None
+        self._watchdog_thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self._watchdog_thread is not None
+
+    def start(self):
+        if self.running:
+            return
+
+        self._heartbeat_timer = QTimer()
+        self._heartbeat_timer.setInterval(HEARTBEAT_MS)
+        self._heartbeat_timer.timeout.connect(self._beat)
+        self._last_beat = time.perf_counter()
+        self._heartbeat_timer.start()
+
+        self._stop_event.clear()
+        self._watchdog_thread = threading.Thread(target=self._watch, name='StallWatchdog', daemon=True)
+        self._watchdog_thread.start()
+        logging.info(f"Stall detector started (threshold {self.threshold_s * 1000:.0f} ms).")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._watchdog_thread.join(timeout=1)
+        self._watchdog_thread = None
+        self._heartbeat_timer.stop()
+        self._heartbeat_timer = None
+
+    def _beat(self):
+        """GUI thread. A late beat means the event loop was blocked since the previous one."""
+        now = time.perf_counter()
+        blocked_s = now - self._last_beat - HEARTBEAT_MS / 1000
+        self._last_beat = now
+
+        if blocked_s >= self.threshold_s:
+            capture, self._pending_capture = self._pending_capture, None
+            action, stack = capture or (NO_ACTION, None)
+            self.record(blocked_s, action, stack)
+        else:
+            self._pending_capture = None
+
+    def _watch(self):
+        """Watchdog thread. Captures the GUI thread's stack once per stall, while it is still stuck."""
+        poll_s = max(0.005, self.threshold_s / 4)
+        captured_beat = None
+
+        while not self._stop_event.wait(poll_s):
+            last_beat = self._last_beat
+            if last_beat == captured_beat:
+                continue
+            if time.perf_counter() - last_beat - HEARTBEAT_MS / 1000 < self.threshold_s:
+                continue
+
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)  # A StackSummary, so no frame references are kept
+            del frame
+
+            self._pending_capture = (self.current_action or NO_ACTION, stack)
+            captured_beat = last_beat
+
+    def record(self, duration_s, action, stack):
+        stats = self.stats.get(action)
+        if stats is None:
+            stats = self.stats[action] = ActionStallStats(action)
+        stats.stalls += 1
+        stats.total_s += duration_s
+        stats.max_s = max(stats.max_s, duration_s)
+        stats.durations_s.append(duration_s)
+        if stack:
+            innermost = stack[-1]
+            stats.last_where = f"{os.path.basename(innermost.filename)}:{innermost.lineno} in {innermost.name}"
+
+        self.recent_stalls.append((duration_s, action, stack))
+        stack_text = ''.join(stack.format()) if stack else '(not captured)\n'
+        logging.warning(f"Event loop stalled for {duration_s * 1000:.0f} ms during '{action}'. "
+                        f"GUI thread stack:\n{stack_text}")
+
+    def reset(self):
+        self.stats.clear()
+        self.recent_stalls.clear()
+
+    def rows(self):
+        """Per-action statistics as dictionaries, most total stall time first."""
+        return sorted((stats.as_dict() for stats in self.stats.values()),
+                      key=lambda row: row['total_ms'], reverse=True)
+
+
+def threshold_from_environment():
+    """Threshold in ms, or None when the detector shouldn't run."""
+    from src.utils import helper_fn
+
+    value = os.getenv(DETECTOR_ENV_KEY)
+    if value:
+        try:
+            return float(value) if float(value) > 1 else DEFAULT_THRESHOLD_MS
+        except ValueError:
+            logging.warning(f"Invalid '{DETECTOR_ENV_KEY}' value '{value}'. Using {DEFAULT_THRESHOLD_MS} ms.")
+            return DEFAULT_THRESHOLD_MS
+
+    if helper_fn.get_environment_cls(False, caller='stall_detector').DEV_TOOLS:
+        return DEFAULT_THRESHOLD_MS
+    return None
+
+
+stall_detector = StallDetector()
+
+
+def start_from_environment():
+    """Queued by main() to run after the first paint."""
+    threshold_ms = threshold_from_environment()
+    if threshold_ms is None:
+        return
+    stall_detector.threshold_s = threshold_ms / 1000
+    stall_detector.start()
@@ -3,20 +3,32 @@ import logging
 import sys
 import traceback
 
+# Imported before everything else, so that the startup timeline starts here
+from src.utils import startup_timeline
+
+startup_timeline.begin('imports')
+
 from PyQt6.QtGui import QIcon
 # PyQt
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
 # This app's utilities and resources
+from src.dev.environment import make_backup_folder
+from src.dev import stall_detector
+from src.dev.action_latency import action_latency
 from src.utils import helper_fn
+from src.utils.post_show_queue import post_show_queue
+from src.utils.service_registry import services
 
 # This app's modules
-from src.utils.app_logging import setup_root_logger
+from src.utils.app_logging import setup_root_logger, stop_logging_pipeline
 from src.views.main_window import MainWindow
 from src.controllers.controller import Controller
 from src.models.table_model import TableModel
 from src.views.table_view import TableView
 
+startup_timeline.end('imports')
+
 
 class MainApp(QApplication):
     def __init__(self):
@@ -48,6 +60,13 @@ class MainApp(QApplication):
         self.setWindowIcon(QIcon(icon_path))
         logging.debug(f" _get_and_set_app_info method successfully completed.")
 
+    def create_log_window(self):
+        """Provider of the 'log_window' service."""
+        from src.utils.app_logging import LogDisplayWindow  # Imported on first use
+
+        self.log_window = LogDisplayWindow()  # Hidden until requested
+        return self.log_window
+
     def _initialize_events(self):
         self.main_window.close_requested_signal.connect(self.prepare_to_close_app)
         logging.debug(f" _initialize_events method successfully completed.")
@@ -118,24 +137,39 @@ class MainApp(QApplication):
 
 def main():
     try:
-        setup_root_logger()
+        with startup_timeline.phase('logger setup'):
+            setup_root_logger()
+
         logging.debug(f"")
         logging.debug(f"****APPLICATION STARTED****")
         logging.debug(f"")
 
-        main_app = MainApp()
+        with startup_timeline.phase('MainApp'):
+            main_app = MainApp()
 
-        model = TableModel()
-        table_view = TableView()
-        table_view.setModel(model)
-        controller = Controller(model, table_view)
+        with startup_timeline.phase('model'):
+            model = TableModel()
 
-        main_app.set_controller_and_view(controller, table_view)
+        with startup_timeline.phase('widget construction'):
+            table_view = TableView()
+            table_view.setModel(model)
+            controller = Controller(model, table_view)
+
+            main_app.set_controller_and_view(controller, table_view)
 
         # main_app.setQuitOnLastWindowClosed(True)  # To prevent app from closing when closing reminder window
 
-        main_app.aboutToQuit.connect(lambda: app_about_to_quit(model))
+        main_app.aboutToQuit.connect(lambda: app_about_to_quit(model, controller))
+
+        services.register('log_window', main_app.create_log_window)
+        post_show_queue.add('log window', lambda: services.get('log_window'))
+        post_show_queue.add('backup folder', make_backup_folder)
+        post_show_queue.add('stall detector', stall_detector.start_from_environment)
+        post_show_queue.add('latency export', action_latency.start_periodic_export)
+        post_show_queue.add('schedule check', lambda: model.validate_schedule('on load'))
 
+        startup_timeline.watch_first_paint(main_app.main_window)
+        post_show_queue.start_after_first_paint(main_app.main_window)
         main_app.main_window.show()
 
         logging.debug("main function loop starting.")
@@ -147,10 +181,15 @@ def main():
         traceback.print_exc()
 
 
-def app_about_to_quit(model):
+def app_about_to_quit(model, controller):
     print(f"***APPLICATION CLOSED SUCCESSFULLY****")
     logging.warning(f"***APPLICATION CLOSED SUCCESSFULLY****")
+    stall_detector.stall_detector.stop()
+    action_latency.stop_periodic_export()
+    controller.autosave.close()  # Final flush of unsaved edits
+    controller.undo_manager.close()
     model.close_database()
+    stop_logging_pipeline()
 
 
 if __name__ == '__main__':
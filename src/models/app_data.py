@@ -2,26 +2,35 @@ import logging
 import os
 import sqlite3
 
+from src.dev import sql_profiler
 from src.resources import default
-from src.utils import helper_fn
+from src.resources.default import CONSTRAINT_DEFAULTS
+from src.utils import helper_fn, startup_timeline, tracing
 
 
 class AppData:
 
-    def __init__(self):
-        self.create_dirs()
-        self.conn = None
-        self.connect()
-        self.create_table()
+    def __init__(self, data_file_path=None):  # data_file_path overrides the environment's file (benchmarks, tools)
+        with startup_timeline.phase('db open'):
+            self.create_dirs(data_file_path)
+            self.conn = None
+            self.sql_profiler = None  # Set by connect() when 'APP_SQL_PROFILE' is set
+            self.connect()
+            self.create_table()
+            self.add_missing_columns()
 
-    def create_dirs(self):
+    def create_dirs(self, data_file_path=None):
         env_config = helper_fn.get_environment_cls(False, caller='AppData')
-        self.data_file_path = os.path.join(env_config.DATA_FOLDER_PATH, f'{env_config.DATA_FILE_NAME}.db')
+        self.data_file_path = data_file_path or os.path.join(env_config.DATA_FOLDER_PATH, f'{env_config.DATA_FILE_NAME}.db')
         self.backup_folder_path = env_config.BACKUP_FOLDER_PATH
 
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.data_file_path)
+            if sql_profiler.PROFILING_ENABLED:
+                self.conn = sql_profiler.connect(self.data_file_path)
+                self.sql_profiler = self.conn.profiler
+            else:
+                self.conn = sqlite3.connect(self.data_file_path)
 
             """
             By default, SQLite3 returns each row as a tuple. sqlite3.row row_factory returns the special 'Row' object.
@@ -47,17 +56,32 @@ class AppData:
             task_name TEXT,
             reminders DATETIME,
             type TEXT,
-            task_sequence INTEGER
+            task_sequence INTEGER,
+            min_duration INTEGER DEFAULT 1,
+            max_duration INTEGER,
+            anchored INTEGER DEFAULT 0
         )
         """
         self.conn.execute(create_table_query)
         self.conn.commit()
 
+    def add_missing_columns(self):
+        """Files from older versions don't have the constraint columns. Their tasks get the defaults."""
+        existing = {column['name'] for column in self.conn.execute("PRAGMA table_info(daily_routine)").fetchall()}
+        missing = [column for column in CONSTRAINT_DEFAULTS if column not in existing]
+        for column in missing:
+            default_value = CONSTRAINT_DEFAULTS[column]
+            default_clause = f" DEFAULT {default_value}" if default_value is not None else ''
+            self.conn.execute(f"ALTER TABLE daily_routine ADD COLUMN {column} INTEGER{default_clause}")
+        if missing:
+            self.conn.commit()
+            logging.info(f"Added column/s {missing} to the database.")
+
     def get_all_entries(self):  # Called in TableModel and set to _data variable
         """
         Retrieve all entries from the 'daily_routine' table and return them as a list of dictionaries.
         """
-        logging.debug(f"Fetching all entries from the SQLite database.")
+        tracing.db.debug("Fetching all entries from the SQLite database.")
 
         select_query = "SELECT * FROM daily_routine ORDER BY task_sequence ASC"
         cursor = self.conn.execute(select_query)
@@ -68,7 +92,7 @@ class AppData:
                 self.insert_new_row(each_task_dict)
             cursor.close()
 
-        logging.debug(f"Rows data fetched from SQLite. Converting them to datetime objects.")
+        tracing.db.debug("Rows data fetched from SQLite. Converting them to datetime objects.")
 
         cursor = self.conn.execute(select_query)
 
@@ -82,14 +106,15 @@ class AppData:
         return data_dt_format
 
     def insert_new_row(self, row_data):
-        logging.debug(f"Inserting new task in the database.")
+        tracing.db.debug("Inserting new task in the database.")
         insert_query = """
-        INSERT INTO daily_routine (from_time, to_time, duration, task_name, reminders, type, task_sequence)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO daily_routine (from_time, to_time, duration, task_name, reminders, type, task_sequence,
+                                   min_duration, max_duration, anchored)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         params = (row_data['from_time'], row_data['to_time'], row_data['duration'],
                   row_data['task_name'], row_data['reminders'], row_data['type'],
-                  row_data['task_sequence'])
+                  row_data['task_sequence'], *_constraint_values(row_data))
 
         cursor = self.conn.execute(insert_query, params)
 
@@ -97,28 +122,84 @@ class AppData:
         inserted_row_id = cursor.lastrowid
 
         # Optionally, you can log the inserted row ID
-        logging.debug(f"Inserted new task with ID: {inserted_row_id}")
+        tracing.db.debug(lambda: f"Inserted new task with ID: {inserted_row_id}")
 
         return inserted_row_id
 
+    def insert_rows(self, rows_data):
+        """Insert several tasks with one executemany. Returns their new IDs, in order, and commits."""
+        tracing.db.debug(lambda: f"Inserting {len(rows_data)} tasks in the database in one transaction.")
+        insert_query = """
+        INSERT INTO daily_routine (from_time, to_time, duration, task_name, reminders, type, task_sequence,
+                                   min_duration, max_duration, anchored)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        params = [(row_data['from_time'], row_data['to_time'], row_data['duration'],
+                   row_data['task_name'], row_data['reminders'], row_data['type'],
+                   row_data['task_sequence'], *_constraint_values(row_data)) for row_data in rows_data]
+
+        with self.conn:  # Commits, or rolls back if any insert fails
+            self.conn.executemany(insert_query, params)
+            # executemany doesn't set lastrowid. The IDs of one statement's rows are consecutive (AUTOINCREMENT).
+            last_row_id = self.conn.execute("SELECT last_insert_rowid() AS id").fetchone()['id']
+
+        first_row_id = last_row_id - len(rows_data) + 1
+        return list(range(first_row_id, last_row_id + 1))
+
+    def delete_tasks(self, task_ids):
+        """Delete several tasks in one transaction."""
+        tracing.db.debug(lambda: f"Deleting {len(task_ids)} tasks from the database.")
+        with self.conn:
+            self.conn.executemany("DELETE FROM daily_routine WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def restore_rows(self, rows_data):
+        """Insert tasks with their original IDs (undo of a delete) in one executemany. Replaces rows that have the IDs."""
+        tracing.db.debug(lambda: f"Restoring {len(rows_data)} task/s in the database.")
+        restore_query = """
+        INSERT OR REPLACE INTO daily_routine (id, from_time, to_time, duration, task_name, reminders, type,
+                                              task_sequence, min_duration, max_duration, anchored)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        params = [(row_data['id'], row_data['from_time'], row_data['to_time'], row_data['duration'],
+                   row_data['task_name'], row_data['reminders'], row_data['type'],
+                   row_data['task_sequence'], *_constraint_values(row_data)) for row_data in rows_data]
+        self.conn.executemany(restore_query, params)
+
     def update_sqlite_data(self, task_data):
-        logging.debug(f"Updating task in the database.")
+        tracing.db.debug("Updating task in the database.")
         update_query = """
         UPDATE daily_routine
-        SET from_time = ?, to_time = ?, duration = ?, task_name = ?, reminders = ?, type = ?, task_sequence = ?
+        SET from_time = ?, to_time = ?, duration = ?, task_name = ?, reminders = ?, type = ?, task_sequence = ?,
+            min_duration = ?, max_duration = ?, anchored = ?
         WHERE id = ?
         """
         params = (task_data['from_time'], task_data['to_time'], task_data['duration'],
                   task_data['task_name'], task_data['reminders'], task_data['type'],
-                  task_data['task_sequence'], task_data['id'])
+                  task_data['task_sequence'], *_constraint_values(task_data), task_data['id'])
         self.conn.execute(update_query, params)
 
+    def update_rows(self, rows_data):
+        """Update several tasks with one executemany and commit them as one transaction."""
+        tracing.db.debug("Updating tasks in the database in one transaction.")
+        update_query = """
+        UPDATE daily_routine
+        SET from_time = ?, to_time = ?, duration = ?, task_name = ?, reminders = ?, type = ?, task_sequence = ?,
+            min_duration = ?, max_duration = ?, anchored = ?
+        WHERE id = ?
+        """
+        params = [(task_data['from_time'], task_data['to_time'], task_data['duration'],
+                   task_data['task_name'], task_data['reminders'], task_data['type'],
+                   task_data['task_sequence'], *_constraint_values(task_data), task_data['id'])
+                  for task_data in rows_data]
+        with self.conn:  # Commits, or rolls back if any update fails
+            self.conn.executemany(update_query, params)
+
     def commit_sqlite_all(self):
-        logging.debug(f"Committing all changes to the database.")
+        tracing.db.debug("Committing all changes to the database.")
         self.conn.commit()
 
     def delete_task(self, task_id):
-        logging.debug(f"Deleting task from the database.")
+        tracing.db.debug("Deleting task from the database.")
         delete_query = "DELETE FROM daily_routine WHERE id = ?"
         self.conn.execute(delete_query, (task_id,))
         self.conn.commit()
@@ -127,11 +208,20 @@ class AppData:
         """Close the database connection."""
         if self.conn:
             self.conn.close()
+            self.conn = None
+
+            if self.sql_profiler:
+                self.sql_profiler.dump_to_log_folder()
 
     def __del__(self):
         self.close()
 
 
+def _constraint_values(row_data):
+    """min_duration, max_duration, anchored. Rows made in memory may not have them yet."""
+    return tuple(row_data.get(column, default_value) for column, default_value in CONSTRAINT_DEFAULTS.items())
+
+
 """
 Sequence of events for AppData class analysis:
 
@@ -0,0 +1,234 @@
+"""
+Typed change-feed for TableModel.
+
+The model records every field write, insert, removal and move. Changes made inside one logical operation
+(a setData call, 'New Task', 'Delete', a batch) are collected and published once, as a ChangeSet, when the outermost
+operation ends. Changes recorded outside any operation are published right away as their own operation.
+
+Within a ChangeSet, rows are identified by their database id; row indexes are the positions when the change was made.
+Repeated writes to the same field are merged (first old value, last new value) and writes that end where they
+started are dropped. A row inserted and removed in the same operation doesn't appear at all. To apply a ChangeSet
+incrementally: inserts (values as inserted), then updates, then removals (values as removed), then moves.
+
+An edit of one cell (setData) names the cell, so that consumers can tell repeated edits of the same cell apart from
+edits that only happened to write the same neighbouring rows:
+
+    with self.change_feed.operation('setData', cell=(row_id, column_key)):
+
+Subscribers choose what they're interested in:
+
+    model.change_feed.subscribe(self.on_changes, fields={'duration', 'type'}, kinds={'update', 'insert', 'remove'})
+"""
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+KINDS = ('update', 'insert', 'remove', 'move')
+
+
+class FieldChange(NamedTuple):
+    old: Any
+    new: Any
+
+
+class RowUpdate(NamedTuple):
+    row_id: Any
+    row: int
+    fields: Dict[str, FieldChange]
+
+
+class RowInsert(NamedTuple):
+    row_id: Any
+    row: int
+    values: Dict[str, Any]
+
+
+class RowRemove(NamedTuple):
+    row_id: Any
+    row: int
+    values: Dict[str, Any]
+
+
+class RowMove(NamedTuple):
+    row_id: Any
+    from_row: int
+    to_row: int
+
+
+class ChangeSet(NamedTuple):
+    operation: str
+    inserts: Tuple[RowInsert, ...]
+    updates: Tuple[RowUpdate, ...]
+    removals: Tuple[RowRemove, ...]
+    moves: Tuple[RowMove, ...]
+    cell: Optional[Tuple[Any, str]] = None  # (row id, column key) of a one-cell edit
+
+    def changed_fields(self):
+        """Fields written by the updates (inserts and removals touch every field)."""
+        return {field for update in self.updates for field in update.fields}
+
+    def is_empty(self):
+        return not (self.inserts or self.updates or self.removals or self.moves)
+
+
+class Subscription:
+    __slots__ = ('callback', 'fields', 'kinds')
+
+    def __init__(self, callback, fields, kinds):
+        self.callback = callback
+        self.fields = frozenset(fields) if fields else None  # None: any field
+        self.kinds = frozenset(kinds) if kinds else frozenset(KINDS)
+
+    def wants(self, change_set):
+        if 'insert' in self.kinds and change_set.inserts:
+            return True
+        if 'remove' in self.kinds and change_set.removals:
+            return True
+        if 'move' in self.kinds and change_set.moves:
+            return True
+        if 'update' in self.kinds and change_set.updates:
+            return self.fields is None or not self.fields.isdisjoint(change_set.changed_fields())
+        return False
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._subscriptions = []
+        self._depth = 0  # Nesting of operation() blocks
+        self._operation_name = None
+        self._operation_cell = None
+        self._reset_pending()
+
+    def _reset_pending(self):
+        self._updates = {}  # Row key: [row, {field: [old, new]}]
+        self._inserts = {}  # Row key: RowInsert
+        self._removals = {}  # Row key: RowRemove
+        self._moves = []
+
+    @staticmethod
+    def _row_key(row_id, row):
+        return row_id if row_id is not None else ('row', row)
+
+    def subscribe(self, callback: Callable[[ChangeSet], None], fields: Optional[Set[str]] = None,
+                  kinds: Optional[Set[str]] = None):
+        """'fields' only filters updates. Returns the subscription, for unsubscribe()."""
+        unknown_kinds = set(kinds or ()) - set(KINDS)
+        if unknown_kinds:
+            raise ValueError(f"Unknown change kinds {unknown_kinds}. Known: {KINDS}.")
+
+        subscription = Subscription(callback, fields, kinds)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        try:
+            self._subscriptions.remove(subscription)
+        except ValueError:
+            pass
+
+    @property
+    def in_operation(self):
+        return self._depth > 0
+
+    def begin(self, name, cell=None):
+        if self._depth == 0:
+            self._operation_name = name
+            self._operation_cell = cell
+        self._depth += 1
+
+    def end(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._publish()
+
+    @contextmanager
+    def operation(self, name, cell=None):
+        """Collect changes until the outermost operation ends, then publish them as one ChangeSet."""
+        self.begin(name, cell)
+        try:
+            yield self
+        finally:
+            self.end()
+
+    def record_update(self, row_id, row, field, old, new):
+        if not self._subscriptions:
+            return
+        if self._depth == 0:
+            with self.operation(f'update {field}'):
+                self.record_update(row_id, row, field, old, new)
+            return
+
+        key = self._row_key(row_id, row)
+        pending = self._updates.get(key)
+        if pending is None:
+            self._updates[key] = [row, {field: [old, new]}]
+            return
+
+        pending[0] = row
+        field_change = pending[1].get(field)
+        if field_change is None:
+            pending[1][field] = [old, new]
+        else:
+            field_change[1] = new
+
+    def record_insert(self, row_id, row, values):
+        if not self._subscriptions:
+            return
+        if self._depth == 0:
+            with self.operation('insert'):
+                self.record_insert(row_id, row, values)
+            return
+
+        self._inserts[self._row_key(row_id, row)] = RowInsert(row_id, row, dict(values))
+
+    def record_remove(self, row_id, row, values):
+        if not self._subscriptions:
+            return
+        if self._depth == 0:
+            with self.operation('remove'):
+                self.record_remove(row_id, row, values)
+            return
+
+        key = self._row_key(row_id, row)
+        if self._inserts.pop(key, None) is not None:  # Inserted and removed in the same operation
+            self._updates.pop(key, None)
+            return
+        self._removals[key] = RowRemove(row_id, row, dict(values))
+
+    def record_move(self, row_id, from_row, to_row):
+        if not self._subscriptions:
+            return
+        if self._depth == 0:
+            with self.operation('move'):
+                self.record_move(row_id, from_row, to_row)
+            return
+
+        self._moves.append(RowMove(row_id, from_row, to_row))
+
+    def _publish(self):
+        updates = []
+        for key, (row, fields) in self._updates.items():
+            changed = {field: FieldChange(old, new) for field, (old, new) in fields.items() if old != new}
+            if changed:
+                row_id = None if isinstance(key, tuple) else key
+                updates.append(RowUpdate(row_id, row, changed))
+
+        change_set = ChangeSet(
+            self._operation_name, tuple(self._inserts.values()), tuple(updates), tuple(self._removals.values()),
+            tuple(self._moves), self._operation_cell
+            )
+        self._reset_pending()
+        self._operation_name = None
+        self._operation_cell = None
+
+        if change_set.is_empty():
+            return
+
+        for subscription in list(self._subscriptions):
+            if not subscription.wants(change_set):
+                continue
+            try:
+                subscription.callback(change_set)
+            except Exception as e:
+                logging.error(f"Exception type:{type(e)} in change-feed subscriber {subscription.callback} "
+                              f"(Error Description:{e}")
@@ -0,0 +1,185 @@
+"""
+Append-only operation journal (write-ahead log) for edits that aren't in the database file yet.
+
+Every ChangeSet from the model's change-feed (setData edits and TaskService operations) is appended to
+'<database file>.journal' as one JSON line holding the new values only. Appending is one sequential write per
+operation; the OS buffer is flushed per record, so a crash of the app loses nothing, and fsync is batched every
+FSYNC_INTERVAL_MS, so a power cut loses at most that window.
+
+A checkpoint replays the journal into 'daily_routine' in one transaction and truncates it. Checkpoints run every
+CHECKPOINT_INTERVAL_MS and on a clean close, which also removes the file. A journal with records in it at startup
+means the last run didn't close cleanly, so TableModel replays it before loading the data. Replay is idempotent:
+inserts are 'INSERT OR REPLACE' by id, updates set values, deletes delete.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, QTimer
+
+FSYNC_INTERVAL_MS = 100
+CHECKPOINT_INTERVAL_MS = 60_000
+JOURNAL_SUFFIX = '.journal'
+
+# Columns a journal record may write. Anything else in a (damaged) journal is ignored.
+JOURNALED_COLUMNS = ('from_time', 'to_time', 'duration', 'task_name', 'reminders', 'type', 'task_sequence',
+                     'min_duration', 'max_duration', 'anchored')
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(' ')  # Same text sqlite3 stores for a datetime parameter
+    raise TypeError(f"Can't journal a value of type {type(value)}.")
+
+
+class OperationJournal(QObject):
+    def __init__(self, app_data):
+        super().__init__()
+        self.app_data = app_data
+        self.file_path = f'{app_data.data_file_path}{JOURNAL_SUFFIX}'
+        self.records_since_checkpoint = 0
+
+        self._file = None
+        self._subscription = None
+        self._change_feed = None
+        self._needs_fsync = False
+
+        self._fsync_timer = QTimer(self)
+        self._fsync_timer.setInterval(FSYNC_INTERVAL_MS)
+        self._fsync_timer.timeout.connect(self.sync)
+
+        self._checkpoint_timer = QTimer(self)
+        self._checkpoint_timer.setInterval(CHECKPOINT_INTERVAL_MS)
+        self._checkpoint_timer.timeout.connect(self.checkpoint)
+
+    def recover(self):
+        """Replay what a previous run left in the journal. Call before the data is loaded."""
+        records = self._read_records()
+        if not records:
+            return 0
+
+        logging.warning(f"The last session didn't close cleanly. Replaying {len(records)} journaled operation/s.")
+        self._replay(records)
+        self._truncate()
+        return len(records)
+
+    def attach(self, change_feed):
+        """Start journaling the change-feed's operations."""
+        self._file = open(self.file_path, 'a', encoding='utf-8')
+        self._change_feed = change_feed
+        self._subscription = change_feed.subscribe(self.append, kinds={'update', 'insert', 'remove'})
+        self._fsync_timer.start()
+        self._checkpoint_timer.start()
+
+    def append(self, change_set):
+        record = {'op': change_set.operation}
+        if change_set.inserts:
+            record['i'] = [[insert.row_id, {column: insert.values.get(column) for column in JOURNALED_COLUMNS}]
+                           for insert in change_set.inserts if insert.row_id is not None]
+        if change_set.updates:
+            record['u'] = [[update.row_id, {field: change.new for field, change in update.fields.items()
+                                            if field in JOURNALED_COLUMNS}]
+                           for update in change_set.updates if update.row_id is not None]
+        if change_set.removals:
+            record['r'] = [removal.row_id for removal in change_set.removals if removal.row_id is not None]
+
+        try:
+            self._file.write(json.dumps(record, default=_encode_value, separators=(',', ':')) + '\n')
+            self._file.flush()  # In the OS's hands now; fsync is batched
+        except (OSError, TypeError, ValueError) as e:
+            logging.error(f"Exception type:{type(e)} when journaling '{change_set.operation}' (Error Description:{e}")
+            return
+
+        self._needs_fsync = True
+        self.records_since_checkpoint += 1
+
+    def sync(self):
+        if not self._needs_fsync or self._file is None:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logging.error(f"Exception type:{type(e)} when syncing the journal (Error Description:{e}")
+            return
+        self._needs_fsync = False
+
+    def checkpoint(self):
+        """Apply the journal to 'daily_routine' and start an empty one."""
+        if not self.records_since_checkpoint:
+            return
+
+        self.sync()
+        records = self._read_records()
+        try:
+            self._replay(records)
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} in journal checkpoint. The journal is kept "
+                          f"(Error Description:{e}")
+            return
+
+        self._truncate()
+        self.records_since_checkpoint = 0
+        logging.debug(f"Journal checkpoint: {len(records)} operation/s applied to the database.")
+
+    def close(self):
+        """Clean shutdown: checkpoint, then remove the journal. Called before the database is closed."""
+        self._fsync_timer.stop()
+        self._checkpoint_timer.stop()
+        if self._subscription is not None:
+            self._change_feed.unsubscribe(self._subscription)
+            self._subscription = None
+
+        self.checkpoint()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not self.records_since_checkpoint and os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def _read_records(self):
+        if not os.path.exists(self.file_path):
+            return []
+
+        records = []
+        with open(self.file_path, encoding='utf-8') as journal_file:
+            for line_number, line in enumerate(journal_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Normally the last line, cut short by the crash
+                    logging.warning(f"Skipping unreadable journal record at line {line_number}.")
+        return records
+
+    def _replay(self, records):
+        insert_query = (f"INSERT OR REPLACE INTO daily_routine (id, {', '.join(JOURNALED_COLUMNS)}) "
+                        f"VALUES (?, {', '.join('?' for _ in JOURNALED_COLUMNS)})")
+        delete_query = "DELETE FROM daily_routine WHERE id = ?"
+
+        conn = self.app_data.conn
+        with conn:  # One transaction for the whole journal
+            for record in records:
+                for row_id, values in record.get('i', ()):
+                    conn.execute(insert_query, (row_id, *(values.get(column) for column in JOURNALED_COLUMNS)))
+
+                for row_id, values in record.get('u', ()):
+                    columns = [column for column in values if column in JOURNALED_COLUMNS]
+                    if not columns:
+                        continue
+                    update_query = (f"UPDATE daily_routine SET {', '.join(f'{column} = ?' for column in columns)} "
+                                    f"WHERE id = ?")
+                    conn.execute(update_query, (*(values[column] for column in columns), row_id))
+
+                for row_id in record.get('r', ()):
+                    conn.execute(delete_query, (row_id,))
+
+    def _truncate(self):
+        if self._file is not None:
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        elif os.path.exists(self.file_path):
+            open(self.file_path, 'w').close()
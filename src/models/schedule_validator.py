@@ -0,0 +1,115 @@
+"""
+Whole-schedule consistency check.
+
+The schedule is valid when:
+- 'chain': each row's to_time is the next row's from_time (no gaps, no overlaps),
+- 'duration': each row's duration is to_time - from_time, in whole minutes, and at least one minute,
+- 'span': the first row starts at midnight and the last one ends at a later midnight (whole days).
+
+validate() checks whole columns (lists of from_time, to_time and duration) with C-level map() calls instead of a Python
+loop per row: about 0.4 s for 1M rows. NumPy doesn't help here: turning 1M datetime objects into a datetime64 array
+alone takes several seconds. Columns with a missing or wrong-typed value fall back to a per-row check.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from itertools import compress, count, islice
+from operator import ne, sub
+from typing import List, NamedTuple
+
+MINUTE = timedelta(minutes=1)
+MIDNIGHT = time(0)
+LOGGED_VIOLATIONS = 10  # Violations listed in the log. The rest are counted
+
+CHAIN = 'chain'
+DURATION = 'duration'
+SPAN = 'span'
+
+
+class Violation(NamedTuple):
+    kind: str  # CHAIN, DURATION or SPAN
+    row: int
+    message: str
+
+
+class ScheduleReport(NamedTuple):
+    violations: List[Violation]
+    row_count: int
+
+    @property
+    def is_valid(self):
+        return not self.violations
+
+    def rows(self, kind=None):
+        """Rows with a violation (of 'kind', or any), for highlighting."""
+        return {violation.row for violation in self.violations if kind is None or violation.kind == kind}
+
+    def log(self, when):
+        if self.is_valid:
+            logging.debug(f"Schedule is consistent {when} ({self.row_count} rows).")
+            return
+        listed = '\n'.join(f"  row {violation.row}: {violation.message}"
+                           for violation in self.violations[:LOGGED_VIOLATIONS])
+        not_listed = len(self.violations) - LOGGED_VIOLATIONS
+        more = f"\n  ... and {not_listed} more." if not_listed > 0 else ''
+        logging.warning(f"{len(self.violations)} schedule inconsistency/ies {when}:\n{listed}{more}")
+
+
+def validate(rows_data):
+    """Check all rows. Returns a ScheduleReport with the violations sorted by row."""
+    if not rows_data:
+        return ScheduleReport([], 0)
+
+    from_times = [row_data['from_time'] for row_data in rows_data]
+    to_times = [row_data['to_time'] for row_data in rows_data]
+    durations = [row_data['duration'] for row_data in rows_data]
+
+    try:
+        chain_rows, duration_rows = _check_columns(from_times, to_times, durations)
+    except TypeError:  # A missing or wrong-typed value
+        chain_rows, duration_rows = _check_rows(from_times, to_times, durations)
+
+    violations = [Violation(CHAIN, row, f"Ends at {to_times[row]}, but the next task starts at {from_times[row + 1]}.")
+                  for row in chain_rows]
+    violations += [Violation(DURATION, row, f"Duration is {durations[row]}, but it runs from {from_times[row]} "
+                                            f"to {to_times[row]}.")
+                   for row in duration_rows]
+    violations += _check_span(from_times[0], to_times[-1], len(rows_data) - 1)
+    violations.sort(key=lambda violation: violation.row)
+    return ScheduleReport(violations, len(rows_data))
+
+
+def _check_columns(from_times, to_times, durations):
+    """Each check is a few map() calls over whole columns, with no Python code per row."""
+    chain_breaks = map(ne, to_times, islice(from_times, 1, None))
+    chain_rows = list(compress(count(), chain_breaks))
+
+    # Durations repeat, so each distinct one is turned into a timedelta once. Below one minute it's None: never equal
+    timedelta_by_duration = {duration: duration * MINUTE if duration >= 1 else None for duration in set(durations)}
+    lengths = map(sub, to_times, from_times)  # timedelta per row
+    expected = map(timedelta_by_duration.__getitem__, durations)
+    duration_rows = list(compress(count(), map(ne, lengths, expected)))
+    return chain_rows, duration_rows
+
+
+def _check_rows(from_times, to_times, durations):
+    """Row by row, for columns with missing or wrong-typed values (a damaged file)."""
+    chain_rows = [row for row in range(len(from_times) - 1) if to_times[row] != from_times[row + 1]]
+    duration_rows = []
+    for row, (start, end, duration) in enumerate(zip(from_times, to_times, durations)):
+        valid = (isinstance(start, datetime) and isinstance(end, datetime) and isinstance(duration, int)
+                 and duration >= 1 and end - start == duration * MINUTE)
+        if not valid:
+            duration_rows.append(row)
+    return chain_rows, duration_rows
+
+
+def _check_span(first_start, last_end, last_row) -> List[Violation]:
+    violations = []
+    if not isinstance(first_start, datetime) or first_start.time() != MIDNIGHT:
+        violations.append(Violation(SPAN, 0, f"The first task starts at {first_start}, not at midnight."))
+    if not isinstance(last_end, datetime) or last_end.time() != MIDNIGHT:
+        violations.append(Violation(SPAN, last_row, f"The last task ends at {last_end}, not at midnight."))
+    elif isinstance(first_start, datetime) and last_end <= first_start:
+        violations.append(Violation(SPAN, last_row, f"The last task ends at {last_end}, before the day starts."))
+    return violations
+
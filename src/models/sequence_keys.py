@@ -0,0 +1,48 @@
+"""
+Gap-based 'task_sequence' keys.
+
+Rows are ordered by 'task_sequence', but the keys don't have to be 1..N: they're spaced SEQUENCE_GAP apart, so a row
+moved or inserted between two others gets a key between theirs and no other row is renumbered. Keys stay integers
+(the column is INTEGER); halving a gap of 1024 allows ten moves into the same spot before it runs out.
+
+When there's no room between two keys, TableModel rebalances: every row gets (index + 1) * SEQUENCE_GAP again. Gaps
+below MIN_GAP are rebalanced ahead of time, when the app is idle.
+"""
+SEQUENCE_GAP = 1024
+MIN_GAP = 16
+
+
+def keys_between(before, after, count):
+    """
+    'count' increasing keys strictly between 'before' and 'after', evenly spread. 'after' is None at the end of the
+    table. Returns None if they don't fit.
+    """
+    if after is None:
+        return [before + SEQUENCE_GAP * (offset + 1) for offset in range(count)]
+
+    step = (after - before) // (count + 1)
+    if step < 1:
+        return None
+    return [before + step * (offset + 1) for offset in range(count)]
+
+
+def is_tight(before, keys, after):
+    """True if a gap around or between 'keys' is below MIN_GAP, so a rebalance is due."""
+    if not keys:
+        return False
+    smallest_gap = keys[0] - before
+    if len(keys) > 1:
+        smallest_gap = min(smallest_gap, keys[1] - keys[0])
+    if after is not None:
+        smallest_gap = min(smallest_gap, after - keys[-1])
+    return smallest_gap < MIN_GAP
+
+
+def needs_rebalance(keys):
+    """True if any two neighbouring keys are less than MIN_GAP apart (or out of order). One pass."""
+    return any(after - before < MIN_GAP for before, after in zip(keys, keys[1:]))
+
+
+def spaced_key(row):
+    """The key of 'row' right after a rebalance."""
+    return (row + 1) * SEQUENCE_GAP
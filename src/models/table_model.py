@@ -1,13 +1,26 @@
 import logging
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
-from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, QTimer, Qt
+from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
-from src.models.app_data import AppData
-from src.resources.default import COLUMN_KEYS, VISIBLE_HEADERS
-from src.utils import helper_fn
+from src.controllers.time_calculator import DEFAULT_CONSTRAINTS, MIN_DURATION, ScheduleError
+from src.models import schedule_validator, sequence_keys
+from src.models.change_feed import ChangeFeed
+from src.models.operation_journal import OperationJournal
+from src.models.task_tree import TaskTree
+from src.models.time_totals import TOTALS_FIELDS, TimeTotals
+from src.resources.default import COLUMN_KEYS, CONSTRAINT_DEFAULTS, VISIBLE_HEADERS
+from src.utils import helper_fn, startup_timeline, time_parser, tracing
+from src.utils.service_registry import services
+from src.utils.time_parser import TimeParseError
+
+SEQUENCE_REBALANCE_IDLE_MS = 2000  # Tight sequence keys are respaced this long after the last key was assigned
+REVALIDATE_IDLE_MS = 500  # Highlighted rows are checked again this long after the last edit that could fix them
+INVALID_ROW_COLOR = "#FFD6D6"  # Background of rows the last schedule check found inconsistent
 
 
 class TableModel(QAbstractItemModel):
@@ -17,73 +30,369 @@ class TableModel(QAbstractItemModel):
         self.visible_headers = VISIBLE_HEADERS  # Visible headers for UI
         self.column_keys = COLUMN_KEYS  # Keys (str) used internally
 
-        self.app_data = AppData()
+        self.app_data = services.get('app_data')
+        self.time_calculator = services.get('time_calculator')  # Schedule engine for duration and time edits
+        self.change_feed = ChangeFeed()  # Deltas for components that react to edits (see change_feed.py)
+        self.journal = OperationJournal(self.app_data)  # Crash recovery for edits not in the database file yet
+
+        # Edit batches (begin_edit_batch/end_edit_batch)
+        self._batch_depth = 0
+        self._batch_durations = {}  # Row: new duration, applied when the batch ends
+        self._batch_changed_rows = set()  # Rows written during the batch, notified when it ends
+
+        # Rows with a violation in the last validate_schedule(), by id so the highlight follows them. Checked again
+        # after schedule edits while there are any, so fixing a row clears its highlight.
+        self.invalid_row_ids = set()
+        self._revalidate_timer = QTimer(self)
+        self._revalidate_timer.setSingleShot(True)
+        self._revalidate_timer.setInterval(REVALIDATE_IDLE_MS)
+        self._revalidate_timer.timeout.connect(lambda: self.validate_schedule('after edits'))
+
+        # Background rebalance of 'task_sequence' keys (see sequence_keys.py)
+        self._sequence_rebalance_timer = QTimer(self)
+        self._sequence_rebalance_timer.setSingleShot(True)
+        self._sequence_rebalance_timer.setInterval(SEQUENCE_REBALANCE_IDLE_MS)
+        self._sequence_rebalance_timer.timeout.connect(self.rebalance_sequence_keys_if_needed)
 
         try:
-            self._data: List[Dict[str, Any]] = list(self.app_data.get_all_entries())
+            with startup_timeline.phase('data load'):
+                self.journal.recover()  # Edits left over from a session that didn't close cleanly
+                self._data: List[Dict[str, Any]] = list(self.app_data.get_all_entries())
+                self._move_legacy_day_end()
+
+            self.journal.attach(self.change_feed)
+            self.task_tree = TaskTree(self._data)  # Main tasks and subtasks. Built on first use
+            self.change_feed.subscribe(self.task_tree.on_changes, fields={'duration', 'type'})
+            self.time_totals = TimeTotals(self._data)  # Minutes per type and per tag. Built on first use
+            self.change_feed.subscribe(self.time_totals.on_changes, fields=TOTALS_FIELDS)
+            self.change_feed.subscribe(self._on_schedule_changes, fields={'from_time', 'to_time', 'duration'})
+            self._sequence_rebalance_timer.start()  # Files from older versions have dense 1..N keys
 
         except Exception as e:
             logging.error(f"Exception in TableModel init: {e}")
             self.app_data.close()  # Close the database connection on failure
             raise  # Re-raise the exception to signal the failure
 
+    def _move_legacy_day_end(self):
+        """
+        Files from older versions end the last task at midnight of the day it starts, before its start. It ends at the
+        next midnight now (see schedule_validator.py), so its end moves forward a day, written back once.
+        """
+        if not self._data:
+            return
+        last_row_data = self._data[-1]
+        start, end = last_row_data['from_time'], last_row_data['to_time']
+        if not isinstance(start, datetime) or not isinstance(end, datetime) or end > start:
+            return
+
+        last_row_data['to_time'] += timedelta(days=1)
+        self.app_data.update_rows([last_row_data])
+        logging.info(f"The last task's end moved to the next midnight ({last_row_data['to_time']}).")
+
     def get_row_data(self, row, column_key=None):
         if column_key is None:
-            logging.debug(f"Returning entire row data for row:'{row}'")
+            if tracing.model.enabled:
+                tracing.model.debug(f"Returning entire row data for row:'{row}'")
             return self._data[row]
         else:
-            logging.debug(f"Returning {column_key}'s value: ('{self._data[row][column_key]}') at row index:{row}")
+            if tracing.model.enabled:
+                tracing.model.debug(f"Returning {column_key}'s value: ('{self._data[row][column_key]}') at row index:{row}")
             return self._data[row][column_key]
 
     def insert_new_row(self, index, data_to_insert):
-        self.beginInsertRows(QModelIndex(), index, index)
+        """Insert one row at 'index'. Its sequence key is assigned here, in the same change-feed operation."""
+        with self.change_feed.operation('insert'):  # Nested in the caller's operation, if any
+            data_to_insert['task_sequence'] = self._claim_sequence_keys(index, 1)[0]
+            self.beginInsertRows(QModelIndex(), index, index)
+
+            try:
+                self._data.insert(index, data_to_insert)  # Inset in model's database
+                self._data[index]['id'] = self.app_data.insert_new_row(data_to_insert)  # Insert in SQLite file, set ID
+                self.change_feed.record_insert(self._data[index]['id'], index, self._data[index])
+
+            except Exception as e:
+                logging.error(f"Exception type:{type(e)} when inserting new row (Error Description:{e}")
+
+            self.endInsertRows()
+
+    def _set_field(self, row, column_key, value):
+        """Every write to a row's field goes through here, so that the change-feed sees it."""
+        row_data = self._data[row]
+        old_value = row_data[column_key]
+        row_data[column_key] = value
+        self.change_feed.record_update(row_data.get('id'), row, column_key, old_value, value)
+
+    def row_index_by_id(self):
+        """{row id: row index} for the current order. O(rows), so build it once per operation, not per row."""
+        return {row_data.get('id'): row for row, row_data in enumerate(self._data)}
+
+    def set_fields_by_id(self, values_by_id):
+        """Write {row id: {column key: value}} and notify views with one dataChanged for the rows touched."""
+        row_index_by_id = self.row_index_by_id()
+        changed_rows = []
+
+        for row_id, values in values_by_id.items():
+            row = row_index_by_id.get(row_id)
+            if row is None:
+                logging.warning(f"Row with ID {row_id} not found. Its values weren't set.")
+                continue
+            for column_key, value in values.items():
+                self._set_field(row, column_key, value)
+            changed_rows.append(row)
+
+        self._notify_rows_changed(changed_rows)
+
+    def restore_rows(self, index, rows_data):
+        """Insert rows with their original IDs at 'index' (undo of a delete, redo of an insert)."""
+        self.beginInsertRows(QModelIndex(), index, index + len(rows_data) - 1)
 
         try:
-            self._data.insert(index, data_to_insert)  # Inset in model's database
-            self._data[index]['id'] = self.app_data.insert_new_row(data_to_insert)  # Insert in SQLite file and set ID
+            restored = [dict(row_data) for row_data in rows_data]
+            self._data[index:index] = restored
+            for offset, row_data in enumerate(restored):
+                self.change_feed.record_insert(row_data['id'], index + offset, row_data)
+            self._fit_sequence_keys(index, len(restored))  # Their old keys may not fit anymore
+            self.app_data.restore_rows(restored)
+
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when restoring rows (Error Description:{e}")
+
+        self.endInsertRows()
+
+    def insert_task_block(self, position, tasks):
+        """
+        Insert pasted tasks (task_clipboard.PastedTask) as one block before 'position'. The block starts where the row
+        above ends; the rows below start later by the block's length and the last row gives up that time, as with
+        'New Task'. Rejected (nothing changes) if the last row would be left with less than one minute.
+
+        One beginInsertRows, one executemany and one pass over the rows below, so large blocks stay fast. The block's
+        sequence keys go between its neighbours' (see sequence_keys.py), so the rows below keep theirs.
+        """
+        last_row = len(self._data) - 1
+        if not tasks or not 0 < position <= last_row:
+            logging.warning(f"Can't insert {len(tasks)} task/s at row {position}.")
+            return False
+
+        block_minutes = sum(task.duration for task in tasks)
+        last_duration = self._data[last_row]['duration'] - block_minutes
+        if last_duration < 1:
+            logging.warning(f"Paste rejected: {block_minutes} minutes don't fit in the last task.")
+            QMessageBox.warning(
+                QApplication.focusWidget(), "Not enough time.",
+                f"The pasted tasks take {block_minutes} minutes, but the last task only has "
+                f"{self._data[last_row]['duration']}. It has to keep at least one minute."
+                )
+            return False
+
+        keys = self._claim_sequence_keys(position, len(tasks))
+        block = []
+        start = self._data[position - 1]['to_time']
+        for offset, task in enumerate(tasks):
+            end = start + timedelta(minutes=task.duration)
+            block.append({
+                'id': None,
+                'from_time': start,
+                'to_time': end,
+                'duration': task.duration,
+                'task_name': task.task_name,
+                'reminders': start - timedelta(minutes=task.reminder_lead),
+                'type': task.type,
+                'task_sequence': keys[offset],
+                **CONSTRAINT_DEFAULTS,
+                })
+            start = end
 
+        try:
+            row_ids = self.app_data.insert_rows(block)
         except Exception as e:
-            logging.error(f"Exception type:{type(e)} when inserting new row (Error Description:{e}")
+            logging.error(f"Exception type:{type(e)} when inserting {len(block)} rows (Error Description:{e}")
+            return False
 
+        self.beginInsertRows(QModelIndex(), position, position + len(block) - 1)
+        for row_data, row_id in zip(block, row_ids):
+            row_data['id'] = row_id
+        self._data[position:position] = block
+        for offset, row_data in enumerate(block):
+            self.change_feed.record_insert(row_data['id'], position + offset, row_data)
         self.endInsertRows()
 
+        # Rows below: later by the block's length. The last row keeps its end time.
+        shift = timedelta(minutes=block_minutes)
+        first_row_below = position + len(block)
+        last_row = len(self._data) - 1
+        for row in range(first_row_below, last_row + 1):
+            row_data = self._data[row]
+            self._set_field(row, 'from_time', row_data['from_time'] + shift)
+            self._set_field(row, 'reminders', row_data['reminders'] + shift)
+            if row != last_row:
+                self._set_field(row, 'to_time', row_data['to_time'] + shift)
+        self._set_field(last_row, 'duration', last_duration)
+        self._notify_rows_changed(range(first_row_below, last_row + 1))
+
+        tracing.model.debug(lambda: f"Inserted a block of {len(block)} task/s ({block_minutes} minutes) at row {position}.")
+        return True
+
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_child):
+        """
+        Move 'count' rows to before 'destination_child' (drag and drop). The first and last rows stay in place.
+
+        The moved rows get sequence keys between their new neighbours', so theirs are the only keys written. Every
+        row keeps its duration and reminder lead time; the times of the rows between the old and the new place are
+        recomputed, since the day is one unbroken chain from midnight.
+        """
+        last_row = len(self._data) - 1
+        source_end = source_row + count - 1
+
+        if source_parent.isValid() or destination_parent.isValid() or count < 1:
+            return False
+        if source_row < 1 or source_end >= last_row or not 1 <= destination_child <= last_row:
+            tracing.model.debug(lambda: f"Can't move rows {source_row}-{source_end} to {destination_child}.")
+            return False
+        if source_row <= destination_child <= source_end + 1:  # Already there
+            return False
+        if not self.beginMoveRows(QModelIndex(), source_row, source_end, QModelIndex(), destination_child):
+            return False
+
+        block = self._data[source_row:source_end + 1]
+        del self._data[source_row:source_end + 1]
+        new_first = destination_child if destination_child < source_row else destination_child - count
+        self._data[new_first:new_first] = block
+        self.endMoveRows()
+
+        first_changed = min(source_row, new_first)
+        last_changed = max(source_end, new_first + count - 1)
+        with self.change_feed.operation('Move'):  # The moves, keys and times are one ChangeSet (one undo step)
+            for offset, row_data in enumerate(block):
+                self.change_feed.record_move(row_data.get('id'), source_row + offset, new_first + offset)
+            self._fit_sequence_keys(new_first, count)
+            self._rechain_times(first_changed, last_changed)
+        self._notify_rows_changed(range(first_changed, last_changed + 1))
+
+        tracing.model.debug(lambda: f"Moved rows {source_row}-{source_end} to row {new_first}.")
+        return True
+
+    def move_block(self, first_row, count, to_row):
+        """moveRows, with the destination given as the first moved row's index after the move (undo/redo)."""
+        destination_child = to_row + count if to_row > first_row else to_row
+        return self.moveRows(QModelIndex(), first_row, count, QModelIndex(), destination_child)
+
+    def _rechain_times(self, first_row, last_row):
+        """Chain the times of first_row..last_row from the row above, by duration. Reminders keep their lead time."""
+        start = self._data[first_row - 1]['to_time']
+        for row in range(first_row, last_row + 1):
+            row_data = self._data[row]
+            end = start + timedelta(minutes=row_data['duration'])
+            if row_data['from_time'] != start:
+                lead = row_data['from_time'] - row_data['reminders']
+                self._set_field(row, 'from_time', start)
+                self._set_field(row, 'reminders', start - lead)
+            if row_data['to_time'] != end:
+                self._set_field(row, 'to_time', end)
+            start = end
+
+    def _claim_sequence_keys(self, position, count):
+        """
+        Sequence keys for 'count' rows about to be inserted at 'position'. Makes room for them first: the last row's
+        key moves up, or every key is respaced if there's no room. Call it in the insert's change-feed operation.
+        """
+        keys = self._keys_between_rows(position - 1, position, count)
+        if keys is None:
+            self.rebalance_sequence_keys(open_at=position, open_rows=count)
+            keys = self._keys_between_rows(position - 1, position, count)
+        self._raise_last_key(position, keys)
+        return keys
+
+    def _fit_sequence_keys(self, first_row, count):
+        """Give rows first_row..first_row + count - 1, already in place, keys that fit between their neighbours'."""
+        after_row = first_row + count
+        before = self._data[first_row - 1]['task_sequence'] if first_row > 0 else 0
+        after = self._data[after_row]['task_sequence'] if after_row < len(self._data) else None
+        current_keys = [before, *(row_data['task_sequence'] for row_data in self._data[first_row:after_row])]
+        if after is not None:
+            current_keys.append(after)
+        if all(key < next_key for key, next_key in zip(current_keys, current_keys[1:])):
+            return  # They still fit (undo of a delete, usually)
+
+        keys = self._keys_between_rows(first_row - 1, after_row, count)
+        if keys is None:
+            self.rebalance_sequence_keys()
+            return
+        self._raise_last_key(after_row, keys)
+        for offset, key in enumerate(keys):
+            self._set_field(first_row + offset, 'task_sequence', key)
+
+    def _keys_between_rows(self, row_before, row_after, count):
+        """Keys between two rows' keys, or None if there's no room. Computes only; nothing is written."""
+        before = self._data[row_before]['task_sequence'] if row_before >= 0 else 0
+
+        if row_after == len(self._data) - 1:  # 'New Task' and most pastes. The last row stays last,
+            return sequence_keys.keys_between(before, None, count)  # so its key moves up (_raise_last_key).
+
+        after = self._data[row_after]['task_sequence'] if row_after < len(self._data) else None
+        keys = sequence_keys.keys_between(before, after, count)
+        if keys is not None and sequence_keys.is_tight(before, keys, after):
+            self._sequence_rebalance_timer.start()  # Room is running out here. Respace while the app is idle.
+        return keys
+
+    def _raise_last_key(self, row_after, keys):
+        """If 'keys' are for rows just before the last row, move its key above them instead of letting gaps shrink."""
+        last_row = len(self._data) - 1
+        if row_after == last_row and self._data[last_row]['task_sequence'] <= keys[-1]:
+            self._set_field(last_row, 'task_sequence', keys[-1] + sequence_keys.SEQUENCE_GAP)
+
+    def rebalance_sequence_keys(self, open_at=None, open_rows=0):
+        """Respace every row's key SEQUENCE_GAP apart, leaving room for 'open_rows' keys before row 'open_at'."""
+        self._sequence_rebalance_timer.stop()
+        changed = 0
+        with self.change_feed.operation('Rebalance sequence keys'):  # Saved like any edit. Not an undo step.
+            for row, row_data in enumerate(self._data):
+                key = sequence_keys.spaced_key(row + open_rows if open_at is not None and row >= open_at else row)
+                if row_data['task_sequence'] != key:
+                    self._set_field(row, 'task_sequence', key)
+                    changed += 1
+        logging.info(f"Sequence keys rebalanced. {changed} of {len(self._data)} row/s got a new key.")
+
+    def rebalance_sequence_keys_if_needed(self):
+        if sequence_keys.needs_rebalance([row_data['task_sequence'] for row_data in self._data]):
+            self.rebalance_sequence_keys()
+
     def set_row_data(self, row,
                      new_from=None, new_to=None,
                      new_duration=None, new_type=None,
                      new_task_sequence=None):
 
-        logging.debug(f"Updating value/s of row: '{row}'.")
+        tracing.model.debug(lambda: f"Updating value/s of row: '{row}'.")
 
         if 0 <= row < self.rowCount():
             changed_indices = []
 
             if new_from is not None:
-                logging.debug("Updating 'from_time'")
-                self._data[row]['from_time'] = new_from
+                tracing.model.debug("Updating 'from_time'")
+                self._set_field(row, 'from_time', new_from)
                 from_col_index = self.createIndex(row, 0)  # Assuming 'from_time' is in column 0
                 changed_indices.append(from_col_index)
 
             if new_to is not None:
-                logging.debug("Updating 'to_time'")
-                self._data[row]['to_time'] = new_to
+                tracing.model.debug("Updating 'to_time'")
+                self._set_field(row, 'to_time', new_to)
                 to_col_index = self.createIndex(row, 1)
                 changed_indices.append(to_col_index)
 
             if new_duration is not None:
-                logging.debug("Updating 'duration'")
-                self._data[row]['duration'] = new_duration
+                tracing.model.debug("Updating 'duration'")
+                self._set_field(row, 'duration', new_duration)
                 dur_col_index = self.createIndex(row, 1)  # Assuming 'duration' is in column 1
                 changed_indices.append(dur_col_index)
 
             if new_type is not None:
-                logging.debug("Updating 'type'")
-                self._data[row]['type'] = new_type
+                tracing.model.debug("Updating 'type'")
+                self._set_field(row, 'type', new_type)
                 type_col_index = self.createIndex(row, 2)
                 changed_indices.append(type_col_index)
 
             if new_task_sequence is not None:
-                logging.debug("Updating 'task_sequence'")
-                self._data[row]['task_sequence'] = new_task_sequence
+                tracing.model.debug("Updating 'task_sequence'")
+                self._set_field(row, 'task_sequence', new_task_sequence)
                 seq_col_index = self.createIndex(row, 2)  # Assuming 'task_sequence' is in column 2
                 changed_indices.append(seq_col_index)
 
@@ -91,15 +400,16 @@ class TableModel(QAbstractItemModel):
             for index in changed_indices:
                 self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
 
-            logging.debug("Values updated and dataChanged emitted.")
+            tracing.model.debug("Values updated and dataChanged emitted.")
 
     def delete_row_and_data(self, row):
-        logging.debug(f"Deleting row: '{row}'")
+        tracing.model.debug(lambda: f"Deleting row: '{row}'")
         self.beginRemoveRows(QModelIndex(), row, row)
 
         try:
             row_id = self._data[row]['id']  # Get the row ID before deleting
-            self._data.pop(row)  # Delete from model's database
+            removed_row_data = self._data.pop(row)  # Delete from model's database
+            self.change_feed.record_remove(row_id, row, removed_row_data)
             self.app_data.delete_task(row_id)  # Delete from SQLite file using row ID
 
         except Exception as e:
@@ -107,22 +417,61 @@ class TableModel(QAbstractItemModel):
             return False
 
         self.endRemoveRows()
-        logging.debug(f"Row {row} deleted from model and SQLite database.")
+        tracing.model.debug(lambda: f"Row {row} deleted from model and SQLite database.")
         return True
 
+    def delete_rows(self, row, count):
+        """Delete 'count' rows from 'row' with one beginRemoveRows and one transaction (undo of a paste)."""
+        tracing.model.debug(lambda: f"Deleting {count} row/s from row: '{row}'")
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+
+        try:
+            removed_rows_data = self._data[row:row + count]
+            del self._data[row:row + count]
+            for offset, removed_row_data in enumerate(removed_rows_data):
+                self.change_feed.record_remove(removed_row_data['id'], row + offset, removed_row_data)
+            self.app_data.delete_tasks([removed_row_data['id'] for removed_row_data in removed_rows_data])
+
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when deleting rows (Error Description:{e}")
+
+        self.endRemoveRows()
+
+    def validate_schedule(self, when):
+        """Check the whole schedule (see schedule_validator.py), log what's wrong and highlight the rows."""
+        self._revalidate_timer.stop()
+        report = schedule_validator.validate(self._data)
+        report.log(when)
+
+        invalid_row_ids = {self._data[row].get('id') for row in report.rows()}
+        changed_ids = self.invalid_row_ids.symmetric_difference(invalid_row_ids)
+        self.invalid_row_ids = invalid_row_ids
+        changed_rows = [row for row, row_data in enumerate(self._data) if row_data.get('id') in changed_ids]
+        if changed_rows:
+            top_left = self.createIndex(min(changed_rows), 0)
+            bottom_right = self.createIndex(max(changed_rows), self.columnCount() - 1)
+            self.dataChanged.emit(top_left, bottom_right, [Qt.ItemDataRole.BackgroundRole])
+        return report
+
+    def _on_schedule_changes(self, change_set):
+        if self.invalid_row_ids:  # Nothing to clear otherwise. New violations are found on load and before save.
+            self._revalidate_timer.start()
+
     def save_to_database_file(self):
-        logging.debug(f"Looping rows in model and calling update or insert in AppData.")
-        print(self.rowCount())
+        self.validate_schedule('before save')  # Saved anyway: the rows are highlighted and the log has the details
+
+        tracing.model.debug(lambda: f"Looping {self.rowCount()} rows in model and calling update or insert in AppData.")
 
         for row in range(self.rowCount()):
             row_data = self.get_row_data(row)
             self.app_data.update_sqlite_data(row_data)
 
         self.app_data.commit_sqlite_all()
-        logging.debug(f"Saving to database file. {self._data}")
+        tracing.model.debug(lambda: f"Saving to database file. {self._data}")
 
     def close_database(self):
         logging.debug("Closing the database.")
+        self.journal.close()  # Checkpoints what's left in the journal
         self.app_data.close()  # Use the close method of AppData
         logging.debug("Database closed.")
 
@@ -131,7 +480,18 @@ class TableModel(QAbstractItemModel):
         This method is called by the view to retrieve the data for a given index. The role parameter specifies what kind of data is being requested (e.g., display data, tooltip data). It doesn't change data.
         """
 
-        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if self.invalid_row_ids and self._data[index.row()].get('id') in self.invalid_row_ids:
+                return QColor(INVALID_ROW_COLOR)
+            return None
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.constraints_tooltip(index.row())
+
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
             return None
 
         row_data = self._data[index.row()]
@@ -172,7 +532,7 @@ class TableModel(QAbstractItemModel):
         return row_data.get(column_key, None)
 
     def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
-        logging.debug(f"'setData' method called with value:'{value}'.")
+        tracing.model.debug(lambda: f"'setData' method called with value:'{value}'.")
 
         if not index.isValid() or role != Qt.ItemDataRole.EditRole:
             return False
@@ -183,14 +543,310 @@ class TableModel(QAbstractItemModel):
         row = index.row()
         column_key = self.column_keys[index.column()]
 
-        if column_key in ['task_name']:
-            return self.handle_task_name_input(index, row, value, role)
+        if self._batch_depth and column_key in ('duration', 'task_name'):
+            return self.set_in_edit_batch(row, column_key, value)
+
+        # Neighbouring rows' changes are published with this edit
+        with self.change_feed.operation('setData', cell=(self._data[row].get('id'), column_key)):
+            if column_key in ['task_name']:
+                return self.handle_task_name_input(index, row, value, role)
+
+            if column_key in ['duration']:
+                return self.handle_duration_input(index, row, value, role)
+
+            if column_key in ["from_time", "to_time"]:
+                return self.set_and_update_fields_and_notify(value, row, column_key)
+
+    def begin_edit_batch(self, name='Edit batch'):
+        """
+        Start a batch of setData edits (pasting into a column of cells, scripts). Until the outermost end_edit_batch():
+        - duration edits are only checked and kept; the schedule is recomputed once, when the batch ends
+        - task names are written, but views aren't notified
+        - the change-feed collects everything as one operation (one undo step, one autosave, one journal record)
+        Rows mustn't be inserted or removed inside a batch.
+        """
+        if self._batch_depth == 0:
+            self._batch_durations.clear()
+            self._batch_changed_rows.clear()
+        self._batch_depth += 1
+        self.change_feed.begin(name)
+
+    def end_edit_batch(self):
+        """Apply the batch. Returns False if the durations were rejected (the other edits are kept)."""
+        self._batch_depth -= 1
+        applied = True
+        try:
+            if self._batch_depth == 0:
+                if self._batch_durations:
+                    applied = self.apply_batch_durations(self._batch_durations)
+                self._notify_rows_changed(self._batch_changed_rows)
+                self._batch_durations.clear()
+                self._batch_changed_rows.clear()
+        finally:
+            self.change_feed.end()
+        return applied
+
+    @contextmanager
+    def edit_batch(self, name='Edit batch'):
+        self.begin_edit_batch(name)
+        try:
+            yield self
+        finally:
+            self.end_edit_batch()
+
+    def set_in_edit_batch(self, row, column_key, value):
+        if column_key == 'task_name':
+            if self._data[row]['task_name'] == value:
+                return False
+            self._set_field(row, 'task_name', value)
+            self._batch_changed_rows.add(row)
+            return True
+
+        try:
+            input_duration_int = helper_fn.strip_text(value)
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when striping input duration string (Error Description:{e}")
+            return False
+
+        if input_duration_int <= 0:
+            logging.warning(f"Duration has to be at least one minute. Ignoring '{value}' for row {row}.")
+            return False
+
+        self._batch_durations[row] = input_duration_int
+        return True
+
+    def apply_batch_durations(self, durations):
+        """
+        Solve {row: new duration} with the schedule engine in one pass (TimeCalculator.solve_durations): every edited
+        row gets its new duration and the net change is absorbed by the other rows, whatever the order of the edits.
+        Nothing is written if the batch can't be solved.
+        """
+        try:
+            change = self.time_calculator.solve_durations(self._data, durations)
+        except ScheduleError as e:
+            logging.warning(f"Batch of {len(durations)} duration edit/s rejected: {e}")
+            QMessageBox.warning(QApplication.focusWidget(), "Invalid durations.",
+                                f"{e} The duration changes weren't applied.")
+            return False
+        if change is None:
+            return True
+
+        rows_written = self.apply_schedule_change(change)
+        self._batch_changed_rows.update(rows_written)
+        tracing.model.debug(lambda: f"Batch of {len(durations)} duration edit/s applied to {len(rows_written)} row/s.")
+        return True
+
+    def apply_schedule_change(self, change):
+        """Write a TimeCalculator solve. Reminders keep their lead time. Returns the rows written."""
+        for offset, (from_time, to_time, duration) in enumerate(change.times):
+            row = change.first_row + offset
+            row_data = self._data[row]
+            if row_data['from_time'] != from_time:
+                lead = row_data['from_time'] - row_data['reminders']
+                self._set_field(row, 'from_time', from_time)
+                self._set_field(row, 'reminders', from_time - lead)
+            if row_data['to_time'] != to_time:
+                self._set_field(row, 'to_time', to_time)
+            if row_data['duration'] != duration:
+                self._set_field(row, 'duration', duration)
+        return range(change.first_row, change.last_row + 1)
+
+    def resize_rows(self, first_row, last_row, target_total):
+        """
+        Scale the durations of first_row..last_row proportionally so that they add up to 'target_total' minutes
+        (TimeCalculator.solve_range_total). One solve, one pass of writes and one dataChanged, so the change-feed
+        publishes it as one update and autosave writes it in one transaction.
+        """
+        with self.change_feed.operation('Fit Durations'):
+            return self._solve_and_apply("Can't resize the tasks.", self.time_calculator.solve_range_total,
+                                         first_row, last_row, target_total)
+
+    def set_constraints(self, rows, constraints):
+        """
+        Give 'rows' TaskConstraints (min/max duration, anchored start), as one operation: one undo step, saved by
+        autosave and the journal like any edit. Rejected with a message if a row's duration is outside them.
+        """
+        for row in rows:
+            try:
+                self.time_calculator.check_constraints(self._data[row], constraints)
+            except ScheduleError as e:
+                logging.warning(f"Limits for row {row} rejected: {e}")
+                QMessageBox.warning(QApplication.focusWidget(), "Invalid limits.", f"Row {row + 1}: {e}")
+                return False
+
+        values = {'min_duration': constraints.min_duration, 'max_duration': constraints.max_duration,
+                  'anchored': int(constraints.anchored)}
+        with self.change_feed.operation('Set Limits'):
+            for row in rows:
+                for column_key, value in values.items():
+                    if self._data[row].get(column_key) != value:
+                        self._set_field(row, column_key, value)
+        self._notify_rows_changed(rows)
+        return True
+
+    def constraints_tooltip(self, row):
+        constraints = self.time_calculator.constraints_for(self._data[row])
+        if constraints == DEFAULT_CONSTRAINTS:
+            return None
+        limits = [f"at least {constraints.min_duration} minutes"] if constraints.min_duration > MIN_DURATION else []
+        if constraints.max_duration is not None:
+            limits.append(f"at most {constraints.max_duration} minutes")
+        if constraints.anchored:
+            limits.append("fixed START time")
+        return f"Limits: {', '.join(limits)}."
+
+    def _solve_and_apply(self, title, solve, row, *values):
+        """Run a TimeCalculator solve for an edit and apply it, or tell the user why it can't be done."""
+        try:
+            change = solve(self._data, row, *values)
+        except ScheduleError as e:
+            logging.warning(f"Edit in row {row} rejected: {e}")
+            QMessageBox.warning(QApplication.focusWidget(), title, str(e))
+            return False
 
-        if column_key in ['duration']:
-            return self.handle_duration_input(index, row, value, role)
+        if change is None:
+            return False
+        self._notify_rows_changed(self.apply_schedule_change(change))
+        return True
+
+    def _notify_rows_changed(self, rows):
+        """One dataChanged covering every column of the rows, instead of one per cell."""
+        if not rows:
+            return
+        top_left = self.createIndex(min(rows), 0)
+        bottom_right = self.createIndex(max(rows), self.columnCount() - 1)
+        self.dataChanged.emit(top_left, bottom_right, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+
+    def handle_task_name_input(self, index, row, value, role):
+        task_col_key = 'task_name'
+        original_task_name = self._data[row][task_col_key]
+
+        if original_task_name == value:
+            tracing.model.debug("Same value in 'Task' column. Returning without any changes.")
+            return False
+
+        else:
+            return self.set_task_name_and_notify(index, row, value, role)
+
+    def handle_duration_input(self, index, row, value, role):
+        tracing.model.debug("Change in duration")
+        focus_widget = QApplication.focusWidget()
 
-        if column_key in ["from_time", "to_time"]:
-            return self.set_and_update_fields_and_notify(value, row, column_key)
+        original_duration = self._data[row]['duration']
+
+        if value == "":
+            tracing.model.debug(lambda: f"Input value is empty:'{value}'")
+            return False
+
+        try:
+            input_duration_int = helper_fn.strip_text(value)
+
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when striping input duration string (Error Description:{e}")
+            return False
+
+        if input_duration_int == 0 or input_duration_int < 0:
+            QMessageBox.warning(focus_widget, "Can't be zero.", "The task has to be at least of one minute duration.")
+            return False
+
+        if original_duration != input_duration_int:  # If the input value is not equal to original
+            tracing.model.debug("Solving the schedule for the new duration.")
+            return self._solve_and_apply("Invalid duration.", self.time_calculator.solve_duration, row,
+                                         input_duration_int)
+
+        else:
+            tracing.model.debug("Same value in 'Duration'. Returning without any changes.")
+            return False
+
+    def set_and_update_fields_and_notify(self, value, row, column_key):
+
+        if column_key == 'duration':  # String input to Integer
+            tracing.model.debug("Change in duration")
+            original_duration = self._data[row]['duration']
+
+            try:
+                input_duration_int = helper_fn.strip_text(value)
+
+            except Exception as e:
+                logging.error(f"Exception type:{type(e)} when striping input duration string (Error Description:{e}")
+                return False
+
+            if original_duration != input_duration_int:  # If the input value is not equal to original
+                duration_input_handled = self.handle_duration_input(row, input_duration_int)
+                return duration_input_handled
+
+            else:
+                tracing.model.debug("Same value in 'Duration'. Returning without any changes.")
+                return False
+
+        if column_key == 'from_time':
+            tracing.model.debug(lambda: f"Change detected in 'from_time'. Input value:'{value}'")
+            return self.handle_from_input(row, value)
+
+        if column_key == 'to_time':
+            tracing.model.debug(lambda: f"Change detected in 'to_time'. Input value:'{value}'")
+            return self.handle_to_input(row, value)
+
+    def handle_from_input(self, row, user_input_value):
+        focus_widget = QApplication.focusWidget()
+
+        if row == 0:
+            tracing.model.debug("Cannot change the starting time of the day.")
+            QMessageBox.warning(
+                focus_widget, "START time of the first task cannot be changed.",
+                "Cannot change the START time of the first task."
+                "First task always begins from midnight. "
+                )
+            return False
+
+        input_from_time = self.parse_time_input(user_input_value)
+        if input_from_time is None:
+            return False
+
+        new_start = self._nearest_datetime(input_from_time, self._data[row]['from_time'])
+        return self._solve_and_apply("Invalid 'START' time.", self.time_calculator.solve_boundary, row, new_start)
+
+    def handle_to_input(self, row, user_input_value):
+        input_to_time = self.parse_time_input(user_input_value)
+        if input_to_time is None:
+            return False
+
+        new_end = self._nearest_datetime(input_to_time, self._data[row]['to_time'])
+        return self._solve_and_apply("Invalid 'END' time.", self.time_calculator.solve_end, row, new_end)
+
+    @staticmethod
+    def _nearest_datetime(time_of_day, reference):
+        """'time_of_day' on the day that puts it nearest to 'reference' (the day wraps at midnight)."""
+        candidate = datetime.combine(reference.date(), time_of_day)
+        if candidate - reference > timedelta(hours=12):
+            candidate -= timedelta(days=1)
+        elif reference - candidate > timedelta(hours=12):
+            candidate += timedelta(days=1)
+        return candidate
+
+    def set_task_name_and_notify(self, index, row, value, role):
+        column_key = 'task_name'
+
+        try:
+            self._set_field(row, column_key, value)  # Task Name Set
+            self.dataChanged.emit(index, index, [role])
+            tracing.model.debug(lambda: f"Emitting dataChanged signal after updating task_name at row:{row}.")
+            return True
+
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} when setting task name. Error: {e}")
+            return False
+
+    @staticmethod
+    def parse_time_input(value):
+        """Time of day typed in a 'Start' or 'End' cell (see time_parser.py), or None after telling the user."""
+        try:
+            return time_parser.parse_time(value)
+
+        except TimeParseError as e:
+            logging.warning(f"Invalid time input '{value}': {e}")
+            QMessageBox.warning(QApplication.focusWidget(), "Invalid time.", str(e))
+            return None
 
     def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
         """
@@ -213,11 +869,20 @@ class TableModel(QAbstractItemModel):
         total_rows = len(self._data)
 
         if index.row() == total_rows - 1 and index.column() == 1:
-            return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
+            return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsDropEnabled
 
         if not index.isValid():
             return Qt.ItemFlag.NoItemFlags
-        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+        flags = super().flags(index) | Qt.ItemFlag.ItemIsEditable
+        if 0 < index.row() < total_rows - 1:  # The first and last rows can't be dragged
+            flags |= Qt.ItemFlag.ItemIsDragEnabled
+        if index.row() > 0:  # Nothing can be dropped above the first row
+            flags |= Qt.ItemFlag.ItemIsDropEnabled
+        return flags
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
 
     def index(self, row, column, parent=QModelIndex()):
         """When the view requests the data for a cell at a particular row and column, it calls this method to get an index that points to that cell's data."""
@@ -225,7 +890,7 @@ class TableModel(QAbstractItemModel):
             return QModelIndex()
         return self.createIndex(row, column, self._data[row])
 
-    def parent(self, index):  # used for hierarchical models (ignored for models like table)
+    def parent(self, index):  # Flat table. The task/subtask hierarchy is TaskTreeModel's (task_tree_model.py)
         return QModelIndex()
 
     def rowCount(self, parent=QModelIndex()):
@@ -0,0 +1,74 @@
+"""
+Tab-separated (TSV) text for copying and pasting blocks of tasks, so blocks can also go through a spreadsheet.
+
+Copied rows have the visible columns plus the type: Start, End, Duration (minutes), Task, Reminders, Type.
+Pasting keeps each task's name, duration, type and how long before its start it's reminded; times are recomputed
+where the block is inserted. Lines from elsewhere only need a task name, optionally followed by a duration.
+"""
+import logging
+
+from src.resources.default import NumericEn
+from src.utils.time_parser import parse_minutes
+
+TIME_FORMAT = "%I:%M %p"
+DEFAULT_PASTED_DURATION = 10  # Minutes, for lines without one (same as 'New Task')
+FULL_LINE_FIELDS = 6
+
+
+class PastedTask:
+    __slots__ = ('task_name', 'duration', 'type', 'reminder_lead')
+
+    def __init__(self, task_name, duration, task_type='main', reminder_lead=None):
+        self.task_name = task_name
+        self.duration = duration
+        self.type = task_type
+        self.reminder_lead = NumericEn.REMINDER_LEAD_TIME.value if reminder_lead is None else reminder_lead
+
+
+def rows_to_tsv(rows_data):
+    """One line per row, built in one pass."""
+    return '\n'.join(
+        f"{row_data['from_time'].strftime(TIME_FORMAT)}\t{row_data['to_time'].strftime(TIME_FORMAT)}\t"
+        f"{row_data['duration']}\t{_clean(row_data['task_name'])}\t"
+        f"{row_data['reminders'].strftime(TIME_FORMAT)}\t{row_data['type']}"
+        for row_data in rows_data
+        )
+
+
+def _clean(text):
+    return str(text).replace('\t', ' ').replace('\n', ' ')
+
+
+def parse_tsv(text):
+    """Return a list of PastedTask. Lines that can't be read are skipped and counted in the log."""
+    tasks = []
+    skipped = 0
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        fields = line.split('\t')
+
+        try:
+            if len(fields) >= FULL_LINE_FIELDS:  # Copied from this app
+                start_text, _, duration_text, task_name, reminder_text, task_type = fields[:FULL_LINE_FIELDS]
+                reminder_lead = (parse_minutes(start_text) - parse_minutes(reminder_text)) % (24 * 60)
+                tasks.append(PastedTask(task_name, _duration(duration_text), task_type.strip() or 'main',
+                                        reminder_lead))
+            else:
+                duration = _duration(fields[1]) if len(fields) > 1 and fields[1].strip() else DEFAULT_PASTED_DURATION
+                tasks.append(PastedTask(fields[0].strip(), duration))
+
+        except (ValueError, IndexError):
+            skipped += 1
+
+    if skipped:
+        logging.warning(f"{skipped} pasted line/s couldn't be read and were skipped.")
+    return tasks
+
+
+def _duration(text):
+    duration = int(text.split()[0])  # '45' or '45 Minutes'
+    if duration < 1:
+        raise ValueError(f"Duration has to be at least one minute. Got {duration}.")
+    return duration
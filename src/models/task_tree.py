@@ -0,0 +1,103 @@
+"""
+Main tasks and their subtasks, over the flat rows of TableModel.
+
+A row typed 'subtask' belongs to the nearest main task above it, so a main task's subtasks are the rows right below
+it: its children are always one contiguous run of rows. The tree is kept in compact arrays, one pass to build:
+
+    top_rows[position]         flat row of the position-th main task (top level)
+    child_counts[position]     subtasks below it
+    totals[position]           its duration plus its subtasks' durations
+    family_positions[row]      top-level position of the row's main task (its own for a main task)
+
+so parent, children and totals are O(1) lookups. A subtask above the first main task is kept at the top level.
+
+Duration changes update one total in O(1) (duration_changed). Inserts, removals, moves and type changes move the
+boundaries of many families at once, so they mark the tree stale instead and it's rebuilt on the next read.
+"""
+from array import array
+
+SUBTASK_TYPE = 'subtask'
+
+
+class TaskTree:
+    def __init__(self, rows_data):
+        self._rows_data = rows_data  # TableModel's list. Changed in place by the model
+        self.stale = True
+        self.builds = 0  # Full rebuilds, for benchmarks and the log
+
+        self.top_rows = array('l')
+        self.child_counts = array('l')
+        self.totals = array('q')
+        self.family_positions = array('l')
+
+    def invalidate(self):
+        self.stale = True
+
+    def ensure_built(self):
+        if self.stale:
+            self.rebuild()
+
+    def rebuild(self):
+        top_rows = array('l')
+        child_counts = array('l')
+        totals = array('q')
+        family_positions = array('l', bytes(len(self._rows_data) * array('l').itemsize))
+
+        position = -1
+        for row, row_data in enumerate(self._rows_data):
+            if row_data['type'] != SUBTASK_TYPE or position < 0:
+                position += 1
+                top_rows.append(row)
+                child_counts.append(0)
+                totals.append(row_data['duration'])
+            else:
+                child_counts[position] += 1
+                totals[position] += row_data['duration']
+            family_positions[row] = position
+
+        self.top_rows, self.child_counts, self.totals = top_rows, child_counts, totals
+        self.family_positions = family_positions
+        self.stale = False
+        self.builds += 1
+
+    def on_changes(self, change_set):
+        """Change-feed subscriber: totals follow duration edits, anything else that moves rows marks the tree stale."""
+        if self.stale:
+            return
+        if change_set.inserts or change_set.removals or change_set.moves:
+            self.invalidate()
+            return
+
+        for update in change_set.updates:
+            if 'type' in update.fields:
+                self.invalidate()
+                return
+
+        for update in change_set.updates:
+            duration_change = update.fields.get('duration')
+            if duration_change is not None:
+                self.duration_changed(update.row, duration_change.new - duration_change.old)
+
+    def duration_changed(self, row, delta):
+        if not self.stale:
+            self.totals[self.family_positions[row]] += delta
+
+    # Navigation. Callers ensure_built() first.
+
+    def top_level_count(self):
+        return len(self.top_rows)
+
+    def is_top_level(self, row):
+        return self.top_rows[self.family_positions[row]] == row
+
+    def parent_row(self, row):
+        """Flat row of the main task 'row' belongs to, or -1 for a top-level row."""
+        top_row = self.top_rows[self.family_positions[row]]
+        return -1 if top_row == row else top_row
+
+    def child_row(self, position, offset):
+        return self.top_rows[position] + 1 + offset
+
+    def offset_in_family(self, row):
+        """0 for the first subtask of its main task, 1 for the second, ..."""
+        return row - self.top_rows[self.family_positions[row]] - 1
@@ -0,0 +1,153 @@
+"""
+Tree view of TableModel: main tasks at the top level, their subtasks as children (see task_tree.py).
+
+Items point into TableModel's rows; nothing is copied. An index's internal id is 0 for a main task and
+(top-level position + 1) for a subtask, so parent() is O(1). Children are populated lazily: a main task reports
+that it has children, and a view fetches them CHILD_FETCH_BATCH at a time when it's expanded (and scrolled down).
+Collapsing releases them (release_children), so expanding or collapsing a task with thousands of subtasks only
+touches the ones in view.
+
+Changes come from the change-feed: duration edits update the totals incrementally and refresh the changed rows;
+inserts, removals, moves and type changes reset the model (the families' boundaries moved).
+"""
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+CHILD_FETCH_BATCH = 500
+TREE_COLUMNS = (("Task", 'task_name'), ("Start", 'from_time'), ("End", 'to_time'), ("Duration", 'duration'),
+                ("Total", None))  # Header, TableModel column key (None: the family's total duration)
+TOTAL_COLUMN = len(TREE_COLUMNS) - 1
+ITEM_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable  # Combined once: flags() is called per item
+
+
+class TaskTreeModel(QAbstractItemModel):
+    def __init__(self, table_model, parent=None):
+        super().__init__(parent)
+        self.table_model = table_model
+        self.tree = table_model.task_tree
+        self.tree.ensure_built()
+
+        self._fetched = {}  # Top-level position: children populated so far (only for expanded main tasks)
+        self._source_columns = [table_model.column_keys.index(key) if key else None for _, key in TREE_COLUMNS]
+
+        # After the tree's own subscription (made by TableModel), so totals are already updated
+        self.subscription = table_model.change_feed.subscribe(self.on_changes)
+
+    def close(self):
+        self.table_model.change_feed.unsubscribe(self.subscription)
+
+    def flat_row(self, index):
+        parent_id = index.internalId()
+        if parent_id == 0:
+            return self.tree.top_rows[index.row()]
+        return self.tree.child_row(parent_id - 1, index.row())
+
+    # QAbstractItemModel
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column < 0 or column >= len(TREE_COLUMNS) or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0) if row < self.tree.top_level_count() else QModelIndex()
+        if parent.internalId() != 0 or row >= self._fetched.get(parent.row(), 0):
+            return QModelIndex()
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        self.tree.ensure_built()
+        if not parent.isValid():
+            return self.tree.top_level_count()
+        if parent.internalId() == 0 and parent.column() == 0:
+            return self._fetched.get(parent.row(), 0)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(TREE_COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        self.tree.ensure_built()
+        if not parent.isValid():
+            return self.tree.top_level_count() > 0
+        return parent.internalId() == 0 and parent.column() == 0 and self.tree.child_counts[parent.row()] > 0
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        return self._fetched.get(parent.row(), 0) < self.tree.child_counts[parent.row()]
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        position = parent.row()
+        fetched = self._fetched.get(position, 0)
+        batch = min(CHILD_FETCH_BATCH, self.tree.child_counts[position] - fetched)
+
+        self.beginInsertRows(parent, fetched, fetched + batch - 1)
+        self._fetched[position] = fetched + batch
+        self.endInsertRows()
+
+    def release_children(self, parent):
+        """Forget the populated children of a collapsed main task, so the view doesn't keep laying them out."""
+        fetched = self._fetched.get(parent.row(), 0) if parent.isValid() and parent.internalId() == 0 else 0
+        if not fetched:
+            return
+        self.beginRemoveRows(parent, 0, fetched - 1)
+        del self._fetched[parent.row()]
+        self.endRemoveRows()
+
+    def release_all_children(self):
+        self.beginResetModel()
+        self._fetched.clear()
+        self.endResetModel()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+
+        if index.column() == TOTAL_COLUMN:
+            if index.internalId() != 0 or self.tree.child_counts[index.row()] == 0:
+                return None
+            return f"{self.tree.totals[index.row()]} Minutes"
+
+        source_index = self.table_model.index(self.flat_row(index), self._source_columns[index.column()])
+        return self.table_model.data(source_index, Qt.ItemDataRole.DisplayRole)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return TREE_COLUMNS[section][0]
+        return None
+
+    def flags(self, index):
+        return ITEM_FLAGS if index.isValid() else Qt.ItemFlag.NoItemFlags  # Edits go through the table
+
+    # Change-feed
+
+    def on_changes(self, change_set):
+        if self.tree.stale:  # Structure changed (the tree marked itself stale)
+            self.beginResetModel()
+            self._fetched.clear()
+            self.tree.rebuild()
+            self.endResetModel()
+            return
+
+        # One dataChanged over the changed families' top-level rows (with their totals), one per expanded family
+        family_positions = set()
+        child_offsets = {}  # Top-level position: offsets of changed, populated subtasks
+        for update in change_set.updates:
+            position = self.tree.family_positions[update.row]
+            family_positions.add(position)
+            if not self.tree.is_top_level(update.row):
+                offset = self.tree.offset_in_family(update.row)
+                if offset < self._fetched.get(position, 0):
+                    child_offsets.setdefault(position, []).append(offset)
+
+        if family_positions:
+            self.dataChanged.emit(self.createIndex(min(family_positions), 0, 0),
+                                  self.createIndex(max(family_positions), TOTAL_COLUMN, 0))
+        for position, offsets in child_offsets.items():
+            self.dataChanged.emit(self.createIndex(min(offsets), 0, position + 1),
+                                  self.createIndex(max(offsets), TOTAL_COLUMN, position + 1))
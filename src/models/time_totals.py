@@ -0,0 +1,136 @@
+"""
+Running totals of scheduled minutes per task type ('main', 'subtask') and per tag (a '#word' in the task name, so
+'Deep focus #work' counts toward 'work').
+
+The totals are built in one pass on first use, then follow the change-feed: each inserted row adds its duration,
+each removed row subtracts it, and an update subtracts the row's old contribution and adds the new one, so a
+ChangeSet costs O(rows changed), not O(rows). verify() compares the running totals with a full recomputation; with
+'APP_VERIFY_TOTALS' set, it runs after every ChangeSet.
+"""
+import logging
+import os
+from collections import defaultdict
+
+VERIFY_ENV_KEY = 'APP_VERIFY_TOTALS'  # Any value: verify() after every ChangeSet (slow: a full pass per edit)
+TAG_PREFIX = '#'
+NO_TAGS = frozenset()
+TAG_TRAILING_PUNCTUATION = '.,;:!?)'  # 'Gym #health.' is tagged 'health'
+TOTALS_FIELDS = frozenset({'duration', 'type', 'task_name'})  # Fields a total depends on
+
+
+def task_tags(task_name):
+    """Lower-case tags in a task name, each once."""
+    if not isinstance(task_name, str) or TAG_PREFIX not in task_name:
+        return NO_TAGS
+    tags = {word[1:].rstrip(TAG_TRAILING_PUNCTUATION).lower() for word in task_name.split() if word[0] == TAG_PREFIX}
+    tags.discard('')
+    return tags
+
+
+class TimeTotals:
+    def __init__(self, rows_data):
+        self._rows_data = rows_data  # TableModel's list. Changed in place by the model
+        self.stale = True
+        self.verify_each_change = bool(os.getenv(VERIFY_ENV_KEY))
+
+        self.by_type = defaultdict(int)  # Type: minutes
+        self.by_tag = defaultdict(int)  # Tag: minutes
+
+    def ensure_built(self):
+        if self.stale:
+            self.rebuild()
+
+    def rebuild(self):
+        self.by_type, self.by_tag = self.recompute(self._rows_data)
+        self.stale = False
+
+    @staticmethod
+    def recompute(rows_data):
+        """(minutes by type, minutes by tag) from scratch."""
+        by_type = defaultdict(int)
+        by_tag = defaultdict(int)
+        for row_data in rows_data:
+            duration = row_data['duration']
+            if not duration:
+                continue
+            by_type[row_data['type']] += duration
+            for tag in task_tags(row_data['task_name']):
+                by_tag[tag] += duration
+        return by_type, by_tag
+
+    def verify(self):
+        """True if the running totals match a full recomputation. A mismatch is logged."""
+        if self.stale:
+            return True  # Nothing incremental to check: the next read rebuilds
+        expected_by_type, expected_by_tag = self.recompute(self._rows_data)
+        mismatches = [(name, dict(actual), dict(expected)) for name, actual, expected in (
+            ('type', self.by_type, expected_by_type), ('tag', self.by_tag, expected_by_tag)) if actual != expected]
+        for name, actual, expected in mismatches:
+            logging.error(f"Running totals per {name} drifted. Running: {actual}, recomputed: {expected}.")
+        return not mismatches
+
+    def on_changes(self, change_set):
+        """Change-feed subscriber. Applied like the feed says: inserts, then updates, then removals."""
+        if self.stale:
+            return
+
+        for insert in change_set.inserts:
+            self._add(insert.values, 1)
+
+        removed_values = {removal.row_id: removal.values for removal in change_set.removals}
+        for update in change_set.updates:
+            current_values = removed_values.get(update.row_id) if update.row_id is not None else None
+            if current_values is None:
+                current_values = self._row_values(update.row_id, update.row)
+            if current_values is None:  # Row not found: can't tell what it contributed
+                logging.warning(f"Row id:{update.row_id} not found for the totals. Rebuilding them.")
+                self.stale = True
+                return
+            old_values = {field: field_change.old for field, field_change in update.fields.items()}
+            new_values = {field: field_change.new for field, field_change in update.fields.items()}
+            self._add({**current_values, **old_values}, -1)
+            self._add({**current_values, **new_values}, 1)
+
+        for removal in change_set.removals:
+            self._add(removal.values, -1)
+
+        if self.verify_each_change and not self.verify():
+            self.rebuild()
+
+    def _add(self, values, sign):
+        duration = values.get('duration') or 0
+        if not duration:
+            return
+        _add_to(self.by_type, values.get('type'), sign * duration)
+        for tag in task_tags(values.get('task_name')):
+            _add_to(self.by_tag, tag, sign * duration)
+
+    def _row_values(self, row_id, row):
+        # 'row' is the index when the change was made. It's still right unless later changes in the same operation
+        # moved rows, so check the id and fall back to a scan.
+        row_data = self._rows_data[row] if 0 <= row < len(self._rows_data) else None
+        if row_id is None or (row_data is not None and row_data.get('id') == row_id):
+            return row_data
+        return next((each_row for each_row in self._rows_data if each_row.get('id') == row_id), None)
+
+    def type_totals(self):
+        """(type, minutes) for the types that have time, largest first."""
+        self.ensure_built()
+        return _largest_first(self.by_type)
+
+    def tag_totals(self):
+        self.ensure_built()
+        return _largest_first(self.by_tag)
+
+
+def _add_to(totals, key, minutes):
+    """Keys whose total gets back to zero are dropped, so the totals equal a recomputation exactly."""
+    total = totals[key] + minutes
+    if total:
+        totals[key] = total
+    else:
+        del totals[key]
+
+
+def _largest_first(totals):
+    return sorted(totals.items(), key=lambda item: (-item[1], str(item[0])))
@@ -2,22 +2,26 @@ import logging
 import os
 import sys
 from aenum import Enum, NoAlias
-from datetime import datetime
+from datetime import date, timedelta
+
+from src.utils.time_parser import TimeParseError, on_date
 
 COLUMN_KEYS = ["from_time", "to_time", "duration", "task_name", "reminders"]
 VISIBLE_HEADERS = ["Start", "End", "Duration", "Task", "Reminders"]
 
 # Constants
-DATE_FORMAT = "%I:%M %p, %Y-%m-%d"
 DATETIME_COLUMN_KEYS = ["from_time", "to_time"]
 FIXED_DATE = "2023-01-01"
 
+# Schedule constraints of a task (see time_calculator.py) and their values for a task that has none
+CONSTRAINT_DEFAULTS = {'min_duration': 1, 'max_duration': None, 'anchored': 0}
+
 
 def convert_to_datetime(time_str):
     """ Convert time string to datetime object with a fixed date. """
     try:
-        return datetime.strptime(f'{time_str}, {FIXED_DATE}', DATE_FORMAT)
-    except Exception as e:
+        return on_date(time_str, date.fromisoformat(FIXED_DATE))
+    except TimeParseError as e:
         logging.error(f"Exception type: {type(e)} while converting to datetime. Description: {e}")
         return None
 
@@ -34,7 +38,7 @@ default_tasks = (
         },
     {
         'from_time': convert_to_datetime('07:00 AM'),
-        'to_time': convert_to_datetime('12:00 AM'),
+        'to_time': convert_to_datetime('12:00 AM') + timedelta(days=1),  # Midnight at the end of the day
         'duration': 1020,
         'task_name': 'Sleep',
         'reminders': convert_to_datetime('06:55 AM'),
@@ -56,6 +56,14 @@ QPushButton:pressed {{
 
 """
 
+TOTALS_FOOTER = f"""
+QLabel#totalsFooter {{
+    background-color: {main_color};
+    border-top: 1px solid #575757;
+    color: #D0D0D0;
+    }}
+"""
+
 CUSTOM_TABLE_VIEW = """
     QTableView {
         background-color: {bg_color};
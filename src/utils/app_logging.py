@@ -1,15 +1,31 @@
+import atexit
 import os
 import logging
+import queue
+from collections import deque
 from logging import handlers
 
-from PyQt6.QtCore import Qt
+from PyQt6 import sip
+from PyQt6.QtCore import Qt, QTimer
 
-from src.utils import helper_fn
+from src.utils import helper_fn, tracing
 
 from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QVBoxLayout, QPushButton
 
+LOG_QUEUE_SIZE = 20000  # Records waiting for the writer thread. Beyond this, records are dropped and counted.
+LOG_WINDOW_MAX_BLOCKS = 5000  # Lines kept in the log window (older lines are discarded)
+LOG_WINDOW_FLUSH_MS = 200  # How often buffered lines are appended to the log window
+
+_queue_listener = None  # Writer thread, started in setup_root_logger
+
 
 def setup_root_logger():  # This is a root logger, which is called in main(), and so it applies to the whole app
+    """
+    Records are put on a bounded queue by the root logger's QueueHandler (cheap, on the calling thread) and written
+    to the rotating log file by a QueueListener on a background thread, so no file I/O happens on the GUI thread.
+    """
+    global _queue_listener
+
     environment_cls = helper_fn.get_environment_cls(False, caller='debugging')
 
     log_file_path = os.path.join(environment_cls.LOG_FOLDER_PATH, environment_cls.LOG_FILE_NAME)
@@ -29,9 +45,80 @@ def setup_root_logger():  # This is a root logger, which is called in main(), an
     file_handler.setFormatter(logging.Formatter(log_text_format))
     file_handler.setLevel(logging.DEBUG)
 
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    _queue_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _queue_listener.start()
+    atexit.register(stop_logging_pipeline)  # Also flush if the app exits without 'aboutToQuit'
+
     root_logger = logging.getLogger()
-    root_logger.addHandler(file_handler)
+    root_logger.addHandler(queue_handler)
     root_logger.setLevel(logging.DEBUG)
+    tracing.configure(default_spec=environment_cls.TRACE)  # Also re-reads whether DEBUG is on
+    logging.info(f"Trace categories on: {', '.join(tracing.enabled_names()) or 'none'} "
+                 f"(set '{tracing.TRACE_ENV_KEY}' to change, e.g. 'all' or 'model,db').")
+
+
+def add_queued_handler(handler):
+    """Attach a handler to the writer thread (or directly to the root logger if the pipeline isn't set up)."""
+    if _queue_listener is None:
+        logging.getLogger().addHandler(handler)
+        return
+
+    _queue_listener.handlers = (*_queue_listener.handlers, handler)  # Listener reads the tuple for every record
+
+
+def stop_logging_pipeline():
+    """
+    Write out everything still queued and stop the writer thread. Called when the app is about to quit.
+    The listener's handlers are moved to the root logger, so anything logged afterwards is still written.
+    """
+    global _queue_listener
+
+    if _queue_listener is None:
+        return
+
+    listener, _queue_listener = _queue_listener, None
+    listener.stop()  # Blocks until the queue is drained
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller. When the queue is full the record is dropped and counted.
+    Once there is room again, a warning with the number of dropped records is queued before the next record.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped_records = 0  # Total since start
+        self._unreported_drops = 0
+
+    def enqueue(self, record):
+        try:
+            if self._unreported_drops:
+                self.queue.put_nowait(self._drop_report_record(record))
+                self._unreported_drops = 0
+
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+            self.dropped_records += 1
+            self._unreported_drops += 1
+
+    def _drop_report_record(self, next_record):
+        message = (f"Log queue was full. {self._unreported_drops} record/s dropped "
+                   f"({self.dropped_records} in total since start).")
+        return logging.LogRecord(
+            next_record.name, logging.WARNING, __file__, 0, message, None, None
+            )
 
 
 class LogDisplayWindow(QWidget):
@@ -43,6 +130,7 @@ class LogDisplayWindow(QWidget):
         main_layout = QVBoxLayout(self)
         log_display = QPlainTextEdit(self)
         log_display.setReadOnly(True)
+        log_display.setMaximumBlockCount(LOG_WINDOW_MAX_BLOCKS)
         main_layout.addWidget(log_display)
 
         clear_log_button = QPushButton("Clear Log", self)
@@ -52,18 +140,48 @@ class LogDisplayWindow(QWidget):
         self.hide()
 
     def setup_logging(self, log_display_widget):
-        text_edit_handler = QTextEditHandler(log_display_widget)
+        self.text_edit_handler = QTextEditHandler(log_display_widget)
         log_format_for_win = '[%(levelname)s] %(message)s'
-        text_edit_handler.setFormatter(logging.Formatter(log_format_for_win))
-        log_win_logger = logging.getLogger()
-        log_win_logger.addHandler(text_edit_handler)
+        self.text_edit_handler.setFormatter(logging.Formatter(log_format_for_win))
+        add_queued_handler(self.text_edit_handler)
+
+    def showEvent(self, event):
+        self.text_edit_handler.flush()  # Lines buffered while hidden
+        self.text_edit_handler.flush_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.text_edit_handler.flush_timer.stop()  # Lines are buffered until the window is shown again
+        super().hideEvent(event)
 
 
 class QTextEditHandler(logging.Handler):
+    """
+    Formatted records are buffered (emit may be called from the writer thread) and appended to the widget in one
+    batch by a timer on the GUI thread. Only the last LOG_WINDOW_MAX_BLOCKS lines are kept, and nothing is appended
+    while the widget is hidden: LogDisplayWindow runs the timer only while it's shown.
+    """
+
     def __init__(self, text_edit_widget):
         super().__init__()
         self.text_edit_widget = text_edit_widget
+        self.pending_lines = deque(maxlen=LOG_WINDOW_MAX_BLOCKS)
+
+        self.flush_timer = QTimer(text_edit_widget)
+        self.flush_timer.setInterval(LOG_WINDOW_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush)  # Started and stopped by LogDisplayWindow
 
     def emit(self, record):
-        formatted_record = self.format(record)
-        self.text_edit_widget.appendPlainText(formatted_record)
\ No newline at end of file
+        self.pending_lines.append(self.format(record))
+
+    def flush(self):
+        if not self.pending_lines or sip.isdeleted(self.text_edit_widget):  # Deleted: logging.shutdown at exit
+            return
+        if not self.text_edit_widget.isVisible():
+            return
+
+        batch = []
+        while self.pending_lines:
+            batch.append(self.pending_lines.popleft())
+
+        self.text_edit_widget.appendPlainText("\n".join(batch))
\ No newline at end of file
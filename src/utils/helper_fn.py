@@ -1,18 +1,17 @@
-import inspect
-import re
 import sys
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from PyQt6.QtGui import QColor
-from PyQt6.QtCore import QRect, QTime
-from PyQt6.QtWidgets import QApplication, QMainWindow
+from PyQt6.QtCore import QRect
 
-from src.dev.environment import environment_cls
+from src.utils import time_parser, tracing
+from src.utils.service_registry import services
 
 
 def print_stack_trace():
+    import inspect  # Only needed when debugging, so not imported for every caller of helper_fn
+
     stack = inspect.stack()
 
     for i, level in enumerate(stack):
@@ -34,8 +33,8 @@ def print_stack_trace():
 
 
 def get_environment_cls(limit_logs=True, caller=None):
-    class_name = environment_cls.__class__.__name__  # Get the class name as a string
-    logging.debug(f"Returning Env_Config Class:{class_name} from caller:{caller}.")
+    environment_cls = services.get('environment_cls')
+    tracing.view.debug(lambda: f"Returning Env_Config Class:{environment_cls.__name__} from caller:{caller}.")
     return environment_cls
 
 
@@ -87,13 +86,12 @@ def strip_text(time_str):
     """
     # Split the string by spaces and take the first part (assuming the format is always 'number minutes')
     number_str = time_str.split()[0]
-    logging.debug(f"input string:'{time_str}'. returning value:'{number_str}'.")
+    tracing.model.debug(lambda: f"input string:'{time_str}'. returning value:'{number_str}'.")
     return int(number_str)
 
 
 def string_to_datetime(input_string):
-    format_of_string = "%Y-%m-%d %H:%M:%S"
-    return datetime.strptime(input_string, format_of_string)
+    return time_parser.parse_timestamp(input_string)  # "%Y-%m-%d %H:%M:%S", as stored in the database
 
 
 def resource_path(relative_path):
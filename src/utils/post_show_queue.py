@@ -0,0 +1,77 @@
+import logging
+import os
+from collections import deque
+
+from PyQt6.QtCore import QEvent, QObject, QTimer
+
+from src.utils import startup_timeline
+
+# Set 'APP_EAGER_STARTUP' to any non-empty value to initialise every subsystem before the main window is shown.
+DEFERRED_STARTUP = not os.getenv('APP_EAGER_STARTUP')
+
+
+class FirstPaintFilter(QObject):
+    """Calls 'callback' once, when 'widget' receives its first paint event. Parented to the widget."""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            self.callback()
+        return False  # Never consume the event
+
+
+def on_first_paint(widget, callback):
+    return FirstPaintFilter(widget, callback)
+
+
+class PostShowQueue:
+    """
+    Non-critical subsystems (log window, ribbon, backup folder, window state restore) register here instead of
+    being initialised in constructors.
+
+    In deferred mode the tasks run after the main window has painted for the first time, one task per event
+    loop iteration, so paint and input events get handled in between. In eager mode a task runs as soon as it's added.
+    """
+
+    def __init__(self, deferred=DEFERRED_STARTUP):
+        self.deferred = deferred
+        self._tasks = deque()  # (name, callable)
+        self._drained = False
+
+    def add(self, name, task):
+        if not self.deferred or self._drained:
+            self._run(name, task)
+            return
+
+        logging.debug(f"'{name}' queued to initialise after the main window is shown.")
+        self._tasks.append((name, task))
+
+    def start_after_first_paint(self, widget):
+        on_first_paint(widget, lambda: QTimer.singleShot(0, self._run_next))
+
+    def _run_next(self):
+        if not self._tasks:
+            self._drained = True
+            logging.debug(f"Post-show queue drained.")
+            startup_timeline.finish()
+            return
+
+        name, task = self._tasks.popleft()
+        self._run(name, task)
+        QTimer.singleShot(0, self._run_next)  # Give pending events a turn before the next task
+
+    def _run(self, name, task):
+        with startup_timeline.phase(name):
+            try:
+                task()
+            except Exception as e:
+                logging.error(f"Exception type:{type(e)} when initialising '{name}' (Error Description:{e}")
+
+
+# Single queue for the process
+post_show_queue = PostShowQueue()
@@ -0,0 +1,105 @@
+import logging
+import os
+import sys
+
+# Set 'APP_TRACE_SERVICES' to any non-empty value to log which class requested each service.
+TRACE_ENV_KEY = 'APP_TRACE_SERVICES'
+
+
+class ServiceRegistry:
+    """
+    Shared services (AppData, settings, environment class, TimeCalculator) keyed by name, created lazily by their
+    provider the first time they're requested. Lookups after that are a single dictionary access.
+
+    Caller tracing walks frames to find the requesting class, so it's only done when 'trace_callers' is True.
+    """
+
+    def __init__(self, trace_callers=False):
+        self.trace_callers = trace_callers
+        self._providers = {}  # name: callable that creates the service
+        self._instances = {}  # name: created service
+
+    def register(self, name, provider):
+        """Register a provider. The service isn't created until get() is called for it."""
+        self._providers[name] = provider
+        self._instances.pop(name, None)
+
+    def register_instance(self, name, instance):
+        self._instances[name] = instance
+
+    def get(self, name):
+        try:
+            instance = self._instances[name]
+        except KeyError:
+            instance = self._create(name)
+
+        if self.trace_callers:
+            logging.debug(f"'{name}' requested in '{get_caller_class_name()}'.")
+
+        return instance
+
+    def get_or_create(self, name, provider):
+        """Like get(), but registers 'provider' first if nothing is registered under 'name'."""
+        if name not in self._instances and name not in self._providers:
+            self._providers[name] = provider
+        return self.get(name)
+
+    def is_created(self, name):
+        return name in self._instances
+
+    def reset(self, name):
+        """Forget the created instance, so that the next get() calls the provider again."""
+        self._instances.pop(name, None)
+
+    def _create(self, name):
+        try:
+            provider = self._providers[name]
+        except KeyError:
+            raise KeyError(f"No service registered under '{name}'.") from None
+
+        instance = provider()
+        self._instances[name] = instance
+        logging.debug(f"'{name}' service created.")
+        return instance
+
+
+def get_caller_class_name(skip_frames=2):
+    """
+    Return the class name of the nearest caller that is a method (has 'self'), skipping this function and
+    the registry frames. Only frame objects are touched; no source lines are read.
+    """
+    frame = sys._getframe(skip_frames)
+    while frame is not None:
+        caller_self = frame.f_locals.get('self')
+        if caller_self is not None and not isinstance(caller_self, ServiceRegistry):
+            return caller_self.__class__.__name__
+        frame = frame.f_back
+    return None
+
+
+def _provide_environment_cls():
+    from src.dev.environment import environment_cls
+    return environment_cls
+
+
+def _provide_settings():
+    return services.get('environment_cls').SETTINGS_VALUES
+
+
+def _provide_app_data():
+    from src.models.app_data import AppData
+    return AppData()
+
+
+def _provide_time_calculator():
+    from src.controllers.time_calculator import TimeCalculator
+    return TimeCalculator()
+
+
+# Single registry for the process
+services = ServiceRegistry(trace_callers=bool(os.getenv(TRACE_ENV_KEY)))
+
+services.register('environment_cls', _provide_environment_cls)
+services.register('settings', _provide_settings)
+services.register('app_data', _provide_app_data)
+services.register('time_calculator', _provide_time_calculator)
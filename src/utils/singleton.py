@@ -1,39 +1,22 @@
-import inspect
 import logging
 
 from PyQt6.QtCore import QObject
 
+from src.utils.service_registry import services
+
 
 class Singleton(type):
-    # track of instances of classes using this metaclass. The class itself is the key, and its instance is the value.
-    instances_of_classes = {}
+    """
+    Metaclass that keeps one instance per class. Instances live in the service registry under the class itself,
+    so a repeated instantiation is a dictionary lookup. Caller tracing follows the registry's 'trace_callers'.
+    """
 
     def __call__(cls, *args, **kwargs):
-        # Get the name of the class that is being instantiated
-        class_name = cls.__name__
-
-        # Get the name of the calling class
-        caller_class_name = cls.get_caller_class_name()
-
-        if cls not in cls.instances_of_classes:
-            cls.instances_of_classes[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-            logging.debug(f"'{class_name}' instance created in '{caller_class_name}'.")
-        else:
-            logging.debug(
-                f"'{class_name}' instance requested in '{caller_class_name},' but already exists. Returning existing instance"
-                )
-
-        return cls.instances_of_classes[cls]
-
-    @staticmethod
-    def get_caller_class_name():
-        stack = inspect.stack()
-        # Inspect the stack and find the appropriate frame that represents the class
-        for frame_info in stack:
-            if 'self' in frame_info.frame.f_locals:
-                caller_class = frame_info.frame.f_locals['self'].__class__
-                return caller_class.__name__
-        return None
+        if not services.is_created(cls):
+            services.register_instance(cls, super(Singleton, cls).__call__(*args, **kwargs))
+            logging.debug(f"'{cls.__name__}' instance created.")
+
+        return services.get(cls)
 
 
 class SingletonQObject(type(QObject), Singleton):
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Set 'APP_STARTUP_PROFILE' to any non-empty value to record the startup timeline.
+# Set 'APP_STARTUP_TRACE' to a file path to also write a Chrome trace (open it in chrome://tracing or Perfetto).
+PROFILE_ENV_KEY = 'APP_STARTUP_PROFILE'
+TRACE_ENV_KEY = 'APP_STARTUP_TRACE'
+
+
+class StartupTimeline:
+    """
+    Records monotonic timestamps for the phases of a cold start (imports, env setup, DB open, data load,
+    widget construction, first paint).
+
+    Phases can be nested. When disabled, every method returns immediately so the calls can stay in place.
+    """
+
+    def __init__(self, enabled=False, trace_path=None):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.origin_ns = time.perf_counter_ns()  # All offsets are relative to this module's import
+        self.phases = []  # [name, start_ns, end_ns, depth] in the order they began
+        self.marks = []  # (name, timestamp_ns) instant events
+        self._open_phases = {}  # name: index in self.phases
+        self._finished = False
+
+    @classmethod
+    def from_environment(cls):
+        trace_path = os.getenv(TRACE_ENV_KEY) or None
+        enabled = bool(os.getenv(PROFILE_ENV_KEY)) or trace_path is not None
+        return cls(enabled, trace_path)
+
+    def begin(self, name):
+        if not self.enabled or self._finished:
+            return
+        depth = len(self._open_phases)
+        self._open_phases[name] = len(self.phases)
+        self.phases.append([name, time.perf_counter_ns(), None, depth])
+
+    def end(self, name):
+        if not self.enabled or self._finished:
+            return
+        phase_index = self._open_phases.pop(name, None)
+        if phase_index is None:
+            logging.debug(f"Startup phase '{name}' ended without being started. Ignored.")
+            return
+        self.phases[phase_index][2] = time.perf_counter_ns()
+
+    @contextmanager
+    def phase(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def mark(self, name):
+        if not self.enabled or self._finished:
+            return
+        self.marks.append((name, time.perf_counter_ns()))
+
+    def watch_first_paint(self, widget):
+        """
+        Open the 'first paint' phase and close it when 'widget' receives its first paint event.
+        The post-show queue calls finish() once its deferred tasks are done.
+        """
+        if not self.enabled or self._finished:
+            return
+
+        from src.utils.post_show_queue import on_first_paint
+
+        self.begin('first paint')
+        on_first_paint(widget, lambda: self.end('first paint'))
+
+    def finish(self):
+        """Close any open phase, log the summary and write the Chrome trace if requested."""
+        if not self.enabled or self._finished:
+            return
+
+        for name in list(self._open_phases):
+            self.end(name)
+        self._finished = True
+
+        for line in self.summary_lines():
+            logging.info(line)
+
+        if self.trace_path:
+            self.write_chrome_trace(self.trace_path)
+
+    def summary_lines(self):
+        lines = ["****STARTUP TIMELINE****"]
+        for name, start_ns, end_ns, depth in self.phases:
+            offset_ms = (start_ns - self.origin_ns) / 1e6
+            duration_ms = (end_ns - start_ns) / 1e6
+            indent = "  " * depth
+            lines.append(f"{indent}{name:<{32 - len(indent)}} {duration_ms:9.2f} ms  (at +{offset_ms:.2f} ms)")
+
+        for name, timestamp_ns in self.marks:
+            lines.append(f"mark '{name}' at +{(timestamp_ns - self.origin_ns) / 1e6:.2f} ms")
+
+        lines.append(f"Total until last event: {self.total_ms():.2f} ms")
+        return lines
+
+    def total_ms(self):
+        timestamps = [end_ns for _, _, end_ns, _ in self.phases if end_ns is not None]
+        timestamps.extend(timestamp_ns for _, timestamp_ns in self.marks)
+        if not timestamps:
+            return 0.0
+        return (max(timestamps) - self.origin_ns) / 1e6
+
+    def chrome_trace_events(self):
+        """Return the timeline as Chrome trace 'complete' (X) and 'instant' (i) events. Times are in microseconds."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = []
+
+        for name, start_ns, end_ns, _ in self.phases:
+            events.append({
+                'name': name, 'cat': 'startup', 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (start_ns - self.origin_ns) / 1000, 'dur': (end_ns - start_ns) / 1000,
+                })
+
+        for name, timestamp_ns in self.marks:
+            events.append({
+                'name': name, 'cat': 'startup', 'ph': 'i', 's': 'p', 'pid': pid, 'tid': tid,
+                'ts': (timestamp_ns - self.origin_ns) / 1000,
+                })
+
+        return events
+
+    def write_chrome_trace(self, file_path):
+        try:
+            with open(file_path, 'w', encoding='utf-8') as trace_file:
+                json.dump({'traceEvents': self.chrome_trace_events(), 'displayTimeUnit': 'ms'}, trace_file)
+            logging.info(f"Startup trace written to '{file_path}'.")
+
+        except OSError as e:
+            logging.error(f"Exception type:{type(e)} when writing startup trace to '{file_path}' (Error Description:{e}")
+
+
+# Single timeline for the process. Import this module before anything else in main.py so the origin is accurate.
+timeline = StartupTimeline.from_environment()
+
+begin = timeline.begin
+end = timeline.end
+phase = timeline.phase
+mark = timeline.mark
+watch_first_paint = timeline.watch_first_paint
+finish = timeline.finish
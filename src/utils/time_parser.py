@@ -0,0 +1,107 @@
+"""
+Time parsing without strptime (slow, and its '%p' depends on the locale).
+
+parse_minutes() reads a time of day typed by the user or pasted from elsewhere and returns minutes since midnight.
+It accepts:
+    '9:05 pm', '9:05PM', '09:05 a.m.', '9 pm', '12am'  12-hour clock
+    '21:05', '21.05', '21:05:00', '0905', '905', '21'  24-hour clock
+    '2023-01-01 21:05:00', '2023-01-01T21:05'         ISO timestamps (the time of day is used)
+
+Inputs repeat a lot (a day only has 1440 minutes), so results are kept in an LRU memo. parse_timestamp() reads the
+'YYYY-MM-DD HH:MM:SS' strings stored in the database.
+"""
+from datetime import date, datetime, time
+from functools import lru_cache
+
+MINUTES_PER_DAY = 24 * 60
+PARSE_CACHE_SIZE = 4096
+MERIDIEM_SUFFIXES = (('a.m.', 0), ('p.m.', 12), ('am', 0), ('pm', 12), ('a', 0), ('p', 12))
+
+
+class TimeParseError(ValueError):
+    """The text isn't a time. The message is meant for the user."""
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_minutes(text):
+    """Minutes since midnight (0-1439) for a time of day. Raises TimeParseError."""
+    cleaned = text.strip().lower() if isinstance(text, str) else ''
+
+    # Fast path: 'hh:mm am' (how the app shows and copies times)
+    if len(cleaned) == 8 and cleaned[2] == ':' and cleaned[5] == ' ' and cleaned[7] == 'm' and cleaned[6] in 'ap':
+        hour_text, minute_text = cleaned[:2], cleaned[3:5]
+        if hour_text.isdecimal() and minute_text.isdecimal():
+            hour, minute = int(hour_text), int(minute_text)
+            if 1 <= hour <= 12 and minute <= 59:
+                return (hour % 12 + (12 if cleaned[6] == 'p' else 0)) * 60 + minute
+
+    if not cleaned:
+        raise TimeParseError(f"'{text}' isn't a time. Use 'HH:MM am/pm' or 'HH:MM'.")
+
+    if len(cleaned) >= 10 and cleaned[4] == '-':  # ISO date (and time)
+        try:
+            parsed = datetime.fromisoformat(cleaned)
+        except ValueError:
+            raise TimeParseError(f"'{text}' isn't a valid date and time.") from None
+        return parsed.hour * 60 + parsed.minute
+
+    half_day = None  # None: 24-hour clock
+    for suffix, offset in MERIDIEM_SUFFIXES:
+        if cleaned.endswith(suffix):
+            cleaned = cleaned[:-len(suffix)].rstrip()
+            half_day = offset
+            break
+
+    hour, minute = _hour_and_minute(cleaned, text)
+
+    if half_day is None:
+        if hour > 23:
+            raise TimeParseError(f"'{text}': the hour has to be between 0 and 23.")
+    else:
+        if not 1 <= hour <= 12:
+            raise TimeParseError(f"'{text}': the hour has to be between 1 and 12 with am/pm.")
+        hour = hour % 12 + half_day  # 12 am is midnight, 12 pm is noon
+
+    return hour * 60 + minute
+
+
+def _hour_and_minute(cleaned, text):
+    separator = ':' if ':' in cleaned else '.' if '.' in cleaned else None
+
+    if separator:
+        fields = cleaned.split(separator)
+        if len(fields) > 3 or not all(field.isdecimal() for field in fields):
+            raise TimeParseError(f"'{text}' isn't a time. Use 'HH:MM am/pm' or 'HH:MM'.")
+        if len(fields) == 3 and int(fields[2]) > 59:
+            raise TimeParseError(f"'{text}': the seconds have to be between 0 and 59.")
+        hour_text, minute_text = fields[0], fields[1]
+        if len(minute_text) != 2:
+            raise TimeParseError(f"'{text}': the minutes need two digits.")
+    elif cleaned.isdecimal() and len(cleaned) <= 4:
+        hour_text, minute_text = (cleaned, '0') if len(cleaned) <= 2 else (cleaned[:-2], cleaned[-2:])  # '9', '0905'
+    else:
+        raise TimeParseError(f"'{text}' isn't a time. Use 'HH:MM am/pm' or 'HH:MM'.")
+
+    if len(hour_text) > 2:
+        raise TimeParseError(f"'{text}' isn't a time. Use 'HH:MM am/pm' or 'HH:MM'.")
+
+    minute = int(minute_text)
+    if minute > 59:
+        raise TimeParseError(f"'{text}': the minutes have to be between 0 and 59.")
+    return int(hour_text), minute
+
+
+def parse_time(text):
+    minutes = parse_minutes(text)
+    return time(minutes // 60, minutes % 60)
+
+
+def on_date(text, day: date):
+    """The time in 'text' on 'day', as a datetime."""
+    minutes = parse_minutes(text)
+    return datetime(day.year, day.month, day.day, minutes // 60, minutes % 60)
+
+
+def parse_timestamp(text):
+    """A stored 'YYYY-MM-DD HH:MM:SS' value. datetime.fromisoformat is written in C, so no memo is needed."""
+    return datetime.fromisoformat(text)
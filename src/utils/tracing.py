@@ -0,0 +1,114 @@
+"""
+Debug tracing for hot paths, split into categories (model, db, view, controller).
+
+Each category caches whether it's enabled in a plain attribute, so a disabled trace call costs one attribute
+lookup and one method call. Messages can be callables, which are only called when the record is really emitted:
+
+    tracing.model.debug(lambda: f"Returning row {row}: {self._data[row]}")
+
+For the very hottest paths, guard the whole block:
+
+    if tracing.model.enabled:
+        tracing.model.debug(f"...")
+
+Categories are chosen with the 'APP_TRACE' environment variable: 'all', or a comma-separated list where each entry
+can have a sample rate, e.g. 'model:0.01,db,controller'. Unset means the environment's TRACE ('all' in development,
+off otherwise; setup_root_logger applies it and logs the result). Records go to the 'trace.<name>' loggers, so they
+still need DEBUG to be enabled on the root logger (refresh() re-reads that).
+"""
+import logging
+import os
+
+TRACE_ENV_KEY = 'APP_TRACE'
+
+
+class TraceCategory:
+    __slots__ = ('name', 'logger', 'enabled', 'sample_interval', 'switched_on', '_counter')
+
+    def __init__(self, name):
+        self.name = name
+        self.logger = logging.getLogger(f'trace.{name}')
+        self.enabled = False  # Cached result of the switch and logger.isEnabledFor(DEBUG)
+        self.switched_on = False
+        self.sample_interval = 1  # Emit one of every 'sample_interval' records
+        self._counter = 0
+
+    def configure(self, switched_on, sample_rate=1.0):
+        self.switched_on = switched_on
+        self.sample_interval = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        if self.sample_interval == 0:
+            self.switched_on = False
+        self.refresh()
+
+    def refresh(self):
+        self.enabled = self.switched_on and self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, message, *args):
+        """'message' is a string (with optional %-style args) or a callable returning one."""
+        if not self.enabled:
+            return
+
+        if self.sample_interval > 1:
+            self._counter += 1
+            if self._counter % self.sample_interval:
+                return
+
+        if callable(message):
+            message = message()
+        self.logger.debug(message, *args, stacklevel=2)  # Record the caller's file and line, not this one
+
+
+model = TraceCategory('model')
+db = TraceCategory('db')
+view = TraceCategory('view')
+controller = TraceCategory('controller')
+
+CATEGORIES = {category.name: category for category in (model, db, view, controller)}
+
+
+def parse_spec(spec):
+    """Return {category name: sample rate} for a spec like 'all' or 'model:0.1,db'."""
+    rates = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+
+        name, _, rate_text = entry.partition(':')
+        try:
+            rate = float(rate_text) if rate_text else 1.0
+        except ValueError:
+            logging.warning(f"Invalid sample rate '{rate_text}' for trace category '{name}'. Using 1.")
+            rate = 1.0
+
+        names = CATEGORIES if name == 'all' else [name]
+        for each_name in names:
+            if each_name not in CATEGORIES:
+                logging.warning(f"Unknown trace category '{each_name}'. Known: {list(CATEGORIES)}.")
+                continue
+            rates[each_name] = rate
+
+    return rates
+
+
+def configure(spec=None, default_spec=''):
+    """Switch categories on or off. Without a spec, the 'APP_TRACE' environment variable, else 'default_spec'."""
+    if spec is None:
+        spec = os.getenv(TRACE_ENV_KEY, default_spec)
+
+    rates = parse_spec(spec)
+    for name, category in CATEGORIES.items():
+        category.configure(name in rates, rates.get(name, 1.0))
+
+
+def enabled_names():
+    return [name for name, category in CATEGORIES.items() if category.enabled]
+
+
+def refresh():
+    """Re-read logger levels. Call after the logging configuration changes (setup_root_logger does)."""
+    for category in CATEGORIES.values():
+        category.refresh()
+
+
+configure()
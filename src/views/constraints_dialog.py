@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QCheckBox, QDialog, QDialogButtonBox, QFormLayout, QSpinBox
+
+from src.controllers.time_calculator import MIN_DURATION, TaskConstraints
+
+MAX_LIMIT_MINUTES = 7 * 24 * 60
+
+
+class ConstraintsDialog(QDialog):
+    """Minimum and maximum duration, and a fixed START time, for the selected tasks (see time_calculator.py)."""
+
+    def __init__(self, constraints, task_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Limits")
+
+        self.min_spin_box = QSpinBox(self)
+        self.min_spin_box.setRange(MIN_DURATION, MAX_LIMIT_MINUTES)
+        self.min_spin_box.setSuffix(" Minutes")
+        self.min_spin_box.setValue(constraints.min_duration)
+
+        self.max_spin_box = QSpinBox(self)
+        self.max_spin_box.setRange(0, MAX_LIMIT_MINUTES)
+        self.max_spin_box.setSuffix(" Minutes")
+        self.max_spin_box.setSpecialValueText("No limit")  # Shown for 0
+        self.max_spin_box.setValue(constraints.max_duration or 0)
+
+        self.anchored_check_box = QCheckBox("Fixed START time", self)
+        self.anchored_check_box.setToolTip("Other tasks' changes don't move this task's start")
+        self.anchored_check_box.setChecked(constraints.anchored)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout(self)
+        layout.addRow(f"{task_count} selected task/s.", None)
+        layout.addRow("Shortest:", self.min_spin_box)
+        layout.addRow("Longest:", self.max_spin_box)
+        layout.addRow(self.anchored_check_box)
+        layout.addRow(buttons)
+
+    def constraints(self):
+        return TaskConstraints(self.min_spin_box.value(), self.max_spin_box.value() or None,
+                               self.anchored_check_box.isChecked())
@@ -32,6 +32,10 @@ class TableDelegate(QStyledItemDelegate):
             padded_rect = helper_fn.add_padding(option.rect, 10, 1, 0, 1)
             painter.fillRect(padded_rect, QColor(other_row_color))
 
+        invalid_row_color = model.data(index, Qt.ItemDataRole.BackgroundRole)  # Found by the schedule check
+        if invalid_row_color is not None:
+            painter.fillRect(padded_rect, invalid_row_color)
+
         # Set font for text
         font = QFont()
         font.setPointSize(10)
@@ -49,6 +53,8 @@ class TableDelegate(QStyledItemDelegate):
             option.state ^= QStyle.StateFlag.State_HasFocus
             return
 
+        painter.save()  # Balanced by the restore at the end
+
         # Check for mouse hover state
         if option.state & QStyle.StateFlag.State_MouseOver:
             font = QFont()
@@ -0,0 +1,77 @@
+import logging
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+
+class StatsTableWindow(QWidget):
+    """
+    Read-only table for dev statistics (SQL profile, action latencies, ...).
+
+    'columns' is a list of (header, row key, format) where format is a format spec like '.2f' or None.
+    'rows_provider' returns the rows as dictionaries. 'buttons' is a list of (label, callback); after a callback the
+    table is refreshed.
+    """
+
+    def __init__(self, title, columns, rows_provider, buttons=(), parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(900, 480)
+        self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint)
+
+        self.columns = columns
+        self.rows_provider = rows_provider
+
+        main_layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel(self)
+        main_layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(columns), self)
+        self.table.setHorizontalHeaderLabels([header for header, _, _ in columns])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(False)
+        self.table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.table)
+
+        buttons_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh", self)
+        refresh_button.clicked.connect(self.refresh)
+        buttons_layout.addWidget(refresh_button)
+
+        for label, callback in buttons:
+            button = QPushButton(label, self)
+            button.clicked.connect(lambda _, callback=callback: self.run_and_refresh(callback))
+            buttons_layout.addWidget(button)
+
+        main_layout.addLayout(buttons_layout)
+
+    def run_and_refresh(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"Exception type:{type(e)} in '{self.windowTitle()}' window action (Error Description:{e}")
+        self.refresh()
+
+    def set_summary(self, text):
+        self.summary_label.setText(text)
+
+    def refresh(self):
+        rows = self.rows_provider()
+
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, (_, key, value_format) in enumerate(self.columns):
+                value = row.get(key, '')
+                text = format(value, value_format) if value_format and value != '' else str(value)
+                item = QTableWidgetItem(text)
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row_index, column_index, item)
+        self.table.resizeColumnsToContents()
+        self.table.setUpdatesEnabled(True)
+
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
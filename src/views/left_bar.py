@@ -100,6 +100,11 @@ class LeftBar(QObject):
 
         secondary_buttons_names = [
             {"display_name": "Delete", "action_name": "Delete", "tool_tip": "Delete Task"},
+            {"display_name": "Fit", "action_name": "Fit Durations",
+             "tool_tip": "Scale the selected tasks' durations to a new total"},
+            {"display_name": "Limits", "action_name": "Limits",
+             "tool_tip": "Shortest and longest duration, and a fixed start, for the selected tasks"},
+            {"display_name": "Outline", "action_name": "Outline", "tool_tip": "Tasks with their subtasks"},
             {"display_name": "Tray", "action_name": "Minimize to Tray", "tool_tip": "minimize to system tray"},
             ]
 
@@ -115,6 +120,29 @@ class LeftBar(QObject):
             all_styles.LEFT_SIDE_BUTTONS_SECONDARY
             )
 
+        if helper_fn.get_environment_cls(False, caller='left_bar.py').DEV_TOOLS:
+            self.initialize_buttons(
+                self.dev_buttons_names(),
+                self.layout_buttons_below,
+                all_styles.LEFT_SIDE_BUTTONS_SECONDARY
+                )
+
+    @staticmethod
+    def dev_buttons_names():
+        """
+        Buttons for the dev tools. Only shown when the environment has DEV_TOOLS set.
+        """
+        return [
+            {"display_name": "SQL Profile", "action_name": "SQL Profile", "tool_tip": "SQL statement statistics"},
+            {"display_name": "Logs", "action_name": "Logs", "tool_tip": "Show the log window"},
+            {"display_name": "Latency", "action_name": "Latency", "tool_tip": "Latency percentiles per action"},
+            {"display_name": "Stalls", "action_name": "Stalls", "tool_tip": "Event loop stalls per action"},
+            {"display_name": "Profile Next", "action_name": "Profile Next",
+             "tool_tip": "Profile the next action (cProfile and tracemalloc)"},
+            {"display_name": "Profile Timed", "action_name": "Profile Timed",
+             "tool_tip": "Profile everything for the next few seconds (APP_PROFILE_SECONDS, default 10)"},
+            ]
+
     def initialize_buttons(self, buttons_names, layout, style):
         """
         Initializes buttons with given names and styles and adds them to the specified layout.
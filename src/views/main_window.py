@@ -9,12 +9,14 @@ from PyQt6.QtWidgets import QHBoxLayout, QMainWindow, QSplitter, QSplitterHandle
 
 # This app's utilities and resources
 from src.resources.styles import all_styles
-from src.utils import helper_fn
+from src.utils import helper_fn, startup_timeline
+from src.utils.post_show_queue import post_show_queue
+from src.utils.service_registry import services
 
 # This app's Modules
 from src.views.title_bar import TitleBar
 from src.views.left_bar import LeftBar
-from src.views.ribbon import RibbonWidget
+from src.views.totals_footer import TotalsFooter
 
 
 class MainWindow(QMainWindow):
@@ -36,11 +38,16 @@ class MainWindow(QMainWindow):
         self._configure_ui_elements()
         self._setup_win_properties()
 
+        # Not needed for the first paint (run right away if 'APP_EAGER_STARTUP' is set)
+        post_show_queue.add('ribbon', self.install_ribbon)
+        post_show_queue.add('window state restore', self.restore_state)
+        post_show_queue.add('totals footer', self.totals_footer.refresh)  # First refresh builds the totals
+
         logging.debug(f"MainFrame constructor successfully initialized.")
 
     def get_geometry_and_state(self):
         self.env_config_class = helper_fn.get_environment_cls(False, caller='MainWin')
-        self.settings_values = self.env_config_class.SETTINGS_VALUES
+        self.settings_values = services.get('settings')
 
         self.geometry = self.settings_values.value("geometry")
         self.state = self.settings_values.value("windowState")
@@ -48,8 +55,9 @@ class MainWindow(QMainWindow):
     def _instantiate_components(self):
         try:
             self.title_bar = TitleBar(self)
-            self.ribbon = RibbonWidget()
+            self.ribbon = None  # Created by install_ribbon, after the window is shown
             self.left_bar = LeftBar()
+            self.totals_footer = TotalsFooter(self.table_view.model())
             self.splitter = HoverSplitter()
         except Exception as e:
             logging.error(f" Exception type:{type(e)}  (Error Description:{e}")
@@ -78,16 +86,17 @@ class MainWindow(QMainWindow):
 
         # Create container layout and widget for both ribbon and table and set the layout to the widget
         table_and_ribbon_v_layout = QVBoxLayout()
+        self.table_and_ribbon_v_layout = table_and_ribbon_v_layout  # Ribbon is inserted later by install_ribbon
         self.table_and_ribbon_container = QWidget(self)
         self.table_and_ribbon_container.setLayout(table_and_ribbon_v_layout)
 
-        # Add both ribbon and table widgets to 'table and ribbon vertical' layout
-        table_and_ribbon_v_layout.addWidget(self.ribbon)
+        # Add table widget, with the totals footer under it, to 'table and ribbon vertical' layout
         table_and_ribbon_v_layout.addWidget(self.table_view)
+        table_and_ribbon_v_layout.addWidget(self.totals_footer)
 
         # Add left bar and table+ribbon container widget to splitter
         self.splitter.addWidget(self.left_bar.left_widget)
-        self.splitter.addWidget(self.table_view)
+        self.splitter.addWidget(self.table_and_ribbon_container)
 
         splitter_h_layout.setContentsMargins(0, 0, 0, 0)  # Set margins for the layout
         splitter_h_layout.setSpacing(0)  # Set spacing between widgets in the layout
@@ -119,9 +128,10 @@ class MainWindow(QMainWindow):
             )
 
     def _setup_win_properties(self):
-        self.restore_state()
-        self.restore_geometry()
-        self.setStyleSheet(all_styles.MAIN_WINDOW_STYLE)
+        self.restore_geometry()  # Geometry before show, so the window doesn't jump. State is restored after show.
+
+        with startup_timeline.phase('main window styles'):
+            self.setStyleSheet(all_styles.MAIN_WINDOW_STYLE)
         self.setWindowTitle(self.env_config_class.APP_NAME)  # Keep this, even though visible win title is custom.
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint, False)
 
@@ -129,6 +139,12 @@ class MainWindow(QMainWindow):
         self.icon_path = helper_fn.resource_path(title_bar_icon_relative_path)
         self.setWindowIcon(QIcon(self.icon_path))
 
+    def install_ribbon(self):
+        from src.views.ribbon import RibbonWidget  # Imported on first use
+
+        self.ribbon = RibbonWidget()
+        self.table_and_ribbon_v_layout.insertWidget(0, self.ribbon)  # Above the table
+
     def set_win_state_and_geometry(self):
         logging.debug(f" Retrieving MainWin geometry and state and saving them to QSettings.")
 
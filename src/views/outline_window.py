@@ -0,0 +1,42 @@
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QHBoxLayout, QPushButton, QTreeView, QVBoxLayout, QWidget
+
+from src.models.task_tree_model import TaskTreeModel
+
+
+class OutlineWindow(QWidget):
+    """
+    Main tasks with their subtasks as a tree, and each family's total duration. Read-only: double-clicking a task
+    selects it in the table, where it's edited.
+
+    Rows have uniform heights, so the view lays out tens of thousands of items without measuring each one.
+    """
+    row_activated_signal = pyqtSignal(int)  # Flat row in TableModel
+
+    def __init__(self, table_model, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Outline")
+        self.resize(720, 560)
+
+        self.tree_model = TaskTreeModel(table_model, self)
+
+        self.tree_view = QTreeView(self)
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setEditTriggers(QTreeView.EditTrigger.NoEditTriggers)
+        self.tree_view.doubleClicked.connect(self.on_double_clicked)
+        self.tree_view.collapsed.connect(self.tree_model.release_children)
+
+        collapse_button = QPushButton("Collapse All", self)
+        collapse_button.clicked.connect(self.tree_model.release_all_children)  # The reset collapses every task
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(collapse_button)
+        buttons_layout.addStretch()
+
+        main_layout = QVBoxLayout(self)
+        main_layout.addWidget(self.tree_view)
+        main_layout.addLayout(buttons_layout)
+
+    def on_double_clicked(self, index):
+        self.row_activated_signal.emit(self.tree_model.flat_row(index))
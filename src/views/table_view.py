@@ -1,15 +1,17 @@
 import logging
 
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QAbstractItemView, QTableView)
 
 from src.resources.styles import table_qss
+from src.utils import startup_timeline
 from src.views.delegates.table_delegate import TableDelegate
 
 
 class TableView(QTableView):
     close_requested_signal = pyqtSignal(str)
+    rows_dropped_signal = pyqtSignal(int, int, int)  # First row, count, row to move them before
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -39,6 +41,14 @@ class TableView(QTableView):
         self.horizontalHeader().setStretchLastSection(True)
         self.horizontalHeader().setHighlightSections(False)
 
+        # Rows are reordered by dragging them (TableModel.moveRows)
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setDragDropOverwriteMode(False)
+        self.setDropIndicatorShown(True)
+
     def set_triggers(self):
         try:
             self.setEditTriggers(
@@ -52,4 +62,32 @@ class TableView(QTableView):
         self.verticalHeader().setDefaultSectionSize(row_height)
 
     def apply_styles(self):
-        self.setStyleSheet(table_qss.TABLE_STYLES)
\ No newline at end of file
+        with startup_timeline.phase('table styles'):
+            self.setStyleSheet(table_qss.TABLE_STYLES)
+
+    def dropEvent(self, event):
+        """Emit the move instead of letting Qt insert copies and remove the dragged rows."""
+        if event.source() is not self:
+            event.ignore()
+            return
+
+        rows = sorted({row for selection_range in self.selectionModel().selection()
+                       for row in range(selection_range.top(), selection_range.bottom() + 1)})
+        if not rows or rows != list(range(rows[0], rows[-1] + 1)):
+            logging.debug("Only one block of consecutive rows can be moved at a time.")
+            event.ignore()
+            return
+
+        drop_index = self.indexAt(event.position().toPoint())
+        if not drop_index.isValid():  # Below the rows: before the last row, which stays last
+            destination_row = self.model().rowCount() - 1
+        elif self.dropIndicatorPosition() == QAbstractItemView.DropIndicatorPosition.BelowItem:
+            destination_row = drop_index.row() + 1
+        else:
+            destination_row = drop_index.row()
+
+        self.rows_dropped_signal.emit(rows[0], len(rows), destination_row)
+
+        # The rows have been moved. A copy action stops the view from also removing the dragged rows.
+        event.setDropAction(Qt.DropAction.CopyAction)
+        event.accept()
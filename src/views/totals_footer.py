@@ -0,0 +1,40 @@
+from PyQt6.QtWidgets import QLabel, QSizePolicy
+
+from src.models.time_totals import TOTALS_FIELDS
+from src.resources.styles import all_styles
+
+SHOWN_TAGS = 6  # Largest tags in the footer. All of them are in the tooltip
+
+
+def format_minutes(minutes):
+    hours, minutes = divmod(minutes, 60)
+    if not hours:
+        return f"{minutes}m"
+    return f"{hours}h {minutes:02d}m" if minutes else f"{hours}h"
+
+
+class TotalsFooter(QLabel):
+    """One line under the table: scheduled time per task type and per '#tag' (see time_totals.py)."""
+
+    def __init__(self, table_model, parent=None):
+        super().__init__(parent)
+        self.setObjectName("totalsFooter")
+        self.setStyleSheet(all_styles.TOTALS_FOOTER)
+        self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Fixed)  # Long lines don't widen the window
+        self.setContentsMargins(8, 3, 8, 3)
+
+        self.time_totals = table_model.time_totals
+
+        # After the totals' own subscription (made by TableModel), so they're already updated
+        table_model.change_feed.subscribe(self.refresh, fields=TOTALS_FIELDS)  # First refresh: see MainWindow
+
+    def refresh(self, change_set=None):
+        type_parts = [f"{task_type}: {format_minutes(minutes)}"
+                      for task_type, minutes in self.time_totals.type_totals()]
+        tag_parts = [f"#{tag}: {format_minutes(minutes)}" for tag, minutes in self.time_totals.tag_totals()]
+
+        shown_parts = type_parts + tag_parts[:SHOWN_TAGS]
+        if len(tag_parts) > SHOWN_TAGS:
+            shown_parts.append(f"+{len(tag_parts) - SHOWN_TAGS} tags")
+        self.setText("   ·   ".join(shown_parts))
+        self.setToolTip("\n".join(type_parts + tag_parts))
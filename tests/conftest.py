@@ -0,0 +1,82 @@
+"""
+Fixtures for tests that need Qt or a TableModel on a real database file.
+
+The environment class makes its folders under APPDATA and the home folder when it's imported, so both point to a
+temporary folder before anything from 'src' is imported. Qt runs headless.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_TEST_HOME = tempfile.mkdtemp(prefix='routine_tests_')
+atexit.register(shutil.rmtree, _TEST_HOME, ignore_errors=True)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+for _key in ('APPDATA', 'HOME', 'USERPROFILE'):
+    os.environ[_key] = _TEST_HOME
+
+from datetime import datetime, timedelta  # noqa: E402
+
+import pytest  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+from src.models.app_data import AppData  # noqa: E402
+from src.models.sequence_keys import SEQUENCE_GAP  # noqa: E402
+from src.resources.default import CONSTRAINT_DEFAULTS  # noqa: E402
+from src.utils.service_registry import services  # noqa: E402
+
+MIDNIGHT = datetime(2023, 1, 1)  # default.FIXED_DATE
+REMINDER_LEAD = timedelta(minutes=5)
+
+
+def day_rows(durations, **values_by_row):
+    """Rows chained from midnight. 'values_by_row': row_<n>={'anchored': 1, ...} overrides a row's values."""
+    rows_data = []
+    start = MIDNIGHT
+    for row, duration in enumerate(durations):
+        end = start + timedelta(minutes=duration)
+        row_data = {'from_time': start, 'to_time': end, 'duration': duration, 'task_name': f'Task {row}',
+                    'reminders': start - REMINDER_LEAD, 'type': 'main', 'task_sequence': (row + 1) * SEQUENCE_GAP,
+                    **CONSTRAINT_DEFAULTS}
+        row_data.update(values_by_row.get(f'row_{row}', {}))
+        rows_data.append(row_data)
+        start = end
+    return rows_data
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def warnings_shown(monkeypatch):
+    """Messages of QMessageBox.warning, which would otherwise block the test."""
+    shown = []
+    monkeypatch.setattr(QMessageBox, 'warning', lambda parent, title, text, *args: shown.append((title, text)))
+    return shown
+
+
+@pytest.fixture
+def open_model(qapp, tmp_path, warnings_shown):
+    """open_model(rows_data) -> TableModel on a new database file holding 'rows_data' (see day_rows)."""
+    from src.models.table_model import TableModel
+
+    models = []
+
+    def open_model(rows_data, file_name='routine.db'):
+        data_file_path = str(tmp_path / file_name)
+        app_data = AppData(data_file_path)
+        app_data.insert_rows(rows_data)
+        app_data.close()
+
+        services.register('app_data', lambda: AppData(data_file_path))
+        model = TableModel()
+        models.append(model)
+        return model
+
+    yield open_model
+
+    for model in models:
+        model.close_database()
+    services.reset('app_data')
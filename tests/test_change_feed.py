@@ -0,0 +1,84 @@
+"""ChangeFeed: how recorded changes are merged into ChangeSets and when they're published."""
+import pytest
+
+from src.models.change_feed import ChangeFeed, FieldChange
+
+
+@pytest.fixture
+def feed_and_published():
+    feed = ChangeFeed()
+    published = []
+    feed.subscribe(published.append)
+    return feed, published
+
+
+def test_changes_outside_an_operation_are_published_one_by_one(feed_and_published):
+    feed, published = feed_and_published
+    feed.record_update(1, 0, 'duration', 30, 40)
+    feed.record_insert(2, 1, {'task_name': 'New'})
+    assert [change_set.operation for change_set in published] == ['update duration', 'insert']
+
+
+def test_insert_then_remove_in_one_operation_drops_both(feed_and_published):
+    feed, published = feed_and_published
+    with feed.operation('Paste'):
+        feed.record_insert(7, 3, {'task_name': 'New'})
+        feed.record_update(7, 3, 'duration', 10, 20)
+        feed.record_remove(7, 3, {'task_name': 'New'})
+        feed.record_update(1, 0, 'duration', 30, 40)
+
+    assert len(published) == 1
+    change_set = published[0]
+    assert change_set.inserts == () and change_set.removals == ()
+    assert [update.row_id for update in change_set.updates] == [1]
+
+
+def test_operation_with_nothing_left_is_not_published(feed_and_published):
+    feed, published = feed_and_published
+    with feed.operation('Paste'):
+        feed.record_insert(7, 3, {'task_name': 'New'})
+        feed.record_remove(7, 3, {'task_name': 'New'})
+    assert published == []
+
+
+def test_nested_operations_publish_once(feed_and_published):
+    feed, published = feed_and_published
+    with feed.operation('Delete'):
+        feed.record_remove(4, 2, {'task_name': 'Gone'})
+        with feed.operation('setData'):
+            feed.record_update(3, 1, 'duration', 30, 40)
+            assert published == []
+        assert published == []
+
+    assert [change_set.operation for change_set in published] == ['Delete']  # The outermost name
+    assert len(published[0].removals) == 1 and len(published[0].updates) == 1
+    assert not feed.in_operation
+
+
+def test_repeated_writes_merge(feed_and_published):
+    feed, published = feed_and_published
+    with feed.operation('setData'):
+        feed.record_update(1, 0, 'duration', 30, 40)
+        feed.record_update(1, 0, 'duration', 40, 50)
+        feed.record_update(2, 1, 'duration', 60, 70)
+        feed.record_update(2, 1, 'duration', 70, 60)  # Back where it started
+
+    assert len(published) == 1
+    assert [(update.row_id, update.fields) for update in published[0].updates] == \
+           [(1, {'duration': FieldChange(30, 50)})]
+
+
+def test_subscribers_get_only_what_they_asked_for():
+    feed = ChangeFeed()
+    durations, inserts = [], []
+    feed.subscribe(durations.append, fields={'duration'}, kinds={'update'})
+    feed.subscribe(inserts.append, kinds={'insert'})
+
+    feed.record_update(1, 0, 'task_name', 'Old', 'New')
+    feed.record_update(1, 0, 'duration', 30, 40)
+    feed.record_insert(2, 1, {'task_name': 'New'})
+    assert [change_set.changed_fields() for change_set in durations] == [{'duration'}]
+    assert [len(change_set.inserts) for change_set in inserts] == [1]
+
+    with pytest.raises(ValueError):
+        feed.subscribe(durations.append, kinds={'rename'})
@@ -0,0 +1,85 @@
+"""Whole-schedule check (schedule_validator.py), and the repair of older files' day end when they're loaded."""
+import sqlite3
+from datetime import timedelta
+
+from src.models import schedule_validator
+from src.models.schedule_validator import CHAIN, DURATION, SPAN
+from tests.conftest import MIDNIGHT, day_rows
+
+
+def kinds_by_row(report):
+    return sorted((violation.row, violation.kind) for violation in report.violations)
+
+
+def test_valid_day():
+    report = schedule_validator.validate(day_rows([420, 60, 30, 10, 10, 910]))
+    assert report.is_valid
+    assert report.row_count == 6
+    assert schedule_validator.validate([]).is_valid
+
+
+def test_gap_between_rows():
+    rows_data = day_rows([420, 60, 30, 10, 10, 910])
+    rows_data[2]['to_time'] -= timedelta(minutes=5)  # Ends early, so 5 minutes are missing before row 3
+    rows_data[2]['duration'] -= 5
+    report = schedule_validator.validate(rows_data)
+    assert kinds_by_row(report) == [(2, CHAIN)]
+    assert report.rows() == {2}
+
+
+def test_wrong_duration():
+    rows_data = day_rows([420, 60, 30, 10, 10, 910])
+    rows_data[3]['duration'] = 15
+    rows_data[4]['duration'] = 0
+    report = schedule_validator.validate(rows_data)
+    assert kinds_by_row(report) == [(3, DURATION), (4, DURATION)]
+    assert report.rows(CHAIN) == set()
+
+
+def test_row_with_a_missing_value_is_checked_row_by_row():
+    rows_data = day_rows([420, 60, 30, 10, 10, 910])
+    rows_data[2]['from_time'] = None  # A damaged row: the column check can't subtract it
+    rows_data[4]['duration'] = 15
+    report = schedule_validator.validate(rows_data)
+    assert kinds_by_row(report) == [(1, CHAIN), (2, DURATION), (4, DURATION)]
+
+
+def test_day_must_run_midnight_to_midnight():
+    rows_data = day_rows([420, 60, 30, 10, 10, 910])
+    rows_data[0]['from_time'] += timedelta(minutes=10)
+    rows_data[0]['duration'] -= 10
+    rows_data[-1]['to_time'] -= timedelta(days=1)  # An older file's end: midnight of the same day
+    report = schedule_validator.validate(rows_data)
+    assert kinds_by_row(report) == [(0, SPAN), (5, DURATION), (5, SPAN)]
+
+
+def test_legacy_day_end_is_repaired_on_load(open_model, tmp_path):
+    rows_data = day_rows([420, 60, 960])
+    rows_data[-1]['to_time'] = MIDNIGHT  # Ends before it starts
+    model = open_model(rows_data)
+
+    assert model._data[-1]['to_time'] == MIDNIGHT + timedelta(days=1)
+    assert schedule_validator.validate(model._data).is_valid
+    assert model.validate_schedule('on load').is_valid
+    assert model.invalid_row_ids == set()
+
+    # Written back to the file, so the next load finds nothing to repair
+    connection = sqlite3.connect(tmp_path / 'routine.db')
+    stored_end = connection.execute("SELECT to_time FROM daily_routine ORDER BY task_sequence DESC").fetchone()[0]
+    connection.close()
+    assert stored_end == str(MIDNIGHT + timedelta(days=1))
+
+
+def test_current_day_end_is_left_alone(open_model):
+    model = open_model(day_rows([420, 60, 960]))
+    assert model._data[-1]['to_time'] == MIDNIGHT + timedelta(days=1)
+
+
+def test_invalid_rows_are_highlighted_by_id(open_model):
+    rows_data = day_rows([420, 60, 30, 10, 10, 910])
+    rows_data[3]['duration'] = 15
+    model = open_model(rows_data)
+
+    report = model.validate_schedule('on load')
+    assert report.rows() == {3}
+    assert model.invalid_row_ids == {model._data[3]['id']}
@@ -0,0 +1,111 @@
+"""Gap-based 'task_sequence' keys (sequence_keys.py) and how TableModel assigns them on inserts and moves."""
+from PyQt6.QtCore import QModelIndex
+
+from src.controllers.undo_manager import UndoManager
+from src.models import sequence_keys
+from src.models.sequence_keys import SEQUENCE_GAP, is_tight, keys_between, needs_rebalance
+from tests.conftest import day_rows
+
+
+def keys(model):
+    return [row_data['task_sequence'] for row_data in model._data]
+
+
+def ids(model):
+    return [row_data['id'] for row_data in model._data]
+
+
+def assert_ordered(model):
+    assert all(key < next_key for key, next_key in zip(keys(model), keys(model)[1:]))
+
+
+def new_row(model, name='New'):
+    return dict(model._data[1], id=None, task_name=name)
+
+
+def test_keys_between_neighbours():
+    assert keys_between(1024, 2048, 1) == [1536]
+    assert keys_between(1024, 2048, 3) == [1280, 1536, 1792]
+    assert keys_between(0, 1024, 1) == [512]  # At the start: 0 is below every key
+    assert keys_between(2048, None, 2) == [2048 + SEQUENCE_GAP, 2048 + 2 * SEQUENCE_GAP]  # At the end
+
+
+def test_keys_between_runs_out_of_gap():
+    before, after = 1024, 2048
+    for _ in range(10):  # Halving a gap of 1024 allows ten inserts into the same spot
+        after = keys_between(before, after, 1)[0]
+    assert after == before + 1
+    assert keys_between(before, after, 1) is None
+    assert keys_between(5, 8, 3) is None  # Three keys need a gap of four
+
+
+def test_tight_gaps_are_found():
+    assert not is_tight(0, [512], 1024)
+    assert is_tight(1024, [1030], 2048)
+    assert is_tight(1024, [1536, 1540], None)
+    assert not needs_rebalance([1024, 2048, 3072])
+    assert needs_rebalance([1024, 1030, 3072])
+    assert needs_rebalance([2048, 1024])  # Out of order
+
+
+def test_insert_between_rows_writes_only_its_own_key(open_model):
+    model = open_model(day_rows([420, 60, 30, 930]))
+    keys_before = keys(model)
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    model.insert_new_row(2, new_row(model))
+    assert keys(model) == [keys_before[0], keys_before[1], (keys_before[1] + keys_before[2]) // 2, *keys_before[2:]]
+    assert len(change_sets) == 1 and change_sets[0].updates == ()
+
+    model.insert_new_row(0, new_row(model, 'First'))
+    assert keys(model)[0] == keys_before[0] // 2
+    assert_ordered(model)
+
+
+def test_insert_before_the_last_row_raises_its_key(open_model):
+    model = open_model(day_rows([420, 60, 30, 930]))
+    last_id = ids(model)[-1]
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    for _ in range(20):  # 'New Task' always inserts right above the last row
+        model.insert_new_row(model.rowCount() - 1, new_row(model))
+    assert ids(model)[-1] == last_id
+    assert_ordered(model)
+    assert len(change_sets) == 20  # Each insert and its last-key bump are one ChangeSet
+    assert all(len(change_set.inserts) == 1 for change_set in change_sets)
+
+
+def test_insert_without_room_rebalances(open_model):
+    rows_data = day_rows([420, 60, 30, 930])
+    for row, key in enumerate([1024, 1025, 1026, 2048]):
+        rows_data[row]['task_sequence'] = key
+    model = open_model(rows_data)
+    order_before = ids(model)
+
+    model.insert_new_row(2, new_row(model))
+    assert keys(model) == [sequence_keys.spaced_key(row) for row in range(5)]
+    assert [row_id for row, row_id in enumerate(ids(model)) if row != 2] == order_before
+
+
+def test_move_rows_round_trip_through_undo(open_model):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910]))
+    undo_manager = UndoManager(model)
+    order_before = ids(model)
+    times_before = [(row_data['from_time'], row_data['to_time']) for row_data in model._data]
+
+    assert model.moveRows(QModelIndex(), 1, 2, QModelIndex(), 5)  # Rows 1-2 to just above the last row
+    moved_order = [order_before[0], *order_before[3:5], *order_before[1:3], order_before[5]]
+    assert ids(model) == moved_order
+    assert_ordered(model)
+
+    undo_manager.undo_stack.undo()
+    assert ids(model) == order_before
+    assert [(row_data['from_time'], row_data['to_time']) for row_data in model._data] == times_before
+    assert_ordered(model)
+
+    undo_manager.undo_stack.redo()
+    assert ids(model) == moved_order
+    assert_ordered(model)
+    undo_manager.close()
@@ -0,0 +1,33 @@
+"""
+The trace callback sees statements with their values filled in, the timing wrappers see them with '?'. Both have
+to land in the same row of the profile.
+"""
+from src.dev import sql_profiler
+from src.dev.sql_profiler import normalise_statement
+
+
+def test_literals_normalise_like_placeholders():
+    placeholders = normalise_statement("UPDATE daily_routine SET duration = ?, max_duration = ?, task_name = ? "
+                                       "WHERE id = ?")
+    assert normalise_statement("UPDATE daily_routine SET duration = -15, max_duration = NULL, "
+                               "task_name = 'It''s 1.5' WHERE id = 12") == placeholders
+    assert normalise_statement("SELECT ?, ?, ?") == normalise_statement("SELECT 1.5e-3, null, x'0a'")
+
+
+def test_names_and_operators_are_kept():
+    assert normalise_statement("SELECT col2 FROM t2 WHERE a - 1 > b") == "SELECT col2 FROM t2 WHERE a - ? > b"
+
+
+def test_traced_and_timed_statements_share_a_row():
+    connection = sql_profiler.connect(':memory:')
+    connection.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, duration INTEGER, max_duration INTEGER)")
+    connection.profiler.reset()
+
+    connection.execute("INSERT INTO tasks (duration, max_duration) VALUES (?, ?)", (-5, None))
+    connection.execute("INSERT INTO tasks (duration, max_duration) VALUES (?, ?)", (30, 60))
+    connection.close()
+
+    rows = [row for row in connection.profiler.rows() if row['statement'].startswith('INSERT')]
+    assert len(rows) == 1
+    assert rows[0]['executions'] == 2
+    assert rows[0]['calls'] == 2
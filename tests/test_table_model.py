@@ -0,0 +1,94 @@
+"""TableModel edits on a real database file: what the schedule engine's solves do to the rows and the change-feed."""
+from tests.conftest import day_rows
+
+
+def durations(model):
+    return [row_data['duration'] for row_data in model._data]
+
+
+def set_cell(model, row, column_key, value):
+    return model.setData(model.index(row, model.column_keys.index(column_key)), value)
+
+
+def test_duration_edit_publishes_one_change_set(open_model):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910]))
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    assert set_cell(model, 2, 'duration', '50')
+    assert durations(model) == [420, 60, 50, 10, 10, 890]
+    assert len(change_sets) == 1
+    assert {update.row for update in change_sets[0].updates} == {2, 3, 4, 5}  # Rows 3 and 4 only moved
+
+
+def test_rejected_edit_changes_nothing(open_model, warnings_shown):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910], row_1={'anchored': 1}, row_3={'anchored': 1}))
+    before = [dict(row_data) for row_data in model._data]
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    assert not set_cell(model, 2, 'duration', '100')  # Between the anchors only row 1 can give time: 59 minutes
+    assert model._data == before
+    assert change_sets == []
+    assert [title for title, _ in warnings_shown] == ["Invalid duration."]
+
+
+def test_resize_rows_is_one_operation(open_model, warnings_shown):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910]))
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    assert model.resize_rows(1, 3, 50)
+    assert durations(model) == [420, 30, 15, 5, 60, 910]
+    assert [change_set.operation for change_set in change_sets] == ['Fit Durations']
+
+    assert not model.resize_rows(1, 3, 2)  # Less than a minute per task
+    assert durations(model) == [420, 30, 15, 5, 60, 910]
+    assert len(change_sets) == 1
+    assert [title for title, _ in warnings_shown] == ["Can't resize the tasks."]
+
+
+def paste_durations(model, edits, name='Paste'):
+    with model.edit_batch(name):
+        for row, value in edits:
+            set_cell(model, row, 'duration', value)
+
+
+def test_edit_batch_is_one_operation(open_model):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910]))
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    paste_durations(model, [(2, '25'), (4, '14')])
+    assert durations(model) == [420, 60, 25, 11, 14, 910]
+    assert [change_set.operation for change_set in change_sets] == ['Paste']
+
+
+def test_edit_batch_does_not_depend_on_the_order_of_the_edits(open_model):
+    edits = [(4, '14'), (2, '25'), (1, '70')]
+    in_order = open_model(day_rows([420, 60, 30, 10, 10, 910]), 'in_order.db')
+    paste_durations(in_order, edits)
+    reversed_order = open_model(day_rows([420, 60, 30, 10, 10, 910]), 'reversed_order.db')
+    paste_durations(reversed_order, list(reversed(edits)))
+
+    assert durations(in_order) == durations(reversed_order) == [420, 70, 25, 1, 14, 910]
+    assert [row_data['from_time'] for row_data in in_order._data] == \
+           [row_data['from_time'] for row_data in reversed_order._data]
+
+
+def test_rejected_edit_batch_changes_no_times(open_model, warnings_shown):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910], row_1={'anchored': 1}, row_5={'anchored': 1}))
+    times_before = [(row_data['from_time'], row_data['to_time'], row_data['duration']) for row_data in model._data]
+    change_sets = []
+    model.change_feed.subscribe(change_sets.append)
+
+    with model.edit_batch('Paste'):
+        set_cell(model, 3, 'task_name', 'Renamed')  # Names in the batch are kept
+        set_cell(model, 2, 'duration', '100')
+        set_cell(model, 3, 'duration', '5')
+
+    assert [(row_data['from_time'], row_data['to_time'], row_data['duration']) for row_data in model._data] == \
+           times_before
+    assert [title for title, _ in warnings_shown] == ["Invalid durations."]
+    assert len(change_sets) == 1
+    assert [(update.row, set(update.fields)) for update in change_sets[0].updates] == [(3, {'task_name'})]
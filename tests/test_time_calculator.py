@@ -0,0 +1,278 @@
+"""
+Schedule engine (TimeCalculator) on plain rows. After every solve the day must still run from midnight to midnight
+without gaps, anchored starts must stay where they were, and a change that can't fit must raise without changing
+anything.
+"""
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.controllers.time_calculator import MIN_DURATION, ScheduleError, TimeCalculator
+
+MIDNIGHT = datetime(2023, 1, 1)
+DAY_MINUTES = 24 * 60
+
+
+def make_day(durations, **constraints_by_row):
+    """Rows chained from midnight. 'constraints_by_row': row_<n>={'min_duration': ..., 'anchored': 1}."""
+    assert sum(durations) == DAY_MINUTES
+    rows_data = []
+    start = MIDNIGHT
+    for row, duration in enumerate(durations):
+        end = start + timedelta(minutes=duration)
+        row_data = {'id': row + 1, 'from_time': start, 'to_time': end, 'duration': duration,
+                    'min_duration': MIN_DURATION, 'max_duration': None, 'anchored': 0}
+        row_data.update(constraints_by_row.get(f'row_{row}', {}))
+        rows_data.append(row_data)
+        start = end
+    return rows_data
+
+
+def apply(rows_data, change):
+    """A copy of 'rows_data' with the ScheduleChange written, like TableModel.apply_schedule_change."""
+    rows_data = copy.deepcopy(rows_data)
+    for offset, (from_time, to_time, duration) in enumerate(change.times):
+        rows_data[change.first_row + offset].update(from_time=from_time, to_time=to_time, duration=duration)
+    return rows_data
+
+
+def assert_whole_day(rows_data):
+    assert rows_data[0]['from_time'] == MIDNIGHT
+    assert rows_data[-1]['to_time'] == MIDNIGHT + timedelta(days=1)
+    assert sum(row_data['duration'] for row_data in rows_data) == DAY_MINUTES
+    for row_data, next_row_data in zip(rows_data, rows_data[1:]):
+        assert row_data['to_time'] == next_row_data['from_time']
+    for row_data in rows_data:
+        assert row_data['to_time'] - row_data['from_time'] == timedelta(minutes=row_data['duration'])
+        assert row_data['duration'] >= row_data['min_duration']
+        assert row_data['max_duration'] is None or row_data['duration'] <= row_data['max_duration']
+
+
+def durations(rows_data):
+    return [row_data['duration'] for row_data in rows_data]
+
+
+def solve_raises(solve, rows_data, *args):
+    """The solve raises ScheduleError and leaves the rows as they were."""
+    before = copy.deepcopy(rows_data)
+    with pytest.raises(ScheduleError):
+        solve(rows_data, *args)
+    assert rows_data == before
+
+
+@pytest.fixture
+def calculator():
+    return TimeCalculator()
+
+
+def test_next_row_absorbs_what_it_can_give(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_duration(day, 2, 35))
+    assert durations(solved) == [420, 60, 35, 5, 10, 910]
+    assert_whole_day(solved)
+
+
+def test_change_too_big_for_the_next_row_goes_to_the_last_row(calculator):
+    # Neighbours aren't shrunk to their minimum one after the other: 'Sleep' at the end gives all 20 minutes
+    day = make_day([420, 60, 30, 10, 10, 910])
+    change = calculator.solve_duration(day, 2, 50)
+    solved = apply(day, change)
+    assert durations(solved) == [420, 60, 50, 10, 10, 890]
+    assert (change.first_row, change.last_row) == (2, 5)
+    assert_whole_day(solved)
+
+
+def test_shorter_task_gives_its_time_to_the_next_row(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_duration(day, 1, 40))
+    assert durations(solved) == [420, 40, 50, 10, 10, 910]
+    assert_whole_day(solved)
+
+
+def test_last_row_is_absorbed_above(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_duration(day, 5, 915))
+    assert durations(solved) == [420, 60, 30, 10, 5, 915]
+    assert_whole_day(solved)
+
+    # More than the row above can give: the first task of the day gives it
+    solved = apply(day, calculator.solve_duration(day, 5, 930))
+    assert durations(solved) == [400, 60, 30, 10, 10, 930]
+    assert_whole_day(solved)
+
+
+def test_no_task_can_give_the_whole_change(calculator):
+    day = make_day([1380, 30, 10, 10, 10], row_1={'anchored': 1})
+    solve_raises(calculator.solve_duration, day, 1, 45)  # Each task below has 9 minutes of slack, 27 in all
+
+
+def test_anchored_start_does_not_move(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910], row_4={'anchored': 1})
+    anchored_start = day[4]['from_time']
+
+    solved = apply(day, calculator.solve_duration(day, 2, 35))  # The next row (before the anchor) gives it
+    assert durations(solved) == [420, 60, 35, 5, 10, 910]
+    assert solved[4]['from_time'] == anchored_start
+    assert_whole_day(solved)
+
+    solved = apply(day, calculator.solve_duration(day, 2, 50))  # Too much for row 3: the row above gives it
+    assert durations(solved) == [420, 40, 50, 10, 10, 910]
+    assert solved[4]['from_time'] == anchored_start
+    assert_whole_day(solved)
+
+
+def test_change_can_not_cross_anchors(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910], row_1={'anchored': 1}, row_4={'anchored': 1})
+    solve_raises(calculator.solve_duration, day, 2, 100)  # Between the anchors, rows 1 and 3 have 59 and 9 to give
+
+    solved = apply(day, calculator.solve_duration(day, 4, 40))  # Row 4's start is fixed, so row 5 gives the time
+    assert durations(solved) == [420, 60, 30, 10, 40, 880]
+    assert solved[1]['from_time'] == day[1]['from_time'] and solved[4]['from_time'] == day[4]['from_time']
+    assert_whole_day(solved)
+
+
+def test_min_duration_is_kept(calculator):
+    day = make_day([420, 60, 30, 20, 10, 900], row_3={'min_duration': 15})
+    solved = apply(day, calculator.solve_duration(day, 2, 40))  # Row 3 can give 5, not 10: the last row gives it
+    assert durations(solved) == [420, 60, 40, 20, 10, 890]
+    assert_whole_day(solved)
+
+    solved = apply(day, calculator.solve_duration(day, 2, 35))
+    assert durations(solved) == [420, 60, 35, 15, 10, 900]
+    assert_whole_day(solved)
+
+    solve_raises(calculator.solve_duration, day, 3, 10)  # Its own minimum
+
+
+def test_max_duration_is_kept(calculator):
+    day = make_day([420, 60, 30, 20, 10, 900], row_3={'max_duration': 25}, row_5={'max_duration': 900})
+    solved = apply(day, calculator.solve_duration(day, 2, 25))  # Row 3 can only take 5 of them
+    assert durations(solved) == [420, 60, 25, 25, 10, 900]
+    assert_whole_day(solved)
+
+    solved = apply(day, calculator.solve_duration(day, 2, 20))  # Row 3 and the last row are too full: row 4 takes it
+    assert durations(solved) == [420, 60, 20, 20, 20, 900]
+    assert_whole_day(solved)
+
+    solve_raises(calculator.solve_duration, day, 3, 30)  # Its own maximum
+
+
+def test_solve_boundary_moves_the_end_of_the_row_above(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_boundary(day, 2, MIDNIGHT + timedelta(minutes=470)))
+    assert durations(solved) == [420, 50, 40, 10, 10, 910]
+    assert solved[2]['from_time'] == MIDNIGHT + timedelta(minutes=470)
+    assert_whole_day(solved)
+
+
+def test_solve_boundary_refuses_fixed_starts(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910], row_3={'anchored': 1})
+    solve_raises(calculator.solve_boundary, day, 0, MIDNIGHT + timedelta(minutes=10))
+    solve_raises(calculator.solve_boundary, day, 3, MIDNIGHT + timedelta(minutes=500))
+    solve_raises(calculator.solve_boundary, day, 2, MIDNIGHT + timedelta(minutes=400))  # Before the row above starts
+
+
+def test_solve_end(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_end(day, 1, MIDNIGHT + timedelta(minutes=500)))
+    assert durations(solved) == [420, 80, 10, 10, 10, 910]
+    assert solved[1]['to_time'] == MIDNIGHT + timedelta(minutes=500)
+    assert_whole_day(solved)
+
+    solve_raises(calculator.solve_end, day, 1, MIDNIGHT + timedelta(minutes=400))  # Before its start
+
+
+def test_same_duration_is_no_change(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    assert calculator.solve_duration(day, 2, 30) is None
+
+
+def test_proportional_durations_add_up_exactly(calculator):
+    assert calculator.proportional_durations([10, 20, 30], 100) == [17, 33, 50]  # 16.7, 33.3, 50
+    assert calculator.proportional_durations([10, 20, 30], 60) == [10, 20, 30]
+    for target_total in range(4, 500):
+        assert sum(calculator.proportional_durations([7, 45, 13, 90], target_total)) == target_total
+
+
+def test_proportional_durations_left_over_minutes_go_to_the_largest_remainders(calculator):
+    # 40 / 3 = 13.33 each: the remainders tie, so the earlier task gets the minute left over
+    assert calculator.proportional_durations([10, 10, 10], 40) == [14, 13, 13]
+    # Shares of the time above the minimums, 27 minutes: 4.26, 9 and 13.74. The minute goes to the 0.74
+    assert calculator.proportional_durations([10, 20, 30], 30) == [5, 10, 15]
+
+
+def test_proportional_durations_keep_the_minimums(calculator):
+    assert calculator.proportional_durations([10, 20, 30], 20, [8, 1, 1]) == [8, 5, 7]
+    assert calculator.proportional_durations([10, 20, 30], 10, [8, 1, 1]) == [8, 1, 1]
+    assert calculator.proportional_durations([1, 1, 1], 5) == [2, 2, 1]  # All at the minimum: shared equally
+    for target_total in range(10, 60):
+        scaled = calculator.proportional_durations([10, 20, 30], target_total, [8, 1, 1])
+        assert sum(scaled) == target_total
+        assert all(duration >= minimum for duration, minimum in zip(scaled, [8, 1, 1]))
+
+
+def test_proportional_durations_target_below_the_minimums(calculator):
+    with pytest.raises(ScheduleError):
+        calculator.proportional_durations([10, 20, 30], 2)  # Three tasks need at least 3 minutes
+    with pytest.raises(ScheduleError):
+        calculator.proportional_durations([10, 20, 30], 9, [8, 1, 1])
+
+
+def test_solve_range_total(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_range_total(day, 1, 3, 50))  # 100 minutes to 50: row 4 takes the rest
+    assert durations(solved) == [420, 30, 15, 5, 60, 910]
+    assert_whole_day(solved)
+
+    solved = apply(day, calculator.solve_range_total(day, 1, 3, 150))  # Too much for row 4: the last row gives it
+    assert durations(solved) == [420, 90, 45, 15, 10, 860]
+    assert_whole_day(solved)
+
+    assert calculator.solve_range_total(day, 1, 3, 100) is None
+    solve_raises(calculator.solve_range_total, day, 1, 3, 2)
+
+
+def test_solve_range_total_with_an_anchor(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910], row_2={'anchored': 1})
+    solve_raises(calculator.solve_range_total, day, 1, 3, 50)  # The anchor's start would move
+
+    solved = apply(day, calculator.solve_range_total(day, 2, 4, 25))  # Starting at the anchor is fine
+    assert durations(solved) == [420, 60, 15, 5, 5, 935]
+    assert solved[2]['from_time'] == day[2]['from_time']
+    assert_whole_day(solved)
+
+
+def test_solve_durations_absorbs_the_net_change(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    solved = apply(day, calculator.solve_durations(day, {1: 55, 3: 15}))  # -5 and +5: nothing else changes
+    assert durations(solved) == [420, 55, 30, 15, 10, 910]
+    assert_whole_day(solved)
+
+    # Row 2 frees 5 minutes and row 4 needs 4: row 3, between them, takes the one left over
+    solved = apply(day, calculator.solve_durations(day, {2: 25, 4: 14}))
+    assert durations(solved) == [420, 60, 25, 11, 14, 910]
+    assert_whole_day(solved)
+
+
+def test_solve_durations_does_not_depend_on_the_order_of_the_edits(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910])
+    edits = [(4, 14), (2, 25), (1, 70)]
+    in_order = apply(day, calculator.solve_durations(day, dict(edits)))
+    reversed_order = apply(day, calculator.solve_durations(day, dict(reversed(edits))))
+    assert in_order == reversed_order
+    assert durations(in_order) == [420, 70, 25, 1, 14, 910]  # Net +9: row 3, between the edits, gives it
+    assert_whole_day(in_order)
+
+
+def test_solve_durations_between_anchors(calculator):
+    day = make_day([420, 60, 30, 10, 10, 910], row_3={'anchored': 1})
+    solved = apply(day, calculator.solve_durations(day, {1: 50, 4: 20}))  # Each side of the anchor on its own
+    assert durations(solved) == [420, 50, 40, 10, 20, 900]
+    assert solved[3]['from_time'] == day[3]['from_time']
+    assert_whole_day(solved)
+
+    day = make_day([420, 60, 30, 10, 10, 910], row_1={'anchored': 1}, row_5={'anchored': 1})
+    solve_raises(calculator.solve_durations, day, {2: 100, 3: 5})  # Net +65, and row 1 and row 4 can't give it
+    with pytest.raises(ScheduleError, match='Row 4'):
+        calculator.solve_durations(day, {2: 40, 3: 0})
@@ -0,0 +1,66 @@
+"""time_parser replaces strptime for every time the app reads, so its results are checked against strptime."""
+from datetime import date, datetime, time
+
+import pytest
+
+from src.resources import default
+from src.utils.time_parser import TimeParseError, on_date, parse_minutes, parse_time, parse_timestamp
+
+EVERY_MINUTE = [time(minute // 60, minute % 60) for minute in range(24 * 60)]
+
+
+def test_fast_path_matches_strptime_for_every_minute():
+    for each_time in EVERY_MINUTE:
+        text = each_time.strftime('%I:%M %p')  # How the app shows and copies times: '07:05 PM'
+        assert parse_time(text) == datetime.strptime(text, '%I:%M %p').time() == each_time
+        assert parse_time(text.lower()) == each_time
+
+
+def test_twelve_am_and_pm():
+    assert parse_minutes('12:00 AM') == 0
+    assert parse_minutes('12:30 am') == 30
+    assert parse_minutes('12:00 PM') == 12 * 60
+    assert parse_minutes('12:59 pm') == 12 * 60 + 59
+    assert parse_minutes('12am') == 0
+    assert parse_minutes('12 p.m.') == 12 * 60
+    assert parse_minutes('01:00 AM') == 60
+    assert parse_minutes('11:59 PM') == 24 * 60 - 1
+
+
+@pytest.mark.parametrize('text, minutes', [
+    ('9:05 pm', 21 * 60 + 5), ('9:05PM', 21 * 60 + 5), ('09:05 a.m.', 9 * 60 + 5), ('9 pm', 21 * 60),
+    ('21:05', 21 * 60 + 5), ('21.05', 21 * 60 + 5), ('21:05:00', 21 * 60 + 5), ('0905', 9 * 60 + 5),
+    ('905', 9 * 60 + 5), ('21', 21 * 60), ('0', 0), ('  7:30 AM ', 7 * 60 + 30),
+    ('2023-01-01 21:05:00', 21 * 60 + 5), ('2023-01-01T21:05', 21 * 60 + 5),
+    ])
+def test_other_formats(text, minutes):
+    assert parse_minutes(text) == minutes
+
+
+@pytest.mark.parametrize('text', [
+    '', '   ', 'noon', '25:00', '24:00', '13:00 pm', '0:30 am', '10:60', '10:5', '10:30:61', '1:2:3:4', '12345',
+    '123:45', '-1:00', '10:30 xm', '2023-13-01 10:00', None, 930,
+    ])
+def test_invalid_input(text):
+    with pytest.raises(TimeParseError):
+        parse_minutes(text)
+
+
+def test_cache_hit_returns_the_same_result():
+    parse_minutes.cache_clear()
+    first = parse_minutes('07:45 PM')
+    hits_before = parse_minutes.cache_info().hits
+    assert parse_minutes('07:45 PM') == first == 19 * 60 + 45
+    assert parse_minutes.cache_info().hits == hits_before + 1
+
+    with pytest.raises(TimeParseError):  # Errors aren't cached: raised again every time
+        parse_minutes('7:75 pm')
+    with pytest.raises(TimeParseError):
+        parse_minutes('7:75 pm')
+
+
+def test_on_date_and_timestamps():
+    assert on_date('07:45 PM', date(2023, 1, 1)) == datetime(2023, 1, 1, 19, 45)
+    assert parse_timestamp('2023-01-02 00:00:00') == datetime(2023, 1, 2)
+    assert parse_timestamp(str(datetime(2023, 1, 1, 7, 5))) == datetime(2023, 1, 1, 7, 5)
+    assert default.convert_to_datetime('07:00 AM') == datetime(2023, 1, 1, 7)  # The default tasks' times
@@ -0,0 +1,206 @@
+"""
+TimeTotals against a full recomputation, with changes published by a real ChangeFeed the way TableModel records them
+(every write in an operation, inserts and removals with the row's values).
+"""
+from src.models.change_feed import ChangeFeed
+from src.models.time_totals import TOTALS_FIELDS, TimeTotals, task_tags
+
+
+class Table:
+    """Rows changed like TableModel changes them. Undo and redo replay a ChangeSet backwards or forwards."""
+
+    def __init__(self, rows):
+        self.rows = [dict(row, id=row_id) for row_id, row in enumerate(rows, start=1)]
+        self.next_id = len(self.rows) + 1
+        self.feed = ChangeFeed()
+        self.totals = TimeTotals(self.rows)
+        self.totals.rebuild()
+        self.feed.subscribe(self.totals.on_changes, fields=TOTALS_FIELDS)
+        self.history = []
+        self.feed.subscribe(self.history.append)
+
+    def row_of(self, row_id):
+        return next(row for row, row_data in enumerate(self.rows) if row_data['id'] == row_id)
+
+    def insert(self, row, values, row_id=None):
+        row_data = dict(values, id=row_id or self.next_id)
+        self.next_id = max(self.next_id, row_data['id'] + 1)
+        self.rows.insert(row, row_data)
+        self.feed.record_insert(row_data['id'], row, row_data)
+
+    def remove(self, row):
+        row_data = self.rows.pop(row)
+        self.feed.record_remove(row_data['id'], row, row_data)
+
+    def set(self, row, field, value):
+        row_data = self.rows[row]
+        old_value = row_data[field]
+        row_data[field] = value
+        self.feed.record_update(row_data['id'], row, field, old_value, value)
+
+    def undo(self, change_set):
+        with self.feed.operation('Undo'):
+            for removal in reversed(change_set.removals):
+                self.insert(removal.row, {key: value for key, value in removal.values.items() if key != 'id'},
+                            row_id=removal.row_id)
+            for update in change_set.updates:
+                for field, change in update.fields.items():
+                    self.set(self.row_of(update.row_id), field, change.old)
+            for insert in reversed(change_set.inserts):
+                self.remove(self.row_of(insert.row_id))
+
+    def redo(self, change_set):
+        with self.feed.operation('Redo'):
+            for insert in change_set.inserts:
+                self.insert(insert.row, {key: value for key, value in insert.values.items() if key != 'id'},
+                            row_id=insert.row_id)
+            for update in change_set.updates:
+                for field, change in update.fields.items():
+                    self.set(self.row_of(update.row_id), field, change.new)
+            for removal in change_set.removals:
+                self.remove(self.row_of(removal.row_id))
+
+
+def task(task_name, duration, task_type='main'):
+    return {'task_name': task_name, 'duration': duration, 'type': task_type}
+
+
+def make_table():
+    return Table([
+        task('Sleep #rest', 420),
+        task('Deep work #work', 180),
+        task('Email #work #admin', 30, 'subtask'),
+        task('Lunch', 60),
+        task('Gym #health.', 90, 'subtask'),
+        task('Evening', 660),
+        ])
+
+
+def assert_matches_recompute(table):
+    by_type, by_tag = TimeTotals.recompute(table.rows)
+    assert table.totals.by_type == by_type
+    assert table.totals.by_tag == by_tag
+    assert table.totals.verify()
+
+
+def test_task_tags():
+    assert task_tags('Deep work #Work #focus, #work') == {'work', 'focus'}
+    assert task_tags('Gym #health.') == {'health'}
+    assert task_tags('No tags # here') == set()
+    assert task_tags(None) == set()
+
+
+def test_rebuild():
+    table = make_table()
+    assert table.totals.by_type == {'main': 1320, 'subtask': 120}
+    assert table.totals.by_tag == {'rest': 420, 'work': 210, 'admin': 30, 'health': 90}
+    assert_matches_recompute(table)
+
+
+def test_insert_and_remove():
+    table = make_table()
+    with table.feed.operation('New Task'):
+        table.insert(3, task('Reading #learn', 45))
+        table.set(6, 'duration', 615)  # The last task gives the time
+    assert_matches_recompute(table)
+
+    with table.feed.operation('Delete'):
+        table.remove(1)
+    assert 'work' in table.totals.by_tag  # Still on 'Email'
+    assert_matches_recompute(table)
+
+    with table.feed.operation('Delete'):
+        table.remove(1)  # The last '#work' and '#admin' task
+    assert 'admin' not in table.totals.by_tag
+    assert_matches_recompute(table)
+
+
+def test_duration_task_name_and_type_updates():
+    table = make_table()
+    with table.feed.operation('setData'):
+        table.set(1, 'duration', 150)
+        table.set(5, 'duration', 690)
+    assert_matches_recompute(table)
+
+    with table.feed.operation('setData'):
+        table.set(3, 'task_name', 'Lunch #rest #social')
+    assert table.totals.by_tag['social'] == 60
+    assert_matches_recompute(table)
+
+    with table.feed.operation('setData'):
+        table.set(2, 'task_name', 'Email')
+    assert 'admin' not in table.totals.by_tag
+    assert_matches_recompute(table)
+
+    with table.feed.operation('setData'):
+        table.set(4, 'type', 'main')
+    assert table.totals.by_type['subtask'] == 30
+    assert_matches_recompute(table)
+
+    with table.feed.operation('setData'):  # Every field at once, and written twice
+        table.set(1, 'duration', 100)
+        table.set(1, 'task_name', 'Shallow work #admin')
+        table.set(1, 'type', 'subtask')
+        table.set(1, 'duration', 120)
+        table.set(5, 'duration', 720)
+    assert_matches_recompute(table)
+
+    with table.feed.operation('Paste'):  # The edited row moves down, so its recorded index is stale
+        table.set(3, 'task_name', 'Lunch #social')
+        table.insert(0, task('Early #rest', 10))
+    assert_matches_recompute(table)
+
+
+def test_update_and_remove_in_one_change_set():
+    table = make_table()
+    with table.feed.operation('Edit and delete'):
+        table.set(1, 'duration', 200)
+        table.set(1, 'task_name', 'Deep work #focus')
+        table.set(0, 'duration', 400)
+        table.remove(1)
+    assert 'focus' not in table.totals.by_tag
+    assert_matches_recompute(table)
+
+    with table.feed.operation('Insert, edit and delete'):  # Inserted and removed in the same operation
+        table.insert(2, task('Scratch #tmp', 15))
+        table.set(2, 'duration', 25)
+        table.remove(2)
+    assert 'tmp' not in table.totals.by_tag
+    assert_matches_recompute(table)
+
+
+def test_undo_and_redo():
+    table = make_table()
+    with table.feed.operation('New Task'):
+        table.insert(5, task('Walk #health', 30))
+        table.set(6, 'duration', 630)
+    with table.feed.operation('setData'):
+        table.set(1, 'task_name', 'Deep work #study')
+    with table.feed.operation('setData'):
+        table.set(2, 'type', 'main')
+        table.set(2, 'duration', 40)
+        table.set(3, 'duration', 50)
+    with table.feed.operation('Delete'):
+        table.set(0, 'duration', 450)
+        table.remove(4)
+    assert_matches_recompute(table)
+
+    done = list(table.history)
+    for change_set in reversed(done):
+        table.undo(change_set)
+        assert_matches_recompute(table)
+    assert table.totals.by_type == {'main': 1320, 'subtask': 120}
+    assert table.totals.by_tag == {'rest': 420, 'work': 210, 'admin': 30, 'health': 90}
+
+    for change_set in done:
+        table.redo(change_set)
+        assert_matches_recompute(table)
+
+
+def test_verify_detects_drift():
+    table = make_table()
+    table.totals.by_type['main'] += 5
+    assert not table.totals.verify()
+
+    table.totals.rebuild()
+    assert table.totals.verify()
@@ -0,0 +1,107 @@
+"""UndoManager: undo and redo of model edits through their change-feed deltas, merging, and the spill file."""
+import pytest
+
+from src.controllers import undo_manager as undo_manager_module
+from src.controllers.undo_manager import UndoManager
+from src.models.task_clipboard import PastedTask
+from tests.conftest import day_rows
+from tests.test_table_model import durations, set_cell
+
+
+def rows(model):
+    """Every row's values except its sequence key, which undo doesn't put back (see undo_manager.py)."""
+    return [{key: value for key, value in row_data.items() if key != 'task_sequence'} for row_data in model._data]
+
+
+@pytest.fixture
+def model_and_undo(open_model):
+    model = open_model(day_rows([420, 60, 30, 10, 10, 910]))
+    undo_manager = UndoManager(model)
+    yield model, undo_manager
+    undo_manager.close()
+
+
+def test_duration_edit_round_trip(model_and_undo):
+    model, undo_manager = model_and_undo
+    before = rows(model)
+
+    set_cell(model, 2, 'duration', '50')
+    after = rows(model)
+    assert undo_manager.undo_stack.count() == 1
+
+    undo_manager.undo_stack.undo()
+    assert rows(model) == before
+    undo_manager.undo_stack.redo()
+    assert rows(model) == after
+
+
+def test_repeated_duration_edits_merge(model_and_undo):
+    model, undo_manager = model_and_undo
+    before = rows(model)
+
+    for value in ('40', '50', '45'):  # The last row gives the time for the first two, the next row takes it back
+        set_cell(model, 2, 'duration', value)
+    assert undo_manager.undo_stack.count() == 1
+    assert durations(model) == [420, 60, 45, 15, 10, 890]
+
+    set_cell(model, 1, 'duration', '55')  # Another cell: a new command
+    assert undo_manager.undo_stack.count() == 2
+
+    undo_manager.undo_stack.undo()
+    undo_manager.undo_stack.undo()
+    assert rows(model) == before
+
+
+def test_insert_and_delete_round_trip(model_and_undo):
+    model, undo_manager = model_and_undo
+    before = rows(model)
+
+    with model.change_feed.operation('Paste'):
+        assert model.insert_task_block(2, [PastedTask('Pasted 1', 15), PastedTask('Pasted 2', 5)])
+    after_paste = rows(model)
+    with model.change_feed.operation('Delete'):
+        model.delete_row_and_data(4)
+    after_delete = rows(model)
+    assert undo_manager.undo_stack.count() == 2
+
+    undo_manager.undo_stack.undo()
+    assert rows(model) == after_paste
+    undo_manager.undo_stack.undo()
+    assert rows(model) == before
+
+    undo_manager.undo_stack.redo()
+    assert rows(model) == after_paste
+    undo_manager.undo_stack.redo()
+    assert rows(model) == after_delete
+
+
+def test_new_edit_forgets_redo_history(model_and_undo):
+    model, undo_manager = model_and_undo
+    set_cell(model, 2, 'duration', '50')
+    undo_manager.undo_stack.undo()
+    set_cell(model, 3, 'task_name', 'Renamed')
+    assert undo_manager.undo_stack.count() == 1
+    assert not undo_manager.undo_stack.canRedo()
+
+
+def test_old_history_spills_past_the_memory_cap(model_and_undo):
+    model, undo_manager = model_and_undo
+    before = rows(model)
+    long_name = 'x' * (undo_manager_module.MAX_MEMORY_BYTES // 4)
+
+    for row in range(6):  # Each delta holds a long name: six of them don't fit in memory
+        set_cell(model, row, 'task_name', f'{row} {long_name}')
+    after = rows(model)
+
+    commands = [undo_manager.undo_stack.command(index) for index in range(undo_manager.undo_stack.count())]
+    spilled = [command for command in commands if command.delta is None]
+    assert spilled and all(command.spill_location is not None for command in spilled)
+    assert commands[-1].delta is not None  # The newest stays in memory
+    assert undo_manager.memory_bytes <= undo_manager_module.MAX_MEMORY_BYTES
+
+    while undo_manager.undo_stack.canUndo():  # Spilled deltas are read back
+        undo_manager.undo_stack.undo()
+    assert rows(model) == before
+    while undo_manager.undo_stack.canRedo():
+        undo_manager.undo_stack.redo()
+    assert rows(model) == after